@@ -0,0 +1,61 @@
+# app/core/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU whose entries also expire ttl seconds after being set.
+    With sizeof, maxsize bounds the summed size of the values rather than the entry count.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, sizeof: Callable[[Any], int] | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._sizeof = sizeof or (lambda value: 1)
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value, _ = item
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        with self._lock:
+            self._drop(key)
+            if size > self.maxsize:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value, size)
+            self._size += size
+            while self._size > self.maxsize:
+                self._drop(next(iter(self._data)))
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def _drop(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._size -= item[2]
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -23,12 +23,24 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: str | None = None
     R2_BUCKET: str | None = None
     R2_PUBLIC_BASE_URL: str | None = None
+    R2_MAX_POOL_CONNECTIONS: int = 32
+    # decompression-bomb guard: uploads declaring more pixels than this are rejected before decoding
+    IMAGE_MAX_PIXELS: int = 40_000_000
+    # rows per transaction in POST /ledger/import; progress is visible after each chunk commits
+    LEDGER_IMPORT_CHUNK_ROWS: int = 500
+    AVATAR_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    AVATAR_CACHE_MAX_ITEM_BYTES: int = 5 * 1024 * 1024
+    AVATAR_CACHE_TTL_SECONDS: int = 3600
+    AVATAR_PROXY_MAX_AGE_SECONDS: int = 86400
     RESEND_API_KEY: str | None = None
     RESEND_FROM_EMAIL: str | None = None
     RESEND_FALLBACK_API_KEY: str | None = None
     RESEND_FALLBACK_FROM_EMAIL: str | None = None
     RESEND_PRIMARY_DAILY_LIMIT: int | None = None
     RESEND_PRIMARY_DAILY_BUFFER: int = 5
+    EMAIL_DISPATCH_CONCURRENCY: int = 4
+    # chat/comment emails to one recipient within this window go out as a single digest; 0 sends each at once
+    EMAIL_DIGEST_WINDOW_SECONDS: int = 300
     SUBSCRIPTION_ALERT_EMAIL: str | None = "blharper95@gmail.com"
     SIGNUP_ALERT_EMAIL: str | None = None
     CONTACT_FORWARD_EMAIL: str | None = None
@@ -138,6 +150,16 @@ class Settings(BaseSettings):
     TELLER_MAX_OUTPUT_TOKENS: int = 450
     TELLER_MAX_CHARS: int = 1200
     TELLER_PROMPT_MAX_CHARS: int = 1400
+    PROFILE_CACHE_TTL_SECONDS: int = 60
+    PROFILE_CACHE_SIZE: int = 4096
+    # invalidation is per-process: another worker keeps serving a deactivated, demoted or
+    # downgraded user for at most this long
+    AUTH_CACHE_TTL_SECONDS: int = 5
+    AUTH_CACHE_SIZE: int = 10000
+    PASSWORD_HASH_WORKERS: int | None = None  # defaults to the CPU count, at most 4
+    # workers + queue is the most request threads ever waiting on a hash; capped at startup to a
+    # quarter of the request threadpool (anyio's default is 40)
+    PASSWORD_HASH_MAX_QUEUE: int = 4
 
     # ✅ Backwards-compatible alias for code expecting this name
     @property
@@ -0,0 +1,58 @@
+# app/core/pagination.py
+
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the last (created_at, id) a client has seen."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises ValueError on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at_str, id_str = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at_str), int(id_str)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def cursor_pivot(query, model, cursor: tuple[datetime, int]):
+    """
+    The stored created_at of the cursor row, falling back to the client's copy if the row
+    is gone. Comparing against the stored value (read in SQL, not round-tripped through
+    Python) means precision/format differences between the client's timestamp and the
+    column can't skip or repeat rows.
+    The row is looked up within query, the (unordered) listing being paged; a row that
+    exists but is not part of it raises ValueError, so a cursor can't reach another
+    listing's rows.
+    """
+    cursor_created_at, cursor_id = cursor
+    anchor = query.filter(model.id == cursor_id).with_entities(model.created_at).limit(1)
+    if anchor.first() is None:
+        if query.session.query(model.id).filter(model.id == cursor_id).first() is not None:
+            raise ValueError("Cursor is not part of this listing")
+        return cursor_created_at
+    # uncorrelated: the listing pages over the same table
+    return anchor.statement.correlate(None).scalar_subquery()
+
+
+def keyset_window(query, created_col, id_col, pivot, cursor_id: int, newer: bool = False):
+    """
+    Restrict a query to rows strictly older than the cursor row, newest first, or with
+    newer=True to rows strictly newer than it, oldest first (so a limit keeps the rows
+    nearest the cursor).
+    """
+    if newer:
+        return query.filter(
+            or_(created_col > pivot, and_(created_col == pivot, id_col > cursor_id))
+        ).order_by(created_col.asc(), id_col.asc())
+    return query.filter(
+        or_(created_col < pivot, and_(created_col == pivot, id_col < cursor_id))
+    ).order_by(created_col.desc(), id_col.desc())
@@ -1,7 +1,12 @@
 # app/core/security.py
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 import hashlib
+import logging
+import os
+import threading
+import time
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -14,6 +19,9 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
+from app.core.user_cache import cached_user
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -40,19 +48,118 @@ def _normalize_password(password: str) -> str:
     return hashlib.sha256(b).hexdigest()
 
 
+class _PasswordHashPool:
+    """
+    bcrypt runs on a small dedicated pool (bcrypt releases the GIL, so it scales with cores).
+    The auth handlers are sync, so the request thread that asked still waits for its hash;
+    what the pool bounds is how many request threads can be waiting. At most
+    `workers + max_queue` hashes may be in flight (and fit_password_hash_pool keeps that
+    well under the request threadpool); past that callers get a 429 immediately, so a login
+    burst can't occupy every request thread.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self.max_in_flight = workers + max_queue
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._stats_lock = threading.Lock()
+        self._count = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+        self._rejected = 0
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many sign-in attempts right now. Please try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            return self._executor.submit(self._timed, fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def limit_in_flight(self, limit: int) -> None:
+        """Lower the in-flight bound. Only call while nothing is in flight (at startup)."""
+        if limit < self.max_in_flight:
+            self.max_in_flight = max(1, limit)
+            self._slots = threading.BoundedSemaphore(self.max_in_flight)
+
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self._count += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "count": self._count,
+                "avg_ms": round(self._total_seconds / self._count * 1000, 1) if self._count else 0.0,
+                "max_ms": round(self._max_seconds * 1000, 1),
+                "rejected": self._rejected,
+            }
+
+
+_hash_pool = _PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS or min(os.cpu_count() or 2, 4),
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+# share of the request threadpool that may be waiting on password hashes
+HASH_THREADPOOL_SHARE = 4
+
+
+def fit_password_hash_pool() -> int:
+    """
+    Keep the hashes in flight to a quarter of anyio's request threadpool (the sync auth
+    handlers each hold one of its threads while they wait). Run from a startup hook, inside
+    the event loop. Returns the resulting bound.
+    """
+    import anyio.to_thread
+
+    tokens = int(anyio.to_thread.current_default_thread_limiter().total_tokens)
+    limit = tokens // HASH_THREADPOOL_SHARE
+    if _hash_pool.max_in_flight > limit:
+        logger.warning(
+            "Password hashing allows %s in flight but the request threadpool has %s threads; lowering to %s.",
+            _hash_pool.max_in_flight,
+            tokens,
+            limit,
+        )
+        _hash_pool.limit_in_flight(limit)
+    return _hash_pool.max_in_flight
+
+
+def password_hash_stats() -> dict:
+    """Latency and backpressure counters for the password hashing pool."""
+    return _hash_pool.stats()
+
+
+def _verify(normalized: str, hashed_password: str) -> bool:
+    try:
+        return pwd_context.verify(normalized, hashed_password)
+    except UnknownHashError:
+        return False
+
+
 def get_password_hash(password: str) -> str:
     normalized = _normalize_password(password)
-    return pwd_context.hash(normalized)
+    return _hash_pool.run(pwd_context.hash, normalized)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     if not hashed_password:
         return False
     normalized = _normalize_password(plain_password)
-    try:
-        return pwd_context.verify(normalized, hashed_password)
-    except UnknownHashError:
-        return False
+    return _hash_pool.run(_verify, normalized, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -103,7 +210,7 @@ def get_current_user(
     except (JWTError, ValueError):
         raise credentials_exception
 
-    user = get_user_by_id(db, user_id)
+    user = cached_user(db, user_id)
     if not user:
         raise credentials_exception
 
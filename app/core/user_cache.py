@@ -0,0 +1,76 @@
+# app/core/user_cache.py
+
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# user_id -> (version, User column values). Invalidation only reaches this process, so writes
+# made on another worker show up here once the entry expires (AUTH_CACHE_TTL_SECONDS).
+_users = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+# user_id -> version, set from a process-wide counter on every change so a load that raced an
+# update is never stored. A version only has to outlive the loads in flight, so entries expire
+# and are evicted with the same bounds as the user cache.
+_versions = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+_versions_lock = threading.Lock()
+_next_version = 0
+
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def _version(user_id: int) -> int:
+    return _versions.get(user_id, 0)
+
+
+def invalidate_user(user_id: int) -> None:
+    global _next_version
+    with _versions_lock:
+        _next_version += 1
+        _versions.set(user_id, _next_version)
+    _users.pop(user_id)
+
+
+def cached_user(db: Session, user_id: int) -> User | None:
+    """
+    The User attached to this session, from the cache when possible (no SELECT) or the
+    database otherwise.
+    """
+    version = _version(user_id)
+    hit = _users.get(user_id)
+    if hit is not None and hit[0] == version:
+        user = User(**hit[1])
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and _version(user_id) == version:
+        _users.set(user_id, (version, {key: getattr(user, key) for key in _USER_COLUMNS}))
+    return user
+
+
+def clear_user_cache() -> None:
+    _users.clear()
+    _versions.clear()
+
+
+# Any ORM write to a user (Stripe webhook, verify_email, deactivation, username or password
+# changes) invalidates it at flush time, and again once committed so a concurrent request
+# can't re-cache the pre-commit row.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target) -> None:
+    invalidate_user(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
+
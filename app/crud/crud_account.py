@@ -1,8 +1,9 @@
 # app/crud/crud_account.py
 
-from sqlalchemy.orm import Session
-from app.models.account import Account
-from app.models.ledger import LedgerEntry
+from sqlalchemy import Select, insert, literal, select, true
+from sqlalchemy.orm import Session, aliased
+from app.models.account import Account, AccountClosure
+from app.models.ledger import LedgerEntry, AccountBalance, AccountMonthlyRollup
 from app.models.transaction import Transaction
 from app.models.scheduled_entry import ScheduledEntry
 from app.schemas.account import AccountCreate
@@ -16,6 +17,45 @@ def user_owns_account(account: Account | None, user_id: int) -> bool:
     return bool(account) and account.owner_user_id == user_id
 
 
+def subtree_ids(account_id: int) -> Select:
+    """Subquery of the ids in account_id's subtree, itself included."""
+    return select(AccountClosure.descendant_id).where(AccountClosure.ancestor_id == account_id)
+
+
+def list_subtree_accounts(db: Session, account_id: int) -> list[Account]:
+    """The account and everything nested under it, shallowest first."""
+    return (
+        db.query(Account)
+        .join(AccountClosure, AccountClosure.descendant_id == Account.id)
+        .filter(AccountClosure.ancestor_id == account_id)
+        .order_by(AccountClosure.depth, Account.id)
+        .all()
+    )
+
+
+def is_in_subtree(db: Session, root_id: int, account_id: int) -> bool:
+    return (
+        db.query(AccountClosure)
+        .filter(AccountClosure.ancestor_id == root_id, AccountClosure.descendant_id == account_id)
+        .first()
+        is not None
+    )
+
+
+def _link_to_ancestors(db: Session, account_id: int, parent_account_id: int | None) -> None:
+    """Closure rows for a new leaf: itself at depth 0, then each of the parent's ancestors one deeper."""
+    db.add(AccountClosure(ancestor_id=account_id, descendant_id=account_id, depth=0))
+    if parent_account_id:
+        db.execute(
+            insert(AccountClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(AccountClosure.ancestor_id, literal(account_id), AccountClosure.depth + 1).where(
+                    AccountClosure.descendant_id == parent_account_id
+                ),
+            )
+        )
+
+
 def create_account(db: Session, owner_user_id: int, data: AccountCreate) -> Account:
     account = Account(
         owner_user_id=owner_user_id,
@@ -28,6 +68,8 @@ def create_account(db: Session, owner_user_id: int, data: AccountCreate) -> Acco
         is_active=data.is_active,
     )
     db.add(account)
+    db.flush()
+    _link_to_ancestors(db, account.id, account.parent_account_id)
     db.commit()
     db.refresh(account)
     return account
@@ -50,15 +92,75 @@ def update_account_name(db: Session, account: Account, name: str) -> Account:
     return account
 
 
+def move_account(
+    db: Session, account: Account, parent_account_id: int | None, name: str | None = None
+) -> Account:
+    """
+    Re-parent account together with its subtree. Links inside the subtree are kept; links
+    from the old ancestors are replaced with the new parent's ancestors in one insert.
+    A new name, if given, is saved in the same transaction.
+    The caller checks that the new parent is not inside the subtree.
+    """
+    subtree = subtree_ids(account.id)
+    db.query(AccountClosure).filter(
+        AccountClosure.descendant_id.in_(subtree),
+        AccountClosure.ancestor_id.not_in(subtree),
+    ).delete(synchronize_session=False)
+    if parent_account_id:
+        above = aliased(AccountClosure)
+        below = aliased(AccountClosure)
+        db.execute(
+            insert(AccountClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+                .select_from(above)
+                .join(below, true())
+                .where(
+                    above.descendant_id == parent_account_id,
+                    below.ancestor_id == account.id,
+                ),
+            )
+        )
+    account.parent_account_id = parent_account_id
+    if name:
+        account.name = name
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+def rebuild_account_closure(db: Session) -> int:
+    """Recompute account_closure from parent_account_id (backfill/repair). Returns the row count."""
+    tree = select(
+        Account.id.label("ancestor_id"), Account.id.label("descendant_id"), literal(0).label("depth")
+    ).cte("tree", recursive=True)
+    child = aliased(Account)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1).join(
+            child, child.parent_account_id == tree.c.descendant_id
+        )
+    )
+    db.query(AccountClosure).delete(synchronize_session=False)
+    db.execute(
+        insert(AccountClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth),
+        )
+    )
+    db.commit()
+    return db.query(AccountClosure).count()
+
+
 def delete_account(db: Session, account: Account) -> None:
-    child_ids = [
-        row.id
-        for row in db.query(Account.id)
-        .filter(Account.parent_account_id == account.id)
-        .all()
-    ]
-    target_ids = [account.id] + child_ids
+    # the whole subtree goes, however deeply nested
+    target_ids = [row.descendant_id for row in db.execute(subtree_ids(account.id))]
+    if account.id not in target_ids:
+        target_ids.append(account.id)
 
+    db.query(AccountClosure).filter(AccountClosure.descendant_id.in_(target_ids)).delete(synchronize_session=False)
+    db.query(AccountBalance).filter(AccountBalance.account_id.in_(target_ids)).delete()
+    db.query(AccountMonthlyRollup).filter(AccountMonthlyRollup.account_id.in_(target_ids)).delete()
     db.query(LedgerEntry).filter(LedgerEntry.account_id.in_(target_ids)).delete()
     db.query(Transaction).filter(Transaction.account_id.in_(target_ids)).delete()
     db.query(ScheduledEntry).filter(ScheduledEntry.account_id.in_(target_ids)).delete()
@@ -1,73 +1,231 @@
 # app/crud/crud_ledger.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func, case, tuple_
+from sqlalchemy.exc import IntegrityError
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.models.ledger import LedgerEntry
-from app.models.account import Account
-from app.schemas.ledger import LedgerEntryCreate
+from app.models.ledger import LedgerEntry, AccountBalance, AccountMonthlyRollup
+from app.models.account import Account, AccountClosure
+from app.core.pagination import cursor_pivot, keyset_window
+from app.schemas.ledger import LedgerEntryCreate, meta_kind
 
 
-def create_ledger_entry(db: Session, created_by_user_id: int, payload: LedgerEntryCreate) -> LedgerEntry:
-    if payload.idempotency_key:
-        existing = (
-            db.query(LedgerEntry)
-            .filter(
-                LedgerEntry.account_id == payload.account_id,
-                LedgerEntry.idempotency_key == payload.idempotency_key,
+def ledger_entry_values(created_by_user_id: int, payload: LedgerEntryCreate) -> dict:
+    return {
+        "account_id": payload.account_id,
+        "created_by_user_id": created_by_user_id,
+        "direction": payload.direction,
+        "amount": payload.amount,
+        "currency": payload.currency,
+        "entry_type": payload.entry_type,
+        "status": payload.status,
+        "reference": payload.reference,
+        "external_ref": payload.external_ref,
+        "idempotency_key": payload.idempotency_key,
+        "memo": payload.memo,
+        "meta": payload.meta,
+        "kind": meta_kind(payload.meta),
+        "is_reversal": False,
+        "reversed_entry_id": None,
+    }
+
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def insert_ledger_entries(db: Session, rows: list[dict]) -> list[LedgerEntry | None]:
+    """
+    Insert entry rows (see ledger_entry_values), skipping any whose (account_id,
+    idempotency_key) already exists. On Postgres and SQLite keyed rows go in one
+    INSERT ... ON CONFLICT DO NOTHING RETURNING against uq_ledger_account_idempotency and
+    unkeyed rows in one plain multi-row INSERT ... RETURNING.
+    Returns, per row, the inserted entry or None if its key was taken. Does not commit.
+    """
+    results: list[LedgerEntry | None] = [None] * len(rows)
+    keyed = [i for i, values in enumerate(rows) if values.get("idempotency_key") is not None]
+    unkeyed = [i for i, values in enumerate(rows) if values.get("idempotency_key") is None]
+    insert = _dialect_insert(db)
+    if insert is None:
+        for i, values in enumerate(rows):
+            entry = LedgerEntry(**values)
+            try:
+                with db.begin_nested():
+                    db.add(entry)
+            except IntegrityError:
+                continue
+            results[i] = entry
+        return results
+
+    if unkeyed:
+        stmt = insert(LedgerEntry).returning(LedgerEntry, sort_by_parameter_order=True)
+        for i, entry in zip(unkeyed, db.scalars(stmt, [rows[i] for i in unkeyed]).all()):
+            results[i] = entry
+    if keyed:
+        stmt = (
+            insert(LedgerEntry)
+            .on_conflict_do_nothing(
+                index_elements=["account_id", "idempotency_key"],
+                index_where=LedgerEntry.idempotency_key.isnot(None),
             )
-            .order_by(LedgerEntry.created_at.desc())
-            .first()
+            .returning(LedgerEntry)
         )
-        if existing:
-            return existing
+        inserted = {
+            (entry.account_id, entry.idempotency_key): entry
+            for entry in db.scalars(stmt, [rows[i] for i in keyed]).all()
+        }
+        for i in keyed:
+            # pop, so a key repeated within the batch only counts as inserted once
+            results[i] = inserted.pop((rows[i]["account_id"], rows[i]["idempotency_key"]), None)
+    return results
+
+
+def find_idempotent_entries(db: Session, keys: set[tuple[int, str]]) -> dict[tuple[int, str], LedgerEntry]:
+    """Existing entries for (account_id, idempotency_key) pairs, in one query."""
+    if not keys:
+        return {}
+    return {
+        (entry.account_id, entry.idempotency_key): entry
+        for entry in db.query(LedgerEntry).filter(
+            tuple_(LedgerEntry.account_id, LedgerEntry.idempotency_key).in_(list(keys))
+        )
+    }
 
-    entry = LedgerEntry(
-        account_id=payload.account_id,
-        created_by_user_id=created_by_user_id,
-        direction=payload.direction,
-        amount=payload.amount,
-        currency=payload.currency,
-        entry_type=payload.entry_type,
-        status=payload.status,
-        reference=payload.reference,
-        external_ref=payload.external_ref,
-        idempotency_key=payload.idempotency_key,
-        memo=payload.memo,
-        meta=payload.meta,
-    )
 
-    db.add(entry)
+def create_ledger_entry(db: Session, created_by_user_id: int, payload: LedgerEntryCreate) -> LedgerEntry:
+    """
+    Post one entry. A retry with an idempotency_key already used on the account returns the
+    original entry instead; the unique index makes that hold under concurrent retries too.
+    """
+    [entry] = insert_ledger_entries(db, [ledger_entry_values(created_by_user_id, payload)])
+    if entry is None:
+        key = (payload.account_id, payload.idempotency_key)
+        return find_idempotent_entries(db, {key})[key]
+
+    record_posted_entries(db, [entry])
     db.commit()
     db.refresh(entry)
     return entry
 
 
-def list_ledger_entries(db: Session, account_id: int, limit: int = 50, offset: int = 0) -> list[LedgerEntry]:
-    return (
-        db.query(LedgerEntry)
-        .filter(LedgerEntry.account_id == account_id)
-        .order_by(LedgerEntry.created_at.desc(), LedgerEntry.id.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+def create_ledger_entries(
+    db: Session, created_by_user_id: int, payloads: list[LedgerEntryCreate]
+) -> list[tuple[LedgerEntry, bool]]:
+    """
+    Post many entries in one transaction: one multi-row insert, one balance/rollup fold and
+    one commit. Returns (entry, created) per payload, in order; created is False when the
+    idempotency key was already used and entry is the original.
+    """
+    inserted = insert_ledger_entries(db, [ledger_entry_values(created_by_user_id, p) for p in payloads])
+    record_posted_entries(db, [entry for entry in inserted if entry is not None])
+    db.commit()
+
+    ids = [entry.id for entry in inserted if entry is not None]
+    originals = find_idempotent_entries(
+        db, {(p.account_id, p.idempotency_key) for p, entry in zip(payloads, inserted) if entry is None}
     )
+    if ids:
+        # reload everything the commit expired in one query rather than one refresh per entry
+        db.query(LedgerEntry).filter(LedgerEntry.id.in_(ids)).all()
+    return [
+        (entry, True) if entry is not None else (originals[(p.account_id, p.idempotency_key)], False)
+        for p, entry in zip(payloads, inserted)
+    ]
 
 
-def get_account_balance(db: Session, account_id: int, currency: str = "USD") -> Decimal:
-    account_ids = [account_id]
-    account = db.query(Account).filter(Account.id == account_id).first()
-    if account and account.account_type == "trust":
-        child_ids = [
-            row.id
-            for row in db.query(Account.id)
-            .filter(Account.parent_account_id == account_id)
-            .all()
-        ]
-        account_ids.extend(child_ids)
+def month_key(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m")
+
+
+def _increment_row(db: Session, model, keys: dict, deltas: dict, values: dict | None = None) -> None:
+    """Atomically add deltas to the row identified by keys, creating it on first use."""
+    values = values or {}
 
+    def bump() -> int:
+        query = db.query(model)
+        for name, value in keys.items():
+            query = query.filter(getattr(model, name) == value)
+        changes = {getattr(model, name): getattr(model, name) + value for name, value in deltas.items()}
+        changes.update({getattr(model, name): value for name, value in values.items()})
+        return query.update(changes, synchronize_session=False)
+
+    if bump():
+        return
+    try:
+        with db.begin_nested():
+            db.add(model(**keys, **deltas, **values))
+    except IntegrityError:
+        # another transaction created the row first
+        bump()
+
+
+def record_posted_entries(db: Session, entries: list[LedgerEntry]) -> None:
+    """
+    Fold flushed ledger entries into their account_balances snapshots and monthly rollups.
+    Deltas are summed per row first, so a batch costs one update per touched account/month.
+    Runs inside the caller's transaction so both commit (or roll back) with the entries.
+    """
+    zero = Decimal("0")
+    balances: dict[tuple, dict] = {}
+    rollups: dict[tuple, dict[str, Decimal]] = {}
+    for entry in entries:
+        if entry.status != "posted":
+            continue
+        amount = Decimal(str(entry.amount))
+        credit = amount if entry.direction == "credit" else zero
+        debit = amount if entry.direction == "debit" else zero
+        is_transfer = entry.entry_type == "transfer"
+
+        balance = balances.setdefault(
+            (entry.account_id, entry.currency), {"credits": zero, "debits": zero, "last_entry_id": entry.id}
+        )
+        balance["credits"] += credit
+        balance["debits"] += debit
+        balance["last_entry_id"] = max(balance["last_entry_id"], entry.id)
+
+        rollup = rollups.setdefault(
+            (entry.account_id, entry.currency, month_key(entry.created_at)),
+            {"credits": zero, "debits": zero, "transfers_in": zero, "transfers_out": zero},
+        )
+        rollup["credits"] += credit
+        rollup["debits"] += debit
+        if is_transfer:
+            rollup["transfers_in"] += credit
+            rollup["transfers_out"] += debit
+
+    for (account_id, currency), totals in balances.items():
+        _increment_row(
+            db,
+            AccountBalance,
+            {"account_id": account_id, "currency": currency},
+            {"credits": totals["credits"], "debits": totals["debits"]},
+            {"last_entry_id": totals["last_entry_id"]},
+        )
+    for (account_id, currency, month), totals in rollups.items():
+        _increment_row(
+            db,
+            AccountMonthlyRollup,
+            {"account_id": account_id, "currency": currency, "month": month},
+            totals,
+        )
+
+
+def reconcile_account_balances(db: Session, repair: bool = True) -> list[dict]:
+    """
+    Recompute every snapshot from the raw ledger and return the rows that drifted.
+    With repair=True the snapshots are rewritten to match the ledger.
+    """
     credit_sum = func.coalesce(
         func.sum(case((LedgerEntry.direction == "credit", LedgerEntry.amount), else_=0)),
         0,
@@ -76,16 +234,147 @@ def get_account_balance(db: Session, account_id: int, currency: str = "USD") ->
         func.sum(case((LedgerEntry.direction == "debit", LedgerEntry.amount), else_=0)),
         0,
     )
+    expected = {
+        (row.account_id, row.currency): row
+        for row in db.query(
+            LedgerEntry.account_id,
+            LedgerEntry.currency,
+            credit_sum.label("credits"),
+            debit_sum.label("debits"),
+            func.max(LedgerEntry.id).label("last_entry_id"),
+        )
+        .filter(LedgerEntry.status == "posted")
+        .group_by(LedgerEntry.account_id, LedgerEntry.currency)
+        .all()
+    }
+    recorded = {(snap.account_id, snap.currency): snap for snap in db.query(AccountBalance).all()}
 
-    row = (
-        db.query(credit_sum.label("credits"), debit_sum.label("debits"))
-        .filter(
-            LedgerEntry.account_id.in_(account_ids),
-            LedgerEntry.status == "posted",
-            LedgerEntry.currency == currency,
+    drift = []
+    for key in sorted(set(expected) | set(recorded), key=lambda k: (k[0], k[1] or "")):
+        row = expected.get(key)
+        snap = recorded.get(key)
+        want_credits = Decimal(str(row.credits)) if row else Decimal("0")
+        want_debits = Decimal(str(row.debits)) if row else Decimal("0")
+        have_credits = Decimal(str(snap.credits)) if snap else Decimal("0")
+        have_debits = Decimal(str(snap.debits)) if snap else Decimal("0")
+        if row is not None and snap is not None and (want_credits, want_debits) == (have_credits, have_debits):
+            continue
+        drift.append(
+            {
+                "account_id": key[0],
+                "currency": key[1],
+                "expected": want_credits - want_debits,
+                "recorded": have_credits - have_debits,
+            }
         )
-        .first()
+        if not repair:
+            continue
+        if row is None:
+            db.delete(snap)
+        elif snap is None:
+            db.add(
+                AccountBalance(
+                    account_id=key[0],
+                    currency=key[1],
+                    credits=want_credits,
+                    debits=want_debits,
+                    last_entry_id=row.last_entry_id,
+                )
+            )
+        else:
+            snap.credits = want_credits
+            snap.debits = want_debits
+            snap.last_entry_id = row.last_entry_id
+
+    if repair and drift:
+        db.commit()
+    return drift
+
+
+def rebuild_monthly_rollups(db: Session) -> int:
+    """Recompute account_monthly_rollups from the raw ledger. Returns the number of rollup rows written."""
+    zero = Decimal("0")
+    totals: dict[tuple[int, str, str], dict[str, Decimal]] = {}
+    rows = (
+        db.query(
+            LedgerEntry.account_id,
+            LedgerEntry.currency,
+            LedgerEntry.created_at,
+            LedgerEntry.direction,
+            LedgerEntry.entry_type,
+            LedgerEntry.amount,
+        )
+        .filter(LedgerEntry.status == "posted")
+        .yield_per(1000)
     )
+    for row in rows:
+        key = (row.account_id, row.currency, month_key(row.created_at))
+        bucket = totals.setdefault(
+            key, {"credits": zero, "debits": zero, "transfers_in": zero, "transfers_out": zero}
+        )
+        amount = Decimal(str(row.amount))
+        side = "credits" if row.direction == "credit" else "debits"
+        bucket[side] += amount
+        if row.entry_type == "transfer":
+            bucket["transfers_in" if side == "credits" else "transfers_out"] += amount
+
+    db.query(AccountMonthlyRollup).delete()
+    db.add_all(
+        AccountMonthlyRollup(account_id=account_id, currency=currency, month=month, **bucket)
+        for (account_id, currency, month), bucket in totals.items()
+    )
+    db.commit()
+    return len(totals)
+
+
+def list_ledger_entries(
+    db: Session,
+    account_id: int,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: tuple[datetime, int] | None = None,
+    include_subtree: bool = False,
+) -> list[LedgerEntry]:
+    """
+    Newest-first page of an account's entries (with include_subtree, of every account nested
+    under it too).
+    With a cursor (the last (created_at, id) seen) the page is a keyset range scan on
+    ix_ledger_account_created_at and offset is ignored; a cursor row from outside this
+    listing raises ValueError.
+    """
+    query = db.query(LedgerEntry)
+    if include_subtree:
+        query = query.join(AccountClosure, AccountClosure.descendant_id == LedgerEntry.account_id).filter(
+            AccountClosure.ancestor_id == account_id
+        )
+    else:
+        query = query.filter(LedgerEntry.account_id == account_id)
+    if cursor is not None:
+        query = keyset_window(
+            query, LedgerEntry.created_at, LedgerEntry.id, cursor_pivot(query, LedgerEntry, cursor), cursor[1]
+        )
+    else:
+        query = query.order_by(LedgerEntry.created_at.desc(), LedgerEntry.id.desc()).offset(offset)
+    return query.limit(limit).all()
+
+
+def get_account_balance(db: Session, account_id: int, currency: str = "USD") -> Decimal:
+    """
+    The account's balance from its AccountBalance snapshot. A trust account's balance covers
+    its whole subtree, summed in one join through account_closure.
+    """
+    query = db.query(
+        func.coalesce(func.sum(AccountBalance.credits), 0).label("credits"),
+        func.coalesce(func.sum(AccountBalance.debits), 0).label("debits"),
+    ).filter(AccountBalance.currency == currency)
+    account = db.query(Account).filter(Account.id == account_id).first()
+    if account and account.account_type == "trust":
+        query = query.join(AccountClosure, AccountClosure.descendant_id == AccountBalance.account_id).filter(
+            AccountClosure.ancestor_id == account_id
+        )
+    else:
+        query = query.filter(AccountBalance.account_id == account_id)
+    row = query.first()
 
     credits = Decimal(str(row.credits or 0))
     debits = Decimal(str(row.debits or 0))
@@ -129,6 +418,8 @@ def create_transfer(
     )
     db.add(debit)
     db.add(credit)
+    db.flush()
+    record_posted_entries(db, [debit, credit])
     db.commit()
     db.refresh(debit)
     db.refresh(credit)
@@ -1,15 +1,26 @@
 # app/crud/crud_scheduled_entry.py
 
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
+import logging
+import time
+import uuid
+
+from sqlalchemy import insert, select, or_, func
 from sqlalchemy.orm import Session
 
 from app.models.scheduled_entry import ScheduledEntry
 from app.models.ledger import LedgerEntry
 from app.models.account import Account
 from app.models.user import User
+from app.crud.crud_ledger import record_posted_entries
 from app.services.email import send_ledger_post_email
 from app.schemas.scheduled_entry import ScheduledEntryCreate
 
+logger = logging.getLogger(__name__)
+
+POST_BATCH_SIZE = 500
+CLAIM_LEASE_SECONDS = 300
+
 
 def create_scheduled_entry(
     db: Session, created_by_user_id: int, payload: ScheduledEntryCreate
@@ -41,48 +52,147 @@ def list_scheduled_entries(
     return query.order_by(ScheduledEntry.scheduled_for.asc()).all()
 
 
-def post_due_entries(db: Session) -> int:
-    now = datetime.now(UTC)
-    due = (
+def _due_filter(now: datetime):
+    return (
+        ScheduledEntry.status == "pending",
+        ScheduledEntry.scheduled_for <= now,
+        or_(ScheduledEntry.claimed_until.is_(None), ScheduledEntry.claimed_until < now),
+    )
+
+
+def claim_due_entries(db: Session, now: datetime, batch_size: int = POST_BATCH_SIZE) -> list[ScheduledEntry]:
+    """
+    Claim up to batch_size due entries for this worker.
+    Postgres row-locks them with FOR UPDATE SKIP LOCKED for the rest of the transaction; other
+    databases get a committed lease (claim_token/claimed_until) that expires if the worker dies.
+    """
+    ordering = (ScheduledEntry.scheduled_for.asc(), ScheduledEntry.id.asc())
+    if db.get_bind().dialect.name == "postgresql":
+        return (
+            db.query(ScheduledEntry)
+            .filter(*_due_filter(now))
+            .order_by(*ordering)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    token = uuid.uuid4().hex
+    candidates = select(ScheduledEntry.id).where(*_due_filter(now)).order_by(*ordering).limit(batch_size)
+    claimed = (
+        db.query(ScheduledEntry)
+        .filter(ScheduledEntry.id.in_(candidates.scalar_subquery()), *_due_filter(now))
+        .update(
+            {
+                ScheduledEntry.claim_token: token,
+                ScheduledEntry.claimed_until: now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not claimed:
+        return []
+    return (
         db.query(ScheduledEntry)
-        .filter(ScheduledEntry.status == "pending", ScheduledEntry.scheduled_for <= now)
-        .order_by(ScheduledEntry.scheduled_for.asc())
+        .filter(ScheduledEntry.claim_token == token, ScheduledEntry.status == "pending")
+        .order_by(*ordering)
         .all()
     )
+
+
+def next_scheduled_for(db: Session, now: datetime) -> datetime | None:
+    """Earliest scheduled_for among pending entries nobody currently holds a lease on."""
+    return (
+        db.query(func.min(ScheduledEntry.scheduled_for))
+        .filter(
+            ScheduledEntry.status == "pending",
+            or_(ScheduledEntry.claimed_until.is_(None), ScheduledEntry.claimed_until < now),
+        )
+        .scalar()
+    )
+
+
+def post_due_entries(db: Session, batch_size: int = POST_BATCH_SIZE) -> int:
+    """
+    Post every due scheduled entry, claiming them in chunks of batch_size.
+    Safe to run from several workers at once: each chunk is claimed before it is posted.
+    Each chunk is one bulk ledger insert, one account query, one user query and one commit;
+    notification emails go into the outbox in the same transaction as the postings.
+    """
+    now = datetime.now(UTC)
+    started = time.perf_counter()
     count = 0
-    for entry in due:
-        ledger = LedgerEntry(
-            account_id=entry.account_id,
-            created_by_user_id=entry.created_by_user_id,
-            direction=entry.direction,
-            amount=entry.amount,
-            currency=entry.currency,
-            entry_type=entry.entry_type,
-            status="posted",
-            reference=entry.reference,
-            memo=entry.memo,
-            meta={"source": "scheduled", "scheduled_entry_id": entry.id},
+    while True:
+        due = claim_due_entries(db, now, batch_size)
+        if not due:
+            break
+        notifications = _post_batch(db, due, now)
+        for args in notifications:
+            send_ledger_post_email(*args, db=db)
+        db.commit()
+        count += len(due)
+        if len(due) < batch_size:
+            break
+
+    if count:
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Posted %s scheduled entries in %.2fs (%.1f entries/s)",
+            count,
+            elapsed,
+            count / elapsed if elapsed > 0 else float(count),
         )
-        db.add(ledger)
-        db.flush()
+    return count
+
+
+def _post_batch(db: Session, due: list[ScheduledEntry], now: datetime) -> list[tuple]:
+    ledgers = db.scalars(
+        insert(LedgerEntry).returning(LedgerEntry, sort_by_parameter_order=True),
+        [
+            {
+                "account_id": entry.account_id,
+                "created_by_user_id": entry.created_by_user_id,
+                "direction": entry.direction,
+                "amount": entry.amount,
+                "currency": entry.currency,
+                "entry_type": entry.entry_type,
+                "status": "posted",
+                "reference": entry.reference,
+                "memo": entry.memo,
+                "meta": {"source": "scheduled", "scheduled_entry_id": entry.id},
+            }
+            for entry in due
+        ],
+    ).all()
+    record_posted_entries(db, ledgers)
+
+    accounts = {
+        account.id: account
+        for account in db.query(Account).filter(Account.id.in_({entry.account_id for entry in due}))
+    }
+    users = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_({entry.created_by_user_id for entry in due}))
+    }
+
+    notifications = []
+    for entry, ledger in zip(due, ledgers):
         entry.status = "posted"
         entry.posted_at = now
         entry.posted_entry_id = ledger.id
-        count += 1
 
-        account = db.query(Account).filter(Account.id == entry.account_id).first()
-        user = db.query(User).filter(User.id == entry.created_by_user_id).first()
+        account = accounts.get(entry.account_id)
+        user = users.get(entry.created_by_user_id)
         if account and user and user.email_verified:
-            amount_str = f"{ledger.amount:.2f} {ledger.currency}"
-            send_ledger_post_email(
-                user.email,
-                account.name,
-                ledger.direction,
-                amount_str,
-                "scheduled movement",
-                f"/dashboard/activity/{ledger.id}",
+            notifications.append(
+                (
+                    user.email,
+                    account.name,
+                    ledger.direction,
+                    f"{ledger.amount:.2f} {ledger.currency}",
+                    "scheduled movement",
+                    f"/dashboard/activity/{ledger.id}",
+                )
             )
-
-    if count:
-        db.commit()
-    return count
+    return notifications
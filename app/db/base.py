@@ -5,9 +5,16 @@ from app.db.session import Base  # Base lives in session.py
 
 # Import models to register them (do not use these imports elsewhere)
 from app.models.user import User
-from app.models.account import Account
-from app.models.ledger import LedgerEntry
+from app.models.account import Account, AccountClosure
+from app.models.ledger import (
+    LedgerEntry,
+    AccountBalance,
+    AccountMonthlyRollup,
+    LedgerImport,
+    LedgerImportError,
+)
 from app.models.subscriber import EmailSubscriber
+from app.models.email_outbox import EmailOutbox, EmailDigestItem, EmailSendCounter
 from app.models.scheduled_entry import ScheduledEntry
 from app.models.ether import (
     Profile,
@@ -20,7 +27,10 @@ from app.models.ether import (
     EtherThreadMember,
     EtherMessage,
     EtherSyncRequest,
+    EtherSyncEdge,
+    EtherTimelineEntry,
 )
+from app.models.media import UploadedImage
 from app.models.pwa import PwaEvent
 from app.models.journal import JournalEntry
 from app.models.affirmation import AffirmationEntry
@@ -90,6 +90,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Newer-Cursor"],
 )
 
 @app.get("/health")
@@ -101,9 +102,24 @@ def health_check():
     }
 
 
+@app.on_event("startup")
+async def fit_password_hashing():
+    from app.core.security import fit_password_hash_pool
+
+    fit_password_hash_pool()
+
+
 @app.on_event("startup")
 async def start_scheduler():
-    from app.services.scheduler import schedule_loop
+    from app.services.scheduler import schedule_loop, email_dispatch_loop
     import asyncio
 
     asyncio.create_task(schedule_loop())
+    asyncio.create_task(email_dispatch_loop())
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    from app.services.avatar_proxy import close_avatar_client
+
+    await close_avatar_client()
@@ -41,3 +41,17 @@ class Account(Base):
     )
 
     parent = relationship("Account", remote_side=[id], backref="children")
+
+
+class AccountClosure(Base):
+    """
+    Every (ancestor, descendant) pair in the parent_account_id tree, with each account also
+    its own ancestor at depth 0, so any subtree is one indexed lookup on ancestor_id.
+    Maintained by crud_account (create, move, delete).
+    """
+
+    __tablename__ = "account_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
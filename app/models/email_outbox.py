@@ -0,0 +1,84 @@
+# app/models/email_outbox.py
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+
+from app.db.session import Base
+
+
+class EmailOutbox(Base):
+    """Outbound email waiting for (or done with) the background dispatcher in app.services.email."""
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    reply_to = Column(String, nullable=True)
+
+    status = Column(String, nullable=False, default="pending")  # pending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(String, nullable=True)
+    provider_id = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # lease used to claim rows on databases without SELECT ... SKIP LOCKED
+    claim_token = Column(String, nullable=True)
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+
+class EmailDigestItem(Base):
+    """
+    A pending chat/comment notification for one recipient, coalesced by dedup_key (one row per
+    thread or post) until app.services.email_digest flushes the recipient's items as one email.
+    """
+
+    __tablename__ = "email_digest_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    kind = Column(String, nullable=False)  # myline | comment
+    dedup_key = Column(String, nullable=False)  # e.g. thread:12, post:34
+    actor_name = Column(String, nullable=True)
+    preview = Column(Text, nullable=True)
+    link_id = Column(Integer, nullable=True)  # thread id or post id
+    detail_id = Column(Integer, nullable=True)  # latest comment id for comment items
+    count = Column(Integer, nullable=False, default=1, server_default="1")
+
+    status = Column(String, nullable=False, default="pending")  # pending | flushing
+    first_at = Column(DateTime(timezone=True), nullable=False)
+    last_at = Column(DateTime(timezone=True), nullable=False)
+    flush_token = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_digest_items_recipient_key", "to_email", "dedup_key", "status"),
+        Index("ix_email_digest_items_status_first_at", "status", "first_at"),
+        # partial: at most one pending row per recipient and key; rows being flushed don't
+        # conflict. See email_digest.queue_notification_email
+        Index(
+            "uq_email_digest_items_pending_key",
+            "to_email",
+            "dedup_key",
+            unique=True,
+            postgresql_where=status == "pending",
+            sqlite_where=status == "pending",
+        ),
+    )
+
+
+class EmailSendCounter(Base):
+    """Emails sent per Resend account per UTC day, shared by every worker for the daily cap guard."""
+
+    __tablename__ = "email_send_counters"
+
+    account = Column(String, primary_key=True)  # primary
+    day = Column(String, primary_key=True)  # YYYY-MM-DD (UTC)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,6 +1,6 @@
 # app/models/ether.py
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, func, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -15,8 +15,12 @@ class Profile(Base):
     bio = Column(Text, nullable=True)
     links = Column(Text, nullable=True)
     avatar_url = Column(String, nullable=True)
+    # small derivative of avatar_url for feeds; see app.services.images
+    avatar_thumb_url = Column(String, nullable=True)
     is_public = Column(Boolean, default=True, nullable=False)
     sync_requires_approval = Column(Boolean, default=True, nullable=False)
+    # number of approved syncs, kept in step with ether_sync_edges
+    sync_count = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user = relationship("User", backref="profile")
@@ -30,10 +34,21 @@ class EtherPost(Base):
     kind = Column(String, nullable=False, default="post")  # post | win | manifestation
     content = Column(Text, nullable=False)
     image_url = Column(String, nullable=True)
+    # derivatives of image_url for feeds and the full-size view; see app.services.images
+    image_medium_url = Column(String, nullable=True)
+    image_full_url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # denormalized from ether_likes / ether_comments; see app.services.ether_counters
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     author = relationship("Profile", foreign_keys=[author_profile_id])
 
+    __table_args__ = (
+        Index("ix_ether_posts_created_at_id", "created_at", "id"),
+        Index("ix_ether_posts_author_created_at_id", "author_profile_id", "created_at", "id"),
+    )
+
 
 class EtherComment(Base):
     __tablename__ = "ether_comments"
@@ -43,6 +58,8 @@ class EtherComment(Base):
     author_profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=False, index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # denormalized from ether_comment_likes; see app.services.ether_counters
+    align_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     post = relationship("EtherPost", foreign_keys=[post_id])
     author = relationship("Profile", foreign_keys=[author_profile_id])
@@ -128,6 +145,35 @@ class EtherSyncRequest(Base):
     )
 
 
+class EtherSyncEdge(Base):
+    """One row per direction of an approved sync, so partner lookups are a single index range."""
+
+    __tablename__ = "ether_sync_edges"
+
+    profile_id = Column(Integer, ForeignKey("profiles.id"), primary_key=True)
+    partner_profile_id = Column(Integer, ForeignKey("profiles.id"), primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # profile_id's inbox holds every post by partner_profile_id created after this; older ones
+    # were cut off by the INBOX_BACKFILL_POSTS limit. NULL when the backfill copied them all.
+    inbox_complete_after = Column(DateTime(timezone=True), nullable=True)
+
+
+class EtherTimelineEntry(Base):
+    """Fan-out-on-write timeline inbox: posts by a profile's sync partners."""
+
+    __tablename__ = "ether_timeline_entries"
+
+    profile_id = Column(Integer, ForeignKey("profiles.id"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("ether_posts.id"), primary_key=True, index=True)
+    author_profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_ether_timeline_profile_created_at", "profile_id", "created_at", "post_id"),
+        Index("ix_ether_timeline_profile_author", "profile_id", "author_profile_id"),
+    )
+
+
 class EtherThread(Base):
     __tablename__ = "ether_threads"
 
@@ -40,6 +40,8 @@ class LedgerEntry(Base):
 
     # ✅ renamed from "metadata" to "meta" (metadata is reserved by SQLAlchemy)
     meta = Column(JSON, nullable=True)
+    # copy of meta["kind"] so quota/activity queries can use a B-tree index
+    kind = Column(String, nullable=True)
 
     is_reversal = Column(Boolean, default=False)
     reversed_entry_id = Column(Integer, ForeignKey("ledger_entries.id"), nullable=True)
@@ -52,5 +54,78 @@ class LedgerEntry(Base):
 
     __table_args__ = (
         Index("ix_ledger_account_created_at", "account_id", "created_at"),
-        Index("ix_ledger_account_idempotency", "account_id", "idempotency_key", unique=False),
+        # partial: entries without a key never conflict; see crud_ledger.insert_ledger_entries
+        Index(
+            "uq_ledger_account_idempotency",
+            "account_id",
+            "idempotency_key",
+            unique=True,
+            postgresql_where=idempotency_key.isnot(None),
+            sqlite_where=idempotency_key.isnot(None),
+        ),
+        Index("ix_ledger_user_kind_created_at", "created_by_user_id", "kind", "created_at"),
     )
+
+    # fetch created_at on insert so balance/rollup maintenance doesn't need a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class AccountBalance(Base):
+    """Running per-account, per-currency totals of posted ledger entries."""
+
+    __tablename__ = "account_balances"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    currency = Column(String, primary_key=True, default="USD")
+
+    credits = Column(Numeric(18, 2), nullable=False, default=0)
+    debits = Column(Numeric(18, 2), nullable=False, default=0)
+    last_entry_id = Column(Integer, ForeignKey("ledger_entries.id"), nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class AccountMonthlyRollup(Base):
+    """Per-account, per-currency, per-month totals of posted ledger entries (month is "YYYY-MM", UTC)."""
+
+    __tablename__ = "account_monthly_rollups"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    currency = Column(String, primary_key=True, default="USD")
+    month = Column(String(7), primary_key=True)
+
+    credits = Column(Numeric(18, 2), nullable=False, default=0)
+    debits = Column(Numeric(18, 2), nullable=False, default=0)
+    transfers_in = Column(Numeric(18, 2), nullable=False, default=0)
+    transfers_out = Column(Numeric(18, 2), nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class LedgerImport(Base):
+    """One streamed CSV/NDJSON ledger import; counters advance as each chunk commits."""
+
+    __tablename__ = "ledger_imports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    format = Column(String, nullable=False)  # csv | ndjson
+    status = Column(String, nullable=False, default="running")  # running | completed | failed
+    rows_processed = Column(Integer, nullable=False, default=0)
+    created_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    detail = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class LedgerImportError(Base):
+    __tablename__ = "ledger_import_errors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    import_id = Column(Integer, ForeignKey("ledger_imports.id"), nullable=False, index=True)
+    row_number = Column(Integer, nullable=False)
+    error = Column(String, nullable=False)
+    raw = Column(String, nullable=True)
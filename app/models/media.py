@@ -0,0 +1,24 @@
+# app/models/media.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+
+from app.db.session import Base
+
+
+class UploadedImage(Base):
+    """
+    The resized, metadata-free derivatives of an upload (the original is never stored).
+    url is the full derivative, and width/height are its dimensions.
+    """
+
+    __tablename__ = "uploaded_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, nullable=False, unique=True, index=True)
+    owner_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    thumb_url = Column(String, nullable=False)
+    medium_url = Column(String, nullable=False)
+    full_url = Column(String, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
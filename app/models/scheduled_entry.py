@@ -1,6 +1,6 @@
 # app/models/scheduled_entry.py
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -27,5 +27,13 @@ class ScheduledEntry(Base):
     posted_at = Column(DateTime(timezone=True), nullable=True)
     posted_entry_id = Column(Integer, ForeignKey("ledger_entries.id"), nullable=True)
 
+    # lease used to claim rows on databases without SELECT ... SKIP LOCKED
+    claim_token = Column(String, nullable=True)
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+
     account = relationship("Account", foreign_keys=[account_id])
     created_by = relationship("User", foreign_keys=[created_by_user_id])
+
+    __table_args__ = (
+        Index("ix_scheduled_entries_status_scheduled_for", "status", "scheduled_for"),
+    )
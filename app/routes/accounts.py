@@ -11,6 +11,8 @@ from app.crud.crud_account import (
     list_accounts_for_user,
     get_account,
     update_account_name,
+    move_account,
+    is_in_subtree,
     delete_account,
 )
 from app.services.tier import is_premium, TIER_NAME
@@ -78,10 +80,26 @@ def update_account(
 ):
     account = get_account(db, account_id)
     ensure_access(account, current_user)
+    fields = payload.model_fields_set
     name = payload.name.strip() if payload.name else ""
-    if not name:
+    if ("name" in fields or "parent_account_id" not in fields) and not name:
         raise HTTPException(status_code=400, detail="Account name required")
-    return update_account_name(db, account, name)
+
+    parent_id = payload.parent_account_id
+    if "parent_account_id" in fields and parent_id != account.parent_account_id:
+        if parent_id:
+            parent = get_account(db, parent_id)
+            if not parent:
+                raise HTTPException(status_code=404, detail="Parent account not found")
+            ensure_access(parent, current_user)
+            if parent.account_type != "trust":
+                raise HTTPException(status_code=400, detail="Parent must be a trust account")
+            if is_in_subtree(db, account.id, parent_id):
+                raise HTTPException(status_code=400, detail="An account can't be moved under itself")
+        return move_account(db, account, parent_id, name=name)
+    if name:
+        account = update_account_name(db, account, name)
+    return account
 
 
 @router.delete("/accounts/{account_id}")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.core.security import require_role
+from app.core.security import require_role, password_hash_stats
 from app.db.session import get_db
 from app.models.subscriber import EmailSubscriber
 
@@ -12,6 +12,11 @@ def admin_heartbeat(admin=Depends(require_role("admin"))):
     return {"status": "Admin access confirmed"}
 
 
+@router.get("/admin/metrics")
+def admin_metrics(admin=Depends(require_role("admin"))):
+    return {"password_hashing": password_hash_stats()}
+
+
 @router.get("/admin/email-subscribers")
 def list_email_subscribers(
     db: Session = Depends(get_db),
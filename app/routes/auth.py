@@ -62,6 +62,8 @@ from app.services.email import (
 from app.services.moderation import moderate_text, validate_username
 from app.legal.content import TERMS_HASH, PRIVACY_HASH
 from app.services.ether_welcome import ensure_welcome_message
+from app.services.ether_graph import add_sync_edge
+from app.services.profile_cache import invalidate_profile
 from jose import JWTError, jwt
 
 router = APIRouter(tags=["auth"])  # no prefix
@@ -170,6 +172,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
                 status="approved",
             )
             db.add(sync_request)
+            add_sync_edge(db, profile.id, admin_profile.id)
             db.commit()
     ensure_welcome_message(db, profile)
     ensure_subscriber(db, user.email, source="register")
@@ -284,6 +287,7 @@ def google_callback(code: str, state: str, db: Session = Depends(get_db)):
                     status="approved",
                 )
                 db.add(sync_request)
+                add_sync_edge(db, profile.id, admin_profile.id)
                 db.commit()
 
         ensure_subscriber(db, email, source="google_register")
@@ -473,6 +477,8 @@ def update_username(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    profile = db.query(Profile.id).filter(Profile.user_id == current_user.id).first()
+    invalidate_profile(profile.id if profile else None, current_user.id)
     return current_user
 
 
@@ -11,6 +11,7 @@ from app.crud.crud_user import create_user, get_user_by_email, get_user_by_usern
 from app.db.session import get_db
 from app.models.ether import EtherSyncRequest, Profile
 from app.models.user import User
+from app.services.ether_graph import add_sync_edge
 
 router = APIRouter(prefix="/dev", tags=["dev"])
 
@@ -92,6 +93,7 @@ def seed_user(
                 status="approved",
             )
             db.add(sync_request)
+            add_sync_edge(db, profile.id, admin_profile.id)
             db.commit()
 
     return {
@@ -150,6 +152,7 @@ def sync_all_profiles(
         if existing_sync:
             if existing_sync.status != "approved":
                 existing_sync.status = "approved"
+                add_sync_edge(db, profile.id, admin_profile.id)
                 updated += 1
             continue
         db.add(
@@ -159,6 +162,7 @@ def sync_all_profiles(
                 status="approved",
             )
         )
+        add_sync_edge(db, profile.id, admin_profile.id)
         created += 1
 
     if created or updated:
@@ -1,10 +1,9 @@
 # app/routes/ether.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response, Query, Header
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, or_, and_, select
 from datetime import datetime
-import io
 
 from app.db.session import get_db
 from app.core.security import get_current_user, get_verified_user
@@ -40,16 +39,36 @@ from app.schemas.ether import (
     EtherSyncRequestRead,
     EtherNotificationRead,
 )
-from app.services.r2 import upload_bytes, build_key
-from app.services.moderation import moderate_avatar_image_bytes, moderate_image_bytes, moderate_text
-from app.services.email import send_myline_message_email, send_post_comment_email
+from app.services.r2 import read_capped, UploadTooLarge
+from app.services.images import ImageAsset, ImageRejected, image_urls, store_image, variants_for
+from app.services.moderation import moderate_avatar_image_asset, moderate_image_asset, moderate_text
+from app.services.email_digest import queue_notification_email
+from app.services.avatar_proxy import (
+    AvatarFetchError,
+    cache_headers,
+    etag_matches,
+    fetch_avatar,
+    not_modified_since,
+)
+from app.services.ether_counters import bump_counter
+from app.services.profile_cache import cached_profile_for_user, remember_profile, profile_cards, invalidate_profile
+from app.core.pagination import encode_cursor, decode_cursor, cursor_pivot, keyset_window
+from app.services.ether_graph import (
+    add_sync_edge,
+    remove_sync_edge,
+    fan_out_post,
+    is_synced,
+    remove_post_from_timelines,
+    sync_partner_ids,
+    timeline_posts,
+)
 from app.core.config import settings
 
-from urllib.request import urlopen
 from urllib.parse import urlparse
 
 router = APIRouter(tags=["ether"], dependencies=[Depends(get_verified_user)])
 MAX_IMAGE_BYTES = 5 * 1024 * 1024
+POST_PAGE_MAX = 100
 
 
 def _find_direct_thread_ids(db: Session, profile_a_id: int, profile_b_id: int) -> list[int]:
@@ -75,6 +94,65 @@ def _find_direct_thread_ids(db: Session, profile_a_id: int, profile_b_id: int) -
     return [row.thread_id for row in threads]
 
 
+def _approved_sync_requests(db: Session, profile_a_id: int, profile_b_id: int):
+    """Approved sync requests between two profiles, in either direction."""
+    return db.query(EtherSyncRequest).filter(
+        EtherSyncRequest.status == "approved",
+        or_(
+            and_(
+                EtherSyncRequest.requester_profile_id == profile_a_id,
+                EtherSyncRequest.target_profile_id == profile_b_id,
+            ),
+            and_(
+                EtherSyncRequest.requester_profile_id == profile_b_id,
+                EtherSyncRequest.target_profile_id == profile_a_id,
+            ),
+        ),
+    )
+
+
+def _post_cursors(before: str | None, after: str | None):
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    try:
+        return (
+            decode_cursor(before) if before else None,
+            decode_cursor(after) if after else None,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _post_page(query, limit: int, before, after) -> list[EtherPost]:
+    """Keyset page over (created_at, id); fetches one extra row so callers can tell if more exist."""
+    cursor = after or before
+    if cursor is not None:
+        try:
+            pivot = cursor_pivot(query, EtherPost, cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = keyset_window(query, EtherPost.created_at, EtherPost.id, pivot, cursor[1], after is not None)
+    else:
+        query = query.order_by(EtherPost.created_at.desc(), EtherPost.id.desc())
+    return query.limit(limit + 1).all()
+
+
+def _finish_post_page(posts: list[EtherPost], limit: int, newer: bool, response: Response) -> list[EtherPost]:
+    """
+    Trim the extra row and advertise where the next page starts: X-Next-Cursor for older
+    posts, X-Newer-Cursor when an `after` page didn't reach the newest post yet.
+    Always returns newest first.
+    """
+    if len(posts) > limit:
+        posts = posts[:limit]
+        last = posts[-1]
+        header = "X-Newer-Cursor" if newer else "X-Next-Cursor"
+        response.headers[header] = encode_cursor(last.created_at, last.id)
+    if newer:
+        posts.reverse()
+    return posts
+
+
 def _ensure_safe_text(text: str | None) -> None:
     ok, reason = moderate_text(text)
     if not ok:
@@ -89,7 +167,7 @@ def get_or_create_profile(db: Session, user) -> Profile:
 
 
 def get_or_create_profile_for_user(db: Session, user) -> Profile:
-    profile = db.query(Profile).filter(Profile.user_id == user.id).first()
+    profile = cached_profile_for_user(db, user.id)
     if profile:
         return profile
     display = user.username or user.email.split("@")[0]
@@ -97,6 +175,7 @@ def get_or_create_profile_for_user(db: Session, user) -> Profile:
     db.add(profile)
     db.commit()
     db.refresh(profile)
+    remember_profile(profile)
     return profile
 
 
@@ -127,6 +206,8 @@ def update_profile(
         profile.links = payload.links
     if payload.avatar_url is not None:
         profile.avatar_url = payload.avatar_url
+        variants = variants_for(db, payload.avatar_url)
+        profile.avatar_thumb_url = variants.thumb_url if variants else None
     if payload.is_public is not None:
         profile.is_public = payload.is_public
     if payload.sync_requires_approval is not None:
@@ -134,21 +215,24 @@ def update_profile(
     db.add(profile)
     db.commit()
     db.refresh(profile)
+    invalidate_profile(profile.id, profile.user_id)
     return profile
 
 
 @router.get("/ether/feed", response_model=list[EtherPostRead])
 def feed(
+    response: Response,
+    limit: int = 50,
+    before: str | None = None,
+    after: str | None = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     profile = get_or_create_profile(db, current_user)
-    posts = (
-        db.query(EtherPost)
-        .order_by(EtherPost.created_at.desc())
-        .limit(50)
-        .all()
-    )
+    limit = max(1, min(limit, POST_PAGE_MAX))
+    before_cursor, after_cursor = _post_cursors(before, after)
+    posts = _post_page(db.query(EtherPost), limit, before_cursor, after_cursor)
+    posts = _finish_post_page(posts, limit, after_cursor is not None, response)
     return build_post_reads(db, posts, profile.id)
 
 
@@ -159,24 +243,7 @@ def build_post_reads(
         return []
 
     post_ids = [p.id for p in posts]
-    like_counts = dict(
-        db.query(EtherLike.post_id, func.count(EtherLike.id))
-        .filter(EtherLike.post_id.in_(post_ids))
-        .group_by(EtherLike.post_id)
-        .all()
-    )
-    comment_counts = dict(
-        db.query(EtherComment.post_id, func.count(EtherComment.id))
-        .filter(EtherComment.post_id.in_(post_ids))
-        .group_by(EtherComment.post_id)
-        .all()
-    )
-
-    author_ids = list({p.author_profile_id for p in posts})
-    authors = {
-        row.id: row
-        for row in db.query(Profile).filter(Profile.id.in_(author_ids)).all()
-    }
+    authors = profile_cards(db, (p.author_profile_id for p in posts))
     liked_by_me: set[int] = set()
     if current_profile_id:
         liked_by_me = {
@@ -198,13 +265,14 @@ def build_post_reads(
                 author_profile_id=post.author_profile_id,
                 kind=post.kind,
                 content=post.content,
-                image_url=post.image_url,
+                image_url=post.image_medium_url or post.image_url,
+                image_full_url=post.image_full_url or post.image_url,
                 created_at=post.created_at,
-                like_count=int(like_counts.get(post.id, 0)),
+                like_count=post.like_count or 0,
                 liked_by_me=post.id in liked_by_me,
-                comment_count=int(comment_counts.get(post.id, 0)),
+                comment_count=post.comment_count or 0,
                 author_display_name=author.display_name if author else None,
-                author_avatar_url=author.avatar_url if author else None,
+                author_avatar_url=author.small_avatar_url if author else None,
             )
         )
     return result
@@ -216,16 +284,8 @@ def build_comment_reads(
     if not comments:
         return []
 
-    profile_ids = {c.author_profile_id for c in comments}
-    profiles = db.query(Profile).filter(Profile.id.in_(profile_ids)).all()
-    profile_map = {p.id: p for p in profiles}
+    profile_map = profile_cards(db, (c.author_profile_id for c in comments))
     comment_ids = [c.id for c in comments]
-    align_counts = dict(
-        db.query(EtherCommentLike.comment_id, func.count(EtherCommentLike.id))
-        .filter(EtherCommentLike.comment_id.in_(comment_ids))
-        .group_by(EtherCommentLike.comment_id)
-        .all()
-    )
     aligned_by_me = set()
     if current_profile_id is not None:
         aligned_by_me = {
@@ -248,10 +308,10 @@ def build_comment_reads(
             author_display_name=profile_map.get(c.author_profile_id).display_name
             if profile_map.get(c.author_profile_id)
             else None,
-            author_avatar_url=profile_map.get(c.author_profile_id).avatar_url
+            author_avatar_url=profile_map.get(c.author_profile_id).small_avatar_url
             if profile_map.get(c.author_profile_id)
             else None,
-            align_count=int(align_counts.get(c.id, 0)),
+            align_count=c.align_count or 0,
             aligned_by_me=c.id in aligned_by_me,
         )
         for c in comments
@@ -264,9 +324,7 @@ def build_notification_reads(
     if not notifications:
         return []
 
-    actor_ids = {n.actor_profile_id for n in notifications}
-    profiles = db.query(Profile).filter(Profile.id.in_(actor_ids)).all()
-    profile_map = {p.id: p for p in profiles}
+    profile_map = profile_cards(db, (n.actor_profile_id for n in notifications))
 
     return [
         EtherNotificationRead(
@@ -281,7 +339,7 @@ def build_notification_reads(
             actor_display_name=profile_map.get(n.actor_profile_id).display_name
             if profile_map.get(n.actor_profile_id)
             else None,
-            actor_avatar_url=profile_map.get(n.actor_profile_id).avatar_url
+            actor_avatar_url=profile_map.get(n.actor_profile_id).small_avatar_url
             if profile_map.get(n.actor_profile_id)
             else None,
         )
@@ -311,49 +369,45 @@ def create_notification(
 
 @router.get("/ether/posts/mine", response_model=list[EtherPostRead])
 def my_posts(
+    response: Response,
+    limit: int = 50,
+    before: str | None = None,
+    after: str | None = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     profile = get_or_create_profile(db, current_user)
-    posts = (
-        db.query(EtherPost)
-        .filter(EtherPost.author_profile_id == profile.id)
-        .order_by(EtherPost.created_at.desc())
-        .limit(50)
-        .all()
+    limit = max(1, min(limit, POST_PAGE_MAX))
+    before_cursor, after_cursor = _post_cursors(before, after)
+    posts = _post_page(
+        db.query(EtherPost).filter(EtherPost.author_profile_id == profile.id),
+        limit,
+        before_cursor,
+        after_cursor,
     )
+    posts = _finish_post_page(posts, limit, after_cursor is not None, response)
     return build_post_reads(db, posts, profile.id)
 
 
 @router.get("/ether/posts/profile/{profile_id}", response_model=list[EtherPostRead])
 def posts_by_profile(
     profile_id: int,
+    response: Response,
+    limit: int = 50,
+    before: str | None = None,
+    after: str | None = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     profile = get_or_create_profile(db, current_user)
+    limit = max(1, min(limit, POST_PAGE_MAX))
+    before_cursor, after_cursor = _post_cursors(before, after)
     target = db.query(Profile).filter(Profile.id == profile_id).first()
     if not target:
         raise HTTPException(status_code=404, detail="Profile not found")
 
     if target.id != profile.id and not target.is_public:
-        approved = (
-            db.query(EtherSyncRequest)
-            .filter(
-                EtherSyncRequest.status == "approved",
-                or_(
-                    and_(
-                        EtherSyncRequest.requester_profile_id == profile.id,
-                        EtherSyncRequest.target_profile_id == target.id,
-                    ),
-                    and_(
-                        EtherSyncRequest.requester_profile_id == target.id,
-                        EtherSyncRequest.target_profile_id == profile.id,
-                    ),
-                ),
-            )
-            .first()
-        )
+        approved = is_synced(db, profile.id, target.id)
         if not approved:
             user = db.query(User).filter(User.id == target.user_id).first()
             display = (user.username if user else None) or (user.email if user else None) or target.display_name
@@ -368,49 +422,33 @@ def posts_by_profile(
                 created_at=target.created_at,
             )
 
-    posts = (
-        db.query(EtherPost)
-        .filter(EtherPost.author_profile_id == target.id)
-        .order_by(EtherPost.created_at.desc())
-        .limit(50)
-        .all()
+    posts = _post_page(
+        db.query(EtherPost).filter(EtherPost.author_profile_id == target.id),
+        limit,
+        before_cursor,
+        after_cursor,
     )
+    posts = _finish_post_page(posts, limit, after_cursor is not None, response)
     return build_post_reads(db, posts, profile.id)
 
 
 @router.get("/ether/timeline", response_model=list[EtherPostRead])
 def timeline(
+    response: Response,
+    limit: int = 50,
+    before: str | None = None,
+    after: str | None = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     profile = get_or_create_profile(db, current_user)
-
-    approved_syncs = (
-        db.query(EtherSyncRequest)
-        .filter(
-            EtherSyncRequest.status == "approved",
-            or_(
-                EtherSyncRequest.requester_profile_id == profile.id,
-                EtherSyncRequest.target_profile_id == profile.id,
-            ),
-        )
-        .all()
-    )
-
-    sync_profile_ids = set()
-    for req in approved_syncs:
-        other = req.target_profile_id if req.requester_profile_id == profile.id else req.requester_profile_id
-        sync_profile_ids.add(other)
-
-    posts = (
-        db.query(EtherPost)
-        .filter(
-            EtherPost.author_profile_id.in_(list(sync_profile_ids) or [-1])
-        )
-        .order_by(EtherPost.created_at.desc())
-        .limit(50)
-        .all()
-    )
+    limit = max(1, min(limit, POST_PAGE_MAX))
+    before_cursor, after_cursor = _post_cursors(before, after)
+    try:
+        posts = timeline_posts(db, profile.id, limit=limit + 1, before=before_cursor, after=after_cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    posts = _finish_post_page(posts, limit, after_cursor is not None, response)
     return build_post_reads(db, posts, profile.id)
 
 
@@ -422,13 +460,18 @@ def create_post(
 ):
     profile = get_or_create_profile(db, current_user)
     _ensure_safe_text(payload.content)
+    variants = variants_for(db, payload.image_url)
     post = EtherPost(
         author_profile_id=profile.id,
         kind=payload.kind,
         content=payload.content,
         image_url=payload.image_url,
+        image_medium_url=variants.medium_url if variants else None,
+        image_full_url=variants.full_url if variants else None,
     )
     db.add(post)
+    db.flush()
+    fan_out_post(db, post)
     db.commit()
     db.refresh(post)
     return EtherPostRead(
@@ -436,13 +479,14 @@ def create_post(
         author_profile_id=post.author_profile_id,
         kind=post.kind,
         content=post.content,
-        image_url=post.image_url,
+        image_url=post.image_medium_url or post.image_url,
+        image_full_url=post.image_full_url or post.image_url,
         created_at=post.created_at,
         like_count=0,
         liked_by_me=False,
         comment_count=0,
         author_display_name=profile.display_name,
-        author_avatar_url=profile.avatar_url,
+        author_avatar_url=profile.avatar_thumb_url or profile.avatar_url,
     )
 
 
@@ -460,7 +504,12 @@ def delete_post(
         raise HTTPException(status_code=403, detail="Not authorized to delete this post")
 
     db.query(EtherLike).filter(EtherLike.post_id == post_id).delete()
+    comment_ids = select(EtherComment.id).where(EtherComment.post_id == post_id)
+    db.query(EtherCommentLike).filter(EtherCommentLike.comment_id.in_(comment_ids)).delete(
+        synchronize_session=False
+    )
     db.query(EtherComment).filter(EtherComment.post_id == post_id).delete()
+    remove_post_from_timelines(db, post_id)
     db.delete(post)
     db.commit()
     return {"status": "deleted"}
@@ -484,6 +533,7 @@ def add_comment(
         content=payload.content,
     )
     db.add(comment)
+    bump_counter(db, EtherPost.comment_count, post.id, 1)
     db.commit()
     db.refresh(comment)
     create_notification(
@@ -507,13 +557,17 @@ def add_comment(
             preview = (comment.content or "").strip()
             if len(preview) > 180:
                 preview = preview[:177].rstrip() + "..."
-            send_post_comment_email(
+            queue_notification_email(
                 recipient_user.email,
+                "comment",
+                f"post:{post.id}",
                 profile.display_name,
+                preview or "New comment received.",
                 post.id,
                 comment.id,
-                preview or "New comment received.",
+                db=db,
             )
+            db.commit()
     return EtherCommentRead(
         id=comment.id,
         post_id=comment.post_id,
@@ -521,7 +575,7 @@ def add_comment(
         content=comment.content,
         created_at=comment.created_at,
         author_display_name=profile.display_name,
-        author_avatar_url=profile.avatar_url,
+        author_avatar_url=profile.avatar_thumb_url or profile.avatar_url,
         align_count=0,
         aligned_by_me=False,
     )
@@ -560,10 +614,12 @@ def toggle_like(
     )
     if existing:
         db.delete(existing)
+        bump_counter(db, EtherPost.like_count, post_id, -1)
         db.commit()
         return {"status": "unliked"}
     like = EtherLike(post_id=post_id, profile_id=profile.id)
     db.add(like)
+    bump_counter(db, EtherPost.like_count, post_id, 1)
     create_notification(
         db,
         recipient_profile_id=post.author_profile_id,
@@ -592,16 +648,14 @@ def toggle_comment_align(
     )
     if existing:
         db.delete(existing)
+        bump_counter(db, EtherComment.align_count, comment_id, -1)
         db.commit()
-        count = (
-            db.query(EtherCommentLike)
-            .filter(EtherCommentLike.comment_id == comment_id)
-            .count()
-        )
-        return {"status": "unaligned", "align_count": count}
+        db.refresh(comment)
+        return {"status": "unaligned", "align_count": comment.align_count}
 
     like = EtherCommentLike(comment_id=comment_id, profile_id=profile.id)
     db.add(like)
+    bump_counter(db, EtherComment.align_count, comment_id, 1)
     post = db.query(EtherPost).filter(EtherPost.id == comment.post_id).first()
     if post:
         create_notification(
@@ -613,12 +667,8 @@ def toggle_comment_align(
             comment_id=comment.id,
         )
     db.commit()
-    count = (
-        db.query(EtherCommentLike)
-        .filter(EtherCommentLike.comment_id == comment_id)
-        .count()
-    )
-    return {"status": "aligned", "align_count": count}
+    db.refresh(comment)
+    return {"status": "aligned", "align_count": comment.align_count}
 
 
 @router.get("/ether/groups", response_model=list[EtherGroupRead])
@@ -770,23 +820,7 @@ def get_profile(
     store_url = "https://a.co/d/856lhhB" if (user and user.email == "billionaireBrea@wealth.com") else None
 
     if target.id != profile.id and not target.is_public:
-        approved = (
-            db.query(EtherSyncRequest)
-            .filter(
-                EtherSyncRequest.status == "approved",
-                or_(
-                    and_(
-                        EtherSyncRequest.requester_profile_id == profile.id,
-                        EtherSyncRequest.target_profile_id == target.id,
-                    ),
-                    and_(
-                        EtherSyncRequest.requester_profile_id == target.id,
-                        EtherSyncRequest.target_profile_id == profile.id,
-                    ),
-                ),
-            )
-            .first()
-        )
+        approved = is_synced(db, profile.id, target.id)
         if not approved:
             display = (user.username if user else None) or (user.email if user else None) or target.display_name
             return ProfileRead(
@@ -827,18 +861,24 @@ def upload_avatar(
     content_type = file.content_type or "image/jpeg"
     if not content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only image uploads are supported.")
-    payload = file.file.read()
-    if len(payload) > MAX_IMAGE_BYTES:
+    try:
+        payload = read_capped(file.file, MAX_IMAGE_BYTES)
+    except UploadTooLarge:
         raise HTTPException(status_code=413, detail="Image exceeds 5MB limit.")
-    ok, reason = moderate_avatar_image_bytes(payload)
+    try:
+        asset = ImageAsset.from_bytes(payload)
+    except ImageRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    ok, reason = moderate_avatar_image_asset(asset)
     if not ok:
         raise HTTPException(status_code=400, detail=reason or "Image rejected.")
-    key = build_key(f"avatars/{profile.id}", file.filename)
-    url = upload_bytes(io.BytesIO(payload), key, content_type)
-    profile.avatar_url = url
+    image = store_image(db, asset, f"avatars/{profile.id}", current_user.id)
+    profile.avatar_url = image.url
+    profile.avatar_thumb_url = image.thumb_url
     db.add(profile)
     db.commit()
-    return {"url": url}
+    invalidate_profile(profile.id, current_user.id)
+    return image_urls(image)
 
 
 @router.post("/ether/upload/post-image")
@@ -851,21 +891,27 @@ def upload_post_image(
     content_type = file.content_type or "image/jpeg"
     if not content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only image uploads are supported.")
-    payload = file.file.read()
-    if len(payload) > MAX_IMAGE_BYTES:
+    try:
+        payload = read_capped(file.file, MAX_IMAGE_BYTES)
+    except UploadTooLarge:
         raise HTTPException(status_code=413, detail="Image exceeds 5MB limit.")
-    ok, reason = moderate_image_bytes(payload)
+    try:
+        asset = ImageAsset.from_bytes(payload)
+    except ImageRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    ok, reason = moderate_image_asset(asset)
     if not ok:
         raise HTTPException(status_code=400, detail=reason or "Image rejected.")
-    key = build_key(f"posts/{profile.id}", file.filename)
-    url = upload_bytes(io.BytesIO(payload), key, content_type)
-    return {"url": url}
+    image = store_image(db, asset, f"posts/{profile.id}", current_user.id)
+    db.commit()
+    return image_urls(image)
 
 
 @router.get("/ether/avatar/source")
-def proxy_avatar(
+async def proxy_avatar(
     url: str,
-    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(None),
+    if_modified_since: str | None = Header(None),
 ):
     base = (settings.R2_PUBLIC_BASE_URL or "").rstrip("/")
     if not base:
@@ -877,13 +923,16 @@ def proxy_avatar(
         raise HTTPException(status_code=400, detail="Invalid avatar source")
 
     try:
-        with urlopen(url) as resp:
-            content = resp.read()
-            content_type = resp.headers.get("Content-Type", "image/jpeg")
-    except Exception:
+        avatar = await fetch_avatar(url)
+    except AvatarFetchError:
         raise HTTPException(status_code=400, detail="Unable to load avatar")
 
-    return Response(content=content, media_type=content_type)
+    headers = cache_headers(avatar)
+    if etag_matches(if_none_match, avatar.etag) or (
+        if_none_match is None and not_modified_since(if_modified_since, avatar.last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=avatar.content, media_type=avatar.content_type, headers=headers)
 
 
 @router.post("/ether/sync/requests/{target_profile_id}", response_model=EtherSyncRequestRead)
@@ -918,6 +967,8 @@ def create_sync_request(
         status=status_value,
     )
     db.add(sync_request)
+    if status_value == "approved":
+        add_sync_edge(db, profile.id, target_profile_id)
     db.commit()
     db.refresh(sync_request)
     return sync_request
@@ -993,24 +1044,11 @@ def remove_sync(
     current_user=Depends(get_current_user),
 ):
     profile = get_or_create_profile(db, current_user)
-    request = (
-        db.query(EtherSyncRequest)
-        .filter(
-            EtherSyncRequest.status == "approved",
-            (
-                (EtherSyncRequest.requester_profile_id == profile.id)
-                & (EtherSyncRequest.target_profile_id == profile_id)
-            )
-            | (
-                (EtherSyncRequest.requester_profile_id == profile_id)
-                & (EtherSyncRequest.target_profile_id == profile.id)
-            ),
-        )
-        .first()
-    )
-    if not request:
+    # the edge table is the source of truth for who is synced; ending a sync ends it both ways
+    if not is_synced(db, profile.id, profile_id):
         raise HTTPException(status_code=404, detail="Sync not found")
-    db.delete(request)
+    _approved_sync_requests(db, profile.id, profile_id).delete(synchronize_session=False)
+    remove_sync_edge(db, profile.id, profile_id)
     db.commit()
     return {"status": "removed"}
 
@@ -1028,6 +1066,7 @@ def approve_sync(
     request.status = "approved"
     request.responded_at = func.now()
     db.add(request)
+    add_sync_edge(db, request.requester_profile_id, request.target_profile_id)
     create_notification(
         db,
         recipient_profile_id=request.requester_profile_id,
@@ -1049,9 +1088,18 @@ def decline_sync(
     request = db.query(EtherSyncRequest).filter(EtherSyncRequest.id == request_id).first()
     if not request or request.target_profile_id != profile.id:
         raise HTTPException(status_code=404, detail="Request not found")
+    was_approved = request.status == "approved"
     request.status = "declined"
     request.responded_at = func.now()
     db.add(request)
+    db.flush()
+    if was_approved:
+        # one sync per pair: revoking it also retires an approved request the other way
+        _approved_sync_requests(db, request.requester_profile_id, request.target_profile_id).update(
+            {EtherSyncRequest.status: "declined", EtherSyncRequest.responded_at: func.now()},
+            synchronize_session=False,
+        )
+        remove_sync_edge(db, request.requester_profile_id, request.target_profile_id)
     db.commit()
     db.refresh(request)
     return request
@@ -1063,23 +1111,10 @@ def list_syncs(
     current_user=Depends(get_current_user),
 ):
     profile = get_or_create_profile(db, current_user)
-    approved = (
-        db.query(EtherSyncRequest)
-        .filter(
-            EtherSyncRequest.status == "approved",
-            (EtherSyncRequest.requester_profile_id == profile.id)
-            | (EtherSyncRequest.target_profile_id == profile.id),
-        )
-        .all()
-    )
-    partner_ids = set()
-    for req in approved:
-        partner_ids.add(req.requester_profile_id)
-        partner_ids.add(req.target_profile_id)
-    partner_ids.discard(profile.id)
+    partner_ids = sync_partner_ids(db, profile.id)
     if not partner_ids:
         return []
-    return db.query(Profile).filter(Profile.id.in_(list(partner_ids))).all()
+    return db.query(Profile).filter(Profile.id.in_(partner_ids)).all()
 
 
 @router.get("/ether/notifications", response_model=list[EtherNotificationRead])
@@ -1261,11 +1296,7 @@ def list_thread_previews(
         participant_map.setdefault(thread_id, []).append(profile_id)
         participant_ids.add(profile_id)
 
-    profile_rows = db.query(Profile).filter(Profile.id.in_(participant_ids)).all()
-    user_ids = [p.user_id for p in profile_rows]
-    user_rows = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
-    user_map = {u.id: u for u in user_rows}
-    profile_map: dict[int, Profile] = {p.id: p for p in profile_rows}
+    profile_map = profile_cards(db, participant_ids)
 
     member_alias = EtherThreadMember
     latest_ids = (
@@ -1312,10 +1343,9 @@ def list_thread_previews(
         counterpart_avatar_url = None
         if counterpart_id is not None:
             prof = profile_map.get(counterpart_id)
-            user = user_map.get(prof.user_id) if prof else None
             counterpart_display_name = (
-                (user.username if user else None)
-                or (user.email if user else None)
+                (prof.username if prof else None)
+                or (prof.email if prof else None)
                 or (prof.display_name if prof else None)
             )
             counterpart_avatar_url = prof.avatar_url if prof else None
@@ -1384,12 +1414,16 @@ def send_message(
         for recipient_profile, recipient_user in recipients:
             if not recipient_user.email_verified:
                 continue
-            send_myline_message_email(
+            queue_notification_email(
                 recipient_user.email,
+                "myline",
+                f"thread:{thread_id}",
                 profile.display_name,
-                thread_id,
                 preview or "New message received.",
+                thread_id,
+                db=db,
             )
+        db.commit()
     return msg
 
 
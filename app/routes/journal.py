@@ -2,14 +2,14 @@
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
-import io
 
 from app.core.security import get_verified_user
 from app.db.session import get_db
 from app.models.journal import JournalEntry
 from app.schemas.journal import JournalEntryCreate, JournalEntryRead, JournalEntryUpdate
-from app.services.r2 import upload_bytes, build_key
-from app.services.moderation import moderate_image_bytes, moderate_text
+from app.services.r2 import read_capped, UploadTooLarge
+from app.services.images import ImageAsset, ImageRejected, image_urls, store_image
+from app.services.moderation import moderate_image_asset, moderate_text
 try:
     from app.services.credit import record_credit_action, ensure_credit_actions
 except Exception:
@@ -114,17 +114,23 @@ def update_entry(
 @router.post("/journal/upload-image")
 def upload_journal_image(
     file: UploadFile = File(...),
+    db: Session = Depends(get_db),
     current_user=Depends(get_verified_user),
 ):
     content_type = file.content_type or "image/jpeg"
     if not content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only image uploads are supported.")
-    payload = file.file.read()
-    if len(payload) > MAX_IMAGE_BYTES:
+    try:
+        payload = read_capped(file.file, MAX_IMAGE_BYTES)
+    except UploadTooLarge:
         raise HTTPException(status_code=413, detail="Image exceeds 5MB limit.")
-    ok, reason = moderate_image_bytes(payload)
+    try:
+        asset = ImageAsset.from_bytes(payload)
+    except ImageRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    ok, reason = moderate_image_asset(asset)
     if not ok:
         raise HTTPException(status_code=400, detail=reason or "Image rejected.")
-    key = build_key(f"journals/{current_user.id}", file.filename or "journal.jpg")
-    url = upload_bytes(io.BytesIO(payload), key, content_type)
-    return {"url": url}
+    image = store_image(db, asset, f"journals/{current_user.id}", current_user.id)
+    db.commit()
+    return image_urls(image)
@@ -1,23 +1,60 @@
 # app/routes/ledger.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.datastructures import UploadFile as StarletteUploadFile
 from datetime import datetime, UTC
+from typing import Iterable, Iterator, Literal
+import csv
+import io
+
+import anyio
+
+from app.core.config import settings
 
 from app.db.session import get_db
+from app.core.pagination import encode_cursor, decode_cursor
 from app.core.security import get_current_user, get_verified_user
-from app.schemas.ledger import LedgerEntryCreate, LedgerEntryRead, BalanceRead, TransferCreate
-from app.crud.crud_ledger import create_ledger_entry, list_ledger_entries, get_account_balance, create_transfer
+from app.schemas.ledger import (
+    LedgerEntryCreate,
+    LedgerEntryRead,
+    LedgerBatchCreate,
+    LedgerBatchItemResult,
+    LedgerBatchResult,
+    LedgerImportRead,
+    BalanceRead,
+    TransferCreate,
+)
+from app.crud.crud_ledger import (
+    create_ledger_entry,
+    create_ledger_entries,
+    find_idempotent_entries,
+    insert_ledger_entries,
+    ledger_entry_values,
+    record_posted_entries,
+    list_ledger_entries,
+    get_account_balance,
+    create_transfer,
+)
 from app.crud.crud_account import get_account
+from app.models.account import Account
+from app.models.ledger import LedgerImport, LedgerImportError
 from app.services.email import send_ledger_post_email
+from app.services.ledger_import import (
+    IMPORT_FORMATS,
+    READ_CHUNK_BYTES,
+    ImportFormatError,
+    format_for,
+    iter_import_rows,
+)
 from app.services.tier import (
     is_premium,
-    count_deposits_7d,
-    count_expenses_7d,
-    count_checks_7d,
-    FREE_DEPOSIT_LIMIT_7D,
-    FREE_EXPENSE_LIMIT_7D,
-    FREE_CHECK_LIMIT_7D,
+    get_usage,
+    ledger_quota_key,
+    USAGE_COUNTERS,
+    FREE_LIMITS,
     TIER_NAME,
 )
 try:
@@ -32,10 +69,73 @@ except Exception:
 router = APIRouter(tags=["ledger"])
 
 
+QUOTA_MESSAGES = {
+    "checks": f"Free tier allows 1 check every 7 days. Upgrade to {TIER_NAME} for unlimited checks.",
+    "deposits": f"Free tier allows 2 deposits every 7 days. Upgrade to {TIER_NAME} for unlimited deposits.",
+    "expenses": f"Free tier allows 2 expenses every 7 days. Upgrade to {TIER_NAME} for unlimited expenses.",
+}
+
+
 def is_admin(user) -> bool:
     return getattr(user, "role", None) == "admin"
 
 
+def _screen_entries(
+    db: Session, current_user, items: list[LedgerEntryCreate]
+) -> tuple[dict[int, Account], list[int], dict[int, tuple[int, str]]]:
+    """
+    Check items like POST /ledger/entries (account exists and is the caller's, free-tier
+    quota) with one account query and one usage query. Returns the accounts by id, the
+    indexes that may be posted, and (status_code, message) for each index that may not.
+    """
+    account_ids = {item.account_id for item in items}
+    accounts = {acct.id: acct for acct in db.query(Account).filter(Account.id.in_(account_ids))}
+    accepted: list[int] = []
+    rejected: dict[int, tuple[int, str]] = {}
+    for index, item in enumerate(items):
+        acct = accounts.get(item.account_id)
+        if not acct:
+            rejected[index] = (404, "Account not found")
+        elif (acct.owner_user_id != current_user.id) and (not is_admin(current_user)):
+            rejected[index] = (403, "Not allowed")
+        else:
+            accepted.append(index)
+
+    if not is_premium(current_user):
+        # retries of already-posted keys don't draw on the quota
+        already = find_idempotent_entries(
+            db, {(items[i].account_id, items[i].idempotency_key) for i in accepted if items[i].idempotency_key}
+        )
+        seen_keys: set[tuple[int, str]] = set()
+        usage = get_usage(db, current_user.id)
+        within_quota = []
+        for index in accepted:
+            item = items[index]
+            key = (item.account_id, item.idempotency_key) if item.idempotency_key else None
+            quota_key = ledger_quota_key(item.entry_type, item.meta)
+            if quota_key and not (key and (key in already or key in seen_keys)):
+                if usage[quota_key] >= FREE_LIMITS[quota_key]:
+                    rejected[index] = (402, QUOTA_MESSAGES[quota_key])
+                    continue
+                usage[quota_key] += 1
+            if key:
+                seen_keys.add(key)
+            within_quota.append(index)
+        accepted = within_quota
+    return accounts, accepted, rejected
+
+
+def _credit_action(entry) -> str | None:
+    entry_type = (entry.entry_type or "").lower()
+    if entry.kind == "check":
+        return "check_post"
+    if entry_type == "deposit":
+        return "ledger_deposit"
+    if entry_type == "withdrawal":
+        return "ledger_expense"
+    return None
+
+
 @router.post("/ledger/entries", response_model=LedgerEntryRead)
 def post_entry(
     payload: LedgerEntryCreate,
@@ -50,34 +150,14 @@ def post_entry(
         raise HTTPException(status_code=403, detail="Not allowed")
 
     if not is_premium(current_user):
-        entry_type = (payload.entry_type or "").lower()
-        meta = payload.meta or {}
-        kind = str(meta.get("kind") or "").lower()
-        if kind == "check":
-            if count_checks_7d(db, current_user.id) >= FREE_CHECK_LIMIT_7D:
-                raise HTTPException(
-                    status_code=402,
-                    detail=f"Free tier allows 1 check every 7 days. Upgrade to {TIER_NAME} for unlimited checks.",
-                )
-        elif entry_type == "deposit":
-            if count_deposits_7d(db, current_user.id) >= FREE_DEPOSIT_LIMIT_7D:
-                raise HTTPException(
-                    status_code=402,
-                    detail=f"Free tier allows 2 deposits every 7 days. Upgrade to {TIER_NAME} for unlimited deposits.",
-                )
-        elif entry_type == "withdrawal":
-            if count_expenses_7d(db, current_user.id) >= FREE_EXPENSE_LIMIT_7D:
-                raise HTTPException(
-                    status_code=402,
-                    detail=f"Free tier allows 2 expenses every 7 days. Upgrade to {TIER_NAME} for unlimited expenses.",
-                )
+        quota_key = ledger_quota_key(payload.entry_type, payload.meta)
+        if quota_key and USAGE_COUNTERS[quota_key](db, current_user.id) >= FREE_LIMITS[quota_key]:
+            raise HTTPException(status_code=402, detail=QUOTA_MESSAGES[quota_key])
 
     entry = create_ledger_entry(db, current_user.id, payload)
     ensure_credit_actions(db)
     entry_type = (payload.entry_type or "").lower()
-    meta = payload.meta or {}
-    kind = str(meta.get("kind") or "").lower()
-    if kind == "check":
+    if entry.kind == "check":
         record_credit_action(db, current_user.id, "check_post")
         if current_user.email_verified:
             amount_str = f"{entry.amount:.2f} {entry.currency}"
@@ -96,11 +176,239 @@ def post_entry(
     return entry
 
 
+@router.post("/ledger/entries:batch", response_model=LedgerBatchResult)
+def post_entries_batch(
+    payload: LedgerBatchCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_verified_user),
+):
+    """
+    Post up to LEDGER_BATCH_MAX entries across the caller's accounts in one transaction.
+    Each item is checked like POST /ledger/entries (ownership, free-tier quota, idempotency
+    key) but with one account query and one usage query for the whole batch; items that
+    fail are reported in place and don't stop the rest.
+    """
+    items = payload.entries
+    results: list[LedgerBatchItemResult | None] = [None] * len(items)
+
+    accounts, accepted, rejected = _screen_entries(db, current_user, items)
+    for index, (status_code, error) in rejected.items():
+        results[index] = LedgerBatchItemResult(index=index, status="error", status_code=status_code, error=error)
+
+    posted = create_ledger_entries(db, current_user.id, [items[i] for i in accepted])
+    created_entries = []
+    for index, (entry, created) in zip(accepted, posted):
+        results[index] = LedgerBatchItemResult(
+            index=index,
+            status="created" if created else "duplicate",
+            entry=LedgerEntryRead.model_validate(entry),
+        )
+        if created:
+            created_entries.append(entry)
+
+    if created_entries:
+        ensure_credit_actions(db)
+        actions = {_credit_action(entry) for entry in created_entries} - {None}
+        for entry in created_entries:
+            if entry.kind == "check" and current_user.email_verified:
+                send_ledger_post_email(
+                    current_user.email,
+                    accounts[entry.account_id].name,
+                    entry.direction,
+                    f"{entry.amount:.2f} {entry.currency}",
+                    "check",
+                    f"/dashboard/activity/{entry.id}",
+                    db=db,
+                )
+        db.commit()
+        for action in sorted(actions):
+            record_credit_action(db, current_user.id, action)
+
+    return LedgerBatchResult(
+        created=sum(1 for r in results if r.status == "created"),
+        duplicates=sum(1 for r in results if r.status == "duplicate"),
+        errors=sum(1 for r in results if r.status == "error"),
+        results=results,
+    )
+
+
+def _post_import_chunk(
+    db: Session,
+    current_user,
+    job: LedgerImport,
+    rows: list[tuple[int, str, LedgerEntryCreate]],
+    errors: list[tuple[int, str, str]],
+) -> set[str]:
+    """
+    Post one chunk of parsed rows and record its errors and counters in a single
+    transaction, so the import's progress always matches what has been committed.
+    Returns the credit actions the chunk earned.
+    """
+    processed = len(rows) + len(errors)
+    items = [item for _, _, item in rows]
+    _, accepted, rejected = _screen_entries(db, current_user, items) if items else ({}, [], {})
+    for index, (_, message) in rejected.items():
+        line, raw, _ = rows[index]
+        errors.append((line, message, raw))
+
+    inserted = insert_ledger_entries(db, [ledger_entry_values(current_user.id, items[i]) for i in accepted])
+    created = [entry for entry in inserted if entry is not None]
+    record_posted_entries(db, created)
+    db.add_all(
+        LedgerImportError(import_id=job.id, row_number=line, error=message, raw=raw)
+        for line, message, raw in sorted(errors)
+    )
+    job.rows_processed += processed
+    job.created_count += len(created)
+    job.duplicate_count += len(inserted) - len(created)
+    job.error_count += len(errors)
+    db.commit()
+    return {_credit_action(entry) for entry in created} - {None}
+
+
+def _run_import(db: Session, current_user, fmt: str, chunks: Iterable[bytes]) -> LedgerImport:
+    job = LedgerImport(user_id=current_user.id, format=fmt, status="running")
+    db.add(job)
+    db.commit()
+
+    chunk_rows = max(1, settings.LEDGER_IMPORT_CHUNK_ROWS)
+    rows: list[tuple[int, str, LedgerEntryCreate]] = []
+    errors: list[tuple[int, str, str]] = []
+    actions: set[str] = set()
+    try:
+        for line, raw, parsed in iter_import_rows(chunks, fmt):
+            if isinstance(parsed, str):
+                errors.append((line, parsed, raw))
+            else:
+                rows.append((line, raw, parsed))
+            if len(rows) + len(errors) >= chunk_rows:
+                actions |= _post_import_chunk(db, current_user, job, rows, errors)
+                rows, errors = [], []
+        job.status = "completed"
+    except ImportFormatError as exc:
+        # rows read before the upload went bad are still posted
+        job.status = "failed"
+        job.detail = str(exc)
+    actions |= _post_import_chunk(db, current_user, job, rows, errors)
+    job.finished_at = datetime.now(UTC)
+    db.commit()
+
+    if actions:
+        ensure_credit_actions(db)
+        for action in sorted(actions):
+            record_credit_action(db, current_user.id, action)
+    db.refresh(job)
+    return job
+
+
+@router.post("/ledger/import", response_model=LedgerImportRead)
+async def import_entries(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_verified_user),
+):
+    """
+    Bulk-load a CSV (header row of LedgerEntryCreate fields) or NDJSON upload, sent as the
+    raw request body or as the "file" field of a multipart form. The body is parsed as it
+    arrives and posted in chunks of LEDGER_IMPORT_CHUNK_ROWS, each in its own transaction;
+    GET /ledger/imports/{id} shows progress meanwhile. Rows are checked like
+    POST /ledger/entries:batch, except that no per-check emails are sent for history.
+    Rows that fail go to GET /ledger/imports/{id}/errors instead of stopping the import.
+    """
+    content_type = request.headers.get("content-type")
+    if (content_type or "").lower().startswith("multipart/form-data"):
+        # Starlette spools multipart files to disk past 1 MB, so memory stays bounded
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, StarletteUploadFile):
+            raise HTTPException(status_code=422, detail="Missing file")
+        fmt = format or format_for(upload.content_type, upload.filename)
+        chunks = iter(lambda: upload.file.read(READ_CHUNK_BYTES), b"")
+    else:
+        fmt = format or format_for(content_type)
+        body = request.stream().__aiter__()
+
+        def pull() -> Iterator[bytes]:
+            # runs in the worker thread, handing each body chunk over from the event loop
+            while True:
+                try:
+                    yield anyio.from_thread.run(body.__anext__)
+                except StopAsyncIteration:
+                    return
+
+        chunks = pull()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson",
+        )
+    return await run_in_threadpool(_run_import, db, current_user, fmt, chunks)
+
+
+def _get_import(db: Session, current_user, import_id: int) -> LedgerImport:
+    job = db.get(LedgerImport, import_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    if (job.user_id != current_user.id) and (not is_admin(current_user)):
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return job
+
+
+@router.get("/ledger/imports/{import_id}", response_model=LedgerImportRead)
+def get_import(
+    import_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return _get_import(db, current_user, import_id)
+
+
+@router.get("/ledger/imports/{import_id}/errors")
+def get_import_errors(
+    import_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """The rows an import rejected, as CSV (row, error, raw)."""
+    job = _get_import(db, current_user, import_id)
+    rows = (
+        db.query(LedgerImportError.row_number, LedgerImportError.error, LedgerImportError.raw)
+        .filter(LedgerImportError.import_id == job.id)
+        .order_by(LedgerImportError.row_number, LedgerImportError.id)
+        .yield_per(500)
+    )
+
+    def lines() -> Iterator[str]:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["row", "error", "raw"])
+        try:
+            for row in rows:
+                writer.writerow(row)
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+            yield out.getvalue()
+        finally:
+            # get_db closed the session before the body is sent; release the cursor's connection too
+            db.rollback()
+
+    return StreamingResponse(
+        lines(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="ledger-import-{job.id}-errors.csv"'},
+    )
+
+
 @router.get("/accounts/{account_id}/ledger", response_model=list[LedgerEntryRead])
 def get_ledger(
     account_id: int,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
+    include_subtree: bool = False,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
@@ -113,8 +421,23 @@ def get_ledger(
 
     limit = max(1, min(limit, 200))
     offset = max(0, offset)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return list_ledger_entries(db, account_id, limit=limit, offset=offset)
+    # fetch one extra row to know whether another page exists
+    try:
+        entries = list_ledger_entries(
+            db, account_id, limit=limit + 1, offset=offset, cursor=after, include_subtree=include_subtree
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(entries) > limit:
+        entries = entries[:limit]
+        last = entries[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return entries
 
 
 @router.get("/accounts/{account_id}/balance", response_model=BalanceRead)
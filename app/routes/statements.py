@@ -1,16 +1,26 @@
 # app/routes/statements.py
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func, case, and_
 from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Literal
 
 from app.db.session import get_db
 from app.core.security import get_current_user
-from app.models.ledger import LedgerEntry
+from app.models.ledger import LedgerEntry, AccountMonthlyRollup
 from app.models.account import Account
-from app.crud.crud_account import get_account, list_accounts_for_user
+from app.crud.crud_account import get_account, list_accounts_for_user, list_subtree_accounts
+from app.crud.crud_ledger import month_key
+from app.services.statement_export import (
+    EXPORT_FORMATS,
+    csv_export,
+    ndjson_export,
+    ofx_export,
+    statement_lines,
+)
 from app.services.tier import is_premium, TIER_NAME
 
 router = APIRouter(tags=["statements"])
@@ -52,59 +62,89 @@ def format_money(value: Decimal) -> str:
     return f"${value:,.2f}"
 
 
-def sum_direction(db: Session, account_ids: list[int], start: datetime | None, end: datetime | None, direction: str):
-    credit_sum = func.coalesce(
-        func.sum(case((LedgerEntry.direction == direction, LedgerEntry.amount), else_=0)),
-        0,
-    )
-    query = db.query(credit_sum.label("total")).filter(
-        LedgerEntry.account_id.in_(account_ids),
-        LedgerEntry.status == "posted",
-        LedgerEntry.currency == "USD",
-    )
-    if start is not None:
-        query = query.filter(LedgerEntry.created_at >= start)
-    if end is not None:
-        query = query.filter(LedgerEntry.created_at < end)
-    row = query.first()
-    return Decimal(str(row.total or 0))
-
-
-def sum_transfers(db: Session, account_ids: list[int], start: datetime, end: datetime, direction: str | None = None):
-    query = db.query(func.coalesce(func.sum(LedgerEntry.amount), 0)).filter(
-        LedgerEntry.account_id.in_(account_ids),
-        LedgerEntry.status == "posted",
-        LedgerEntry.currency == "USD",
-        LedgerEntry.entry_type == "transfer",
-        LedgerEntry.created_at >= start,
-        LedgerEntry.created_at < end,
-    )
-    if direction:
-        query = query.filter(LedgerEntry.direction == direction)
-    row = query.first()
-    return Decimal(str(row[0] or 0))
+def _sum_if(condition, value):
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
 
 
-def compute_balance(db: Session, account_ids: list[int], end: datetime | None):
-    credit_sum = func.coalesce(
-        func.sum(case((LedgerEntry.direction == "credit", LedgerEntry.amount), else_=0)),
-        0,
+def rollup_totals(db: Session, account_ids: list[int], month: str) -> dict[str, Decimal]:
+    """Opening balance and the month's totals, read from account_monthly_rollups in one query."""
+    in_month = AccountMonthlyRollup.month == month
+    row = (
+        db.query(
+            _sum_if(AccountMonthlyRollup.month < month, AccountMonthlyRollup.credits - AccountMonthlyRollup.debits).label("opening"),
+            _sum_if(in_month, AccountMonthlyRollup.credits).label("credits"),
+            _sum_if(in_month, AccountMonthlyRollup.debits).label("debits"),
+            _sum_if(in_month, AccountMonthlyRollup.transfers_in).label("transfers_in"),
+            _sum_if(in_month, AccountMonthlyRollup.transfers_out).label("transfers_out"),
+        )
+        .filter(
+            AccountMonthlyRollup.account_id.in_(account_ids),
+            AccountMonthlyRollup.currency == "USD",
+            AccountMonthlyRollup.month <= month,
+        )
+        .first()
     )
-    debit_sum = func.coalesce(
-        func.sum(case((LedgerEntry.direction == "debit", LedgerEntry.amount), else_=0)),
-        0,
+    return {key: Decimal(str(value or 0)) for key, value in row._mapping.items()}
+
+
+def opening_balances(db: Session, account_ids: list[int], month: str, currency: str = "USD") -> dict[int, Decimal]:
+    """Each account's balance at the start of month, from the rollups of earlier months."""
+    rows = (
+        db.query(
+            AccountMonthlyRollup.account_id,
+            func.sum(AccountMonthlyRollup.credits - AccountMonthlyRollup.debits),
+        )
+        .filter(
+            AccountMonthlyRollup.account_id.in_(account_ids),
+            AccountMonthlyRollup.currency == currency,
+            AccountMonthlyRollup.month < month,
+        )
+        .group_by(AccountMonthlyRollup.account_id)
     )
-    query = db.query(credit_sum.label("credits"), debit_sum.label("debits")).filter(
-        LedgerEntry.account_id.in_(account_ids),
-        LedgerEntry.status == "posted",
-        LedgerEntry.currency == "USD",
+    return {account_id: Decimal(str(total or 0)) for account_id, total in rows}
+
+
+def live_totals(db: Session, account_ids: list[int], start: datetime, end: datetime) -> dict[str, Decimal]:
+    """The same month totals computed from ledger_entries, for the still-open current month."""
+    is_credit = LedgerEntry.direction == "credit"
+    is_debit = LedgerEntry.direction == "debit"
+    is_transfer = LedgerEntry.entry_type == "transfer"
+    row = (
+        db.query(
+            _sum_if(is_credit, LedgerEntry.amount).label("credits"),
+            _sum_if(is_debit, LedgerEntry.amount).label("debits"),
+            _sum_if(and_(is_credit, is_transfer), LedgerEntry.amount).label("transfers_in"),
+            _sum_if(and_(is_debit, is_transfer), LedgerEntry.amount).label("transfers_out"),
+        )
+        .filter(
+            LedgerEntry.account_id.in_(account_ids),
+            LedgerEntry.status == "posted",
+            LedgerEntry.currency == "USD",
+            LedgerEntry.created_at >= start,
+            LedgerEntry.created_at < end,
+        )
+        .first()
     )
-    if end is not None:
-        query = query.filter(LedgerEntry.created_at < end)
-    row = query.first()
-    credits = Decimal(str(row.credits or 0))
-    debits = Decimal(str(row.debits or 0))
-    return credits - debits
+    return {key: Decimal(str(value or 0)) for key, value in row._mapping.items()}
+
+
+def statement_accounts(db: Session, account_id: int | None, current_user) -> list[Account]:
+    """The accounts a statement covers: all of the caller's, one account, or a trust's whole subtree."""
+    if not account_id:
+        return list_accounts_for_user(db, current_user.id)
+    account = get_account(db, account_id)
+    ensure_access(account, current_user)
+    if account.account_type == "trust":
+        return list_subtree_accounts(db, account_id) or [account]
+    return [account]
+
+
+def require_statements(current_user) -> None:
+    if not is_premium(current_user):
+        raise HTTPException(
+            status_code=402,
+            detail=f"Statements are available on {TIER_NAME}. Upgrade to unlock statements.",
+        )
 
 
 @router.get("/statements")
@@ -114,31 +154,26 @@ def get_statements(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    if not is_premium(current_user):
-        raise HTTPException(
-            status_code=402,
-            detail=f"Statements are available on {TIER_NAME}. Upgrade to unlock statements.",
-        )
+    require_statements(current_user)
     start, end, is_current = parse_month(month)
 
-    if account_id:
-        account = get_account(db, account_id)
-        ensure_access(account, current_user)
-        accounts = [account]
-    else:
-        accounts = list_accounts_for_user(db, current_user.id)
+    accounts = statement_accounts(db, account_id, current_user)
 
     account_ids = [acct.id for acct in accounts]
     if not account_ids:
         return {"summary": {}, "entries": []}
 
-    starting_balance = compute_balance(db, account_ids, start)
-    ending_balance = compute_balance(db, account_ids, end)
+    # closed months come straight from the rollup; the open month is summed live
+    totals = rollup_totals(db, account_ids, month_key(start))
+    if is_current:
+        totals.update(live_totals(db, account_ids, start, end))
 
-    deposits = sum_direction(db, account_ids, start, end, "credit")
-    withdrawals = sum_direction(db, account_ids, start, end, "debit")
-    transfers_in = sum_transfers(db, account_ids, start, end, "credit")
-    transfers_out = sum_transfers(db, account_ids, start, end, "debit")
+    starting_balance = totals["opening"]
+    deposits = totals["credits"]
+    withdrawals = totals["debits"]
+    ending_balance = starting_balance + deposits - withdrawals
+    transfers_in = totals["transfers_in"]
+    transfers_out = totals["transfers_out"]
     transfers_total = transfers_in + transfers_out
 
     entries_query = (
@@ -183,3 +218,77 @@ def get_statements(
     if is_current:
         response["as_of"] = end.isoformat()
     return response
+
+
+# rows fetched per round trip; on Postgres yield_per streams them through a server-side cursor
+EXPORT_YIELD_PER = 1000
+
+
+@router.get("/statements/export")
+def export_statements(
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    format: Literal["csv", "ofx", "ndjson"] = "csv",
+    account_id: int | None = Query(default=None),
+    currency: str = "USD",
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Every posted entry of the month, oldest first per account, with each account's running
+    balance. Rows are streamed from the database to the client, so memory stays flat
+    however long the month is.
+    """
+    require_statements(current_user)
+    start, end, _ = parse_month(month)
+
+    accounts = statement_accounts(db, account_id, current_user)
+
+    names = {acct.id: acct.name for acct in accounts}
+    account_ids = sorted(names)
+    openings = opening_balances(db, account_ids, month_key(start), currency) if account_ids else {}
+    rows = (
+        db.query(
+            LedgerEntry.id,
+            LedgerEntry.account_id,
+            LedgerEntry.created_at,
+            LedgerEntry.direction,
+            LedgerEntry.amount,
+            LedgerEntry.currency,
+            LedgerEntry.entry_type,
+            LedgerEntry.memo,
+            LedgerEntry.reference,
+        )
+        .filter(
+            LedgerEntry.account_id.in_(account_ids),
+            LedgerEntry.status == "posted",
+            LedgerEntry.currency == currency,
+            LedgerEntry.created_at >= start,
+            LedgerEntry.created_at < end,
+        )
+        .order_by(LedgerEntry.account_id, LedgerEntry.created_at, LedgerEntry.id)
+        .yield_per(EXPORT_YIELD_PER)
+    )
+
+    lines = statement_lines(rows, names, openings)
+    if format == "ofx":
+        body = ofx_export(lines, account_ids, openings, currency, start, end, datetime.now(timezone.utc))
+    elif format == "ndjson":
+        body = ndjson_export(lines)
+    else:
+        body = csv_export(lines)
+
+    def stream():
+        # get_db has already closed the session by the time the body is sent, so the export
+        # runs in a fresh read transaction; end it once the cursor is drained to hand the
+        # connection straight back to the pool
+        try:
+            yield from body
+        finally:
+            db.rollback()
+
+    media_type, ext = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="statement-{month}.{ext}"'},
+    )
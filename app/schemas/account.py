@@ -21,6 +21,8 @@ class AccountCreate(AccountBase):
 
 class AccountUpdate(BaseModel):
     name: Optional[str] = None
+    # sent (even as null) to move the account and its subtree; omitted to leave it in place
+    parent_account_id: Optional[int] = None
 
 
 class AccountRead(AccountBase):
@@ -41,6 +41,7 @@ class EtherPostRead(BaseModel):
     kind: str
     content: str
     image_url: str | None = None
+    image_full_url: str | None = None
     created_at: datetime
     like_count: int = 0
     liked_by_me: bool = False
@@ -9,6 +9,14 @@ from datetime import datetime
 Direction = Literal["credit", "debit"]
 Status = Literal["posted", "pending", "void"]
 
+LEDGER_BATCH_MAX = 5000
+
+
+def meta_kind(meta: Optional[dict[str, Any]]) -> Optional[str]:
+    """Normalized meta["kind"] (e.g. "check"), stored in its own column for indexed lookups."""
+    kind = str((meta or {}).get("kind") or "").strip().lower()
+    return kind or None
+
 
 class LedgerEntryCreate(BaseModel):
     account_id: int
@@ -45,6 +53,7 @@ class LedgerEntryRead(BaseModel):
 
     memo: Optional[str] = None
     meta: Optional[dict[str, Any]] = None
+    kind: Optional[str] = None
 
     is_reversal: bool
     reversed_entry_id: Optional[int] = None
@@ -55,6 +64,41 @@ class LedgerEntryRead(BaseModel):
         from_attributes = True
 
 
+class LedgerBatchCreate(BaseModel):
+    entries: list[LedgerEntryCreate] = Field(min_length=1, max_length=LEDGER_BATCH_MAX)
+
+
+class LedgerBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "error"]
+    entry: Optional[LedgerEntryRead] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class LedgerBatchResult(BaseModel):
+    created: int
+    duplicates: int
+    errors: int
+    results: list[LedgerBatchItemResult]
+
+
+class LedgerImportRead(BaseModel):
+    id: int
+    format: Literal["csv", "ndjson"]
+    status: Literal["running", "completed", "failed"]
+    rows_processed: int
+    created_count: int
+    duplicate_count: int
+    error_count: int
+    detail: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class BalanceRead(BaseModel):
     account_id: int
     currency: str = "USD"
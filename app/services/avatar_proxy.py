@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+import time
+
+import httpx
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class CachedAvatar:
+    content: bytes
+    content_type: str
+    etag: str
+    last_modified: str
+
+
+class AvatarFetchError(Exception):
+    pass
+
+
+_client: httpx.AsyncClient | None = None
+# avatar keys carry a fresh uuid per upload, so a cached body never goes stale; the ttl only
+# bounds how long a deleted object keeps being served
+_avatars = TTLCache(
+    settings.AVATAR_CACHE_MAX_BYTES,
+    settings.AVATAR_CACHE_TTL_SECONDS,
+    sizeof=lambda avatar: len(avatar.content),
+)
+# url -> download in progress, so concurrent misses for one avatar share a single R2 request
+_inflight: dict[str, asyncio.Future[CachedAvatar]] = {}
+
+
+def _http() -> httpx.AsyncClient:
+    """One pooled keep-alive client to R2 for the event loop's lifetime."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_avatar_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def clear_avatar_cache() -> None:
+    _avatars.clear()
+
+
+def cache_headers(avatar: CachedAvatar) -> dict[str, str]:
+    return {
+        "ETag": avatar.etag,
+        "Last-Modified": avatar.last_modified,
+        "Cache-Control": f"private, max-age={settings.AVATAR_PROXY_MAX_AGE_SECONDS}",
+    }
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def _http_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    # a date without a zone is not a valid HTTP date
+    return parsed if parsed.tzinfo is not None else None
+
+
+def not_modified_since(if_modified_since: str | None, last_modified: str) -> bool:
+    """If-Modified-Since holds when the avatar's Last-Modified is at or before the given date."""
+    since = _http_date(if_modified_since)
+    modified = _http_date(last_modified)
+    return since is not None and modified is not None and modified <= since
+
+
+async def fetch_avatar(url: str) -> CachedAvatar:
+    """
+    The avatar at url, from the byte-bounded LRU when possible. Concurrent misses for the
+    same url wait on one download. Bodies larger than AVATAR_CACHE_MAX_ITEM_BYTES are not
+    cached (or proxied); they are refused instead of being buffered in the worker.
+    """
+    cached = _avatars.get(url)
+    if cached is not None:
+        return cached
+    pending = _inflight.get(url)
+    if pending is not None:
+        try:
+            # shielded: a waiter going away must not cancel the download the others share
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # the request that started the download went away; start another
+            return await fetch_avatar(url)
+
+    future: asyncio.Future[CachedAvatar] = asyncio.get_running_loop().create_future()
+    # retrieve the outcome even when nobody else waited, so a failure isn't logged as unhandled
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    _inflight[url] = future
+    try:
+        avatar = await _download(url)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        _inflight.pop(url, None)
+    _avatars.set(url, avatar)
+    future.set_result(avatar)
+    return avatar
+
+
+async def _download(url: str) -> CachedAvatar:
+    limit = settings.AVATAR_CACHE_MAX_ITEM_BYTES
+    try:
+        async with _http().stream("GET", url) as resp:
+            if resp.status_code != 200:
+                raise AvatarFetchError(f"R2 returned {resp.status_code}")
+            declared = resp.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > limit:
+                raise AvatarFetchError("Avatar too large")
+            chunks = []
+            total = 0
+            async for chunk in resp.aiter_bytes():
+                total += len(chunk)
+                if total > limit:
+                    raise AvatarFetchError("Avatar too large")
+                chunks.append(chunk)
+            headers = resp.headers
+    except httpx.HTTPError as exc:
+        raise AvatarFetchError(str(exc)) from exc
+
+    content = b"".join(chunks)
+    return CachedAvatar(
+        content=content,
+        content_type=headers.get("Content-Type", "image/jpeg"),
+        etag=headers.get("ETag") or f'"{hashlib.sha1(content).hexdigest()}"',
+        last_modified=headers.get("Last-Modified") or formatdate(time.time(), usegmt=True),
+    )
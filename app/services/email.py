@@ -1,88 +1,353 @@
 from __future__ import annotations
 
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import httpx
+from sqlalchemy import select, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailSendCounter
 
 logger = logging.getLogger(__name__)
-_primary_daily_date = None
-_primary_daily_count = 0
-
-
-def _send_email(to_email: str, subject: str, html: str, reply_to: str | None = None) -> bool:
-    primary_key = settings.RESEND_API_KEY
-    primary_sender = settings.RESEND_FROM_EMAIL
-    if not primary_key or not primary_sender:
+# (day, batch size) the shared primary counter last refused; smaller batches may still fit
+_primary_refused: tuple[str, int] | None = None
+_primary_refused_lock = threading.Lock()
+
+RESEND_EMAILS_URL = "https://api.resend.com/emails"
+RESEND_BATCH_URL = "https://api.resend.com/emails/batch"
+RESEND_BATCH_MAX = 100  # Resend's per-request batch limit
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+CLAIM_LEASE_SECONDS = 300
+MYLINE_SUBJECT = "ManifestBank™ — New My Line message"
+COMMENT_SUBJECT = "ManifestBank™ — New comment"
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_dispatch_pool = ThreadPoolExecutor(
+    max_workers=settings.EMAIL_DISPATCH_CONCURRENCY, thread_name_prefix="email"
+)
+
+
+class EmailDeliveryError(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _http() -> httpx.Client:
+    """One keep-alive connection pool to Resend shared by every dispatcher thread."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                concurrency = settings.EMAIL_DISPATCH_CONCURRENCY
+                _client = httpx.Client(
+                    timeout=10,
+                    limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+                )
+    return _client
+
+
+def _credentials_configured() -> bool:
+    return bool(settings.RESEND_API_KEY and settings.RESEND_FROM_EMAIL) or bool(
+        settings.RESEND_FALLBACK_API_KEY and settings.RESEND_FALLBACK_FROM_EMAIL
+    )
+
+
+def _send_email(
+    to_email: str,
+    subject: str,
+    html: str,
+    reply_to: str | None = None,
+    db: Session | None = None,
+) -> bool:
+    """
+    Queue an email in the outbox; the background dispatcher delivers it.
+    With db the row joins the caller's transaction (the caller commits); otherwise it is
+    committed on its own. Returns False only when no Resend credentials are configured.
+    """
+    if not _credentials_configured():
         logger.error("Resend credentials missing; verify RESEND_API_KEY and RESEND_FROM_EMAIL.")
         return False
 
-    payload = {
-        "from": primary_sender,
-        "to": [to_email],
-        "subject": subject,
-        "html": html,
-    }
-    if reply_to:
-        payload["reply_to"] = reply_to
-
-    def _post(api_key: str, body: dict) -> httpx.Response:
-        return httpx.post(
-            "https://api.resend.com/emails",
-            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-            json=body,
-            timeout=10,
-        )
+    row = EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        html=html,
+        reply_to=reply_to,
+        status="pending",
+        next_attempt_at=datetime.now(UTC),
+    )
+    if db is not None:
+        db.add(row)
+        return True
+    own = SessionLocal()
+    try:
+        own.add(row)
+        own.commit()
+    finally:
+        own.close()
+    return True
+
+
+def _post_resend(api_key: str, sender: str, messages: list[EmailOutbox]) -> list[str | None]:
+    bodies = []
+    for message in messages:
+        body = {"from": sender, "to": [message.to_email], "subject": message.subject, "html": message.html}
+        if message.reply_to:
+            body["reply_to"] = message.reply_to
+        bodies.append(body)
+
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    try:
+        if len(bodies) == 1:
+            res = _http().post(RESEND_EMAILS_URL, headers=headers, json=bodies[0])
+        else:
+            res = _http().post(RESEND_BATCH_URL, headers=headers, json=bodies)
+        res.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        status_code = exc.response.status_code
+        raise EmailDeliveryError(f"Resend returned {status_code}", status_code in RETRYABLE_STATUS) from exc
+    except httpx.HTTPError as exc:
+        raise EmailDeliveryError(f"Resend request failed: {exc}", True) from exc
 
-    # If a primary daily cap is configured, route to fallback before we hit the limit.
-    global _primary_daily_date, _primary_daily_count
-    if settings.RESEND_PRIMARY_DAILY_LIMIT:
-        today = datetime.now(UTC).date().isoformat()
-        if _primary_daily_date != today:
-            _primary_daily_date = today
-            _primary_daily_count = 0
-        buffer = max(0, settings.RESEND_PRIMARY_DAILY_BUFFER)
-        if _primary_daily_count >= max(0, settings.RESEND_PRIMARY_DAILY_LIMIT - buffer):
-            primary_key = None  # skip primary
-            logger.info(
-                "Primary Resend skipped due to daily cap guard (%s/%s, buffer=%s)",
-                _primary_daily_count,
-                settings.RESEND_PRIMARY_DAILY_LIMIT,
-                buffer,
+    try:
+        data = res.json()
+    except ValueError:
+        return [None] * len(messages)
+    if len(bodies) == 1:
+        return [data.get("id")]
+    ids = [item.get("id") for item in data.get("data", [])]
+    return ids + [None] * (len(messages) - len(ids))
+
+
+def _reserve_sends(db: Session, account: str, day: str, count: int, cap: int) -> bool:
+    """Atomically add count to the account's counter for the day unless that would pass cap."""
+
+    def bump() -> int:
+        return (
+            db.query(EmailSendCounter)
+            .filter(
+                EmailSendCounter.account == account,
+                EmailSendCounter.day == day,
+                EmailSendCounter.count + count <= cap,
             )
+            .update({EmailSendCounter.count: EmailSendCounter.count + count}, synchronize_session=False)
+        )
 
+    if bump():
+        return True
+    if count > cap:
+        return False
+    exists = (
+        db.query(EmailSendCounter.account)
+        .filter(EmailSendCounter.account == account, EmailSendCounter.day == day)
+        .first()
+    )
+    if exists:
+        return False
     try:
-        if primary_key:
-            res = _post(primary_key, payload)
-            res.raise_for_status()
-            _primary_daily_count += 1
-            logger.info("Primary Resend delivered for %s", to_email)
-            return True
-    except httpx.HTTPStatusError as exc:
-        status_code = exc.response.status_code
-        logger.warning("Primary Resend failed (%s) for %s", status_code, to_email)
-        if status_code not in {429, 500, 502, 503, 504}:
-            logger.exception("Email failed for %s", to_email)
-            return False
-    except Exception:
-        logger.exception("Primary Resend error for %s", to_email)
+        with db.begin_nested():
+            db.add(EmailSendCounter(account=account, day=day, count=count))
+        return True
+    except IntegrityError:
+        # another worker opened the day first
+        return bool(bump())
+
+
+def _primary_reserve(count: int) -> bool:
+    """
+    Claim count sends against the primary account's daily cap (less the buffer) in the shared
+    email_send_counters row. Once a batch is refused, the day is remembered locally so later
+    batches of that size or larger fall back without touching the database.
+    """
+    global _primary_refused
+    limit = settings.RESEND_PRIMARY_DAILY_LIMIT
+    if not limit:
+        return True
+    today = datetime.now(UTC).date().isoformat()
+    refused = _primary_refused
+    if refused is not None and refused[0] == today and count >= refused[1]:
+        return False
+
+    buffer = max(0, settings.RESEND_PRIMARY_DAILY_BUFFER)
+    cap = max(0, limit - buffer)
+    db = SessionLocal()
+    try:
+        reserved = _reserve_sends(db, "primary", today, count, cap)
+        db.commit()
+    finally:
+        db.close()
+    if not reserved:
+        with _primary_refused_lock:
+            if _primary_refused is None or _primary_refused[0] != today or count < _primary_refused[1]:
+                _primary_refused = (today, count)
+        logger.info("Primary Resend skipped due to daily cap guard (limit=%s, buffer=%s)", limit, buffer)
+    return reserved
+
+
+def _primary_release(count: int) -> None:
+    """Hand back a reservation whose batch the primary account did not accept."""
+    if not settings.RESEND_PRIMARY_DAILY_LIMIT:
+        return
+    today = datetime.now(UTC).date().isoformat()
+    db = SessionLocal()
+    try:
+        db.query(EmailSendCounter).filter(
+            EmailSendCounter.account == "primary", EmailSendCounter.day == today
+        ).update({EmailSendCounter.count: EmailSendCounter.count - count}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def deliver(messages: list[EmailOutbox]) -> list[str | None]:
+    """
+    Send up to RESEND_BATCH_MAX messages in one Resend call: primary account first unless the
+    daily cap guard says otherwise, then the fallback account on 429/5xx.
+    Returns provider ids; raises EmailDeliveryError if neither account accepted the batch.
+    """
+    primary_key = settings.RESEND_API_KEY
+    primary_sender = settings.RESEND_FROM_EMAIL
+    error: EmailDeliveryError | None = None
+    if primary_key and primary_sender and _primary_reserve(len(messages)):
+        try:
+            return _post_resend(primary_key, primary_sender, messages)
+        except EmailDeliveryError as exc:
+            _primary_release(len(messages))
+            logger.warning("Primary Resend failed for %s message(s): %s", len(messages), exc)
+            if not exc.retryable:
+                raise
+            error = exc
 
     fallback_key = settings.RESEND_FALLBACK_API_KEY
     fallback_sender = settings.RESEND_FALLBACK_FROM_EMAIL
     if not fallback_key or not fallback_sender:
-        logger.error("Fallback Resend credentials missing; verify RESEND_FALLBACK_API_KEY and RESEND_FALLBACK_FROM_EMAIL.")
-        return False
+        raise error or EmailDeliveryError("No Resend account available", True)
+    return _post_resend(fallback_key, fallback_sender, messages)
+
+
+def _due_filter(now: datetime):
+    return (
+        EmailOutbox.status == "pending",
+        EmailOutbox.next_attempt_at <= now,
+        or_(EmailOutbox.claimed_until.is_(None), EmailOutbox.claimed_until < now),
+    )
+
+
+def claim_outbox(db: Session, now: datetime, batch_size: int) -> list[EmailOutbox]:
+    """Claim due outbox rows with a committed lease so several workers can dispatch at once."""
+    token = uuid.uuid4().hex
+    candidates = (
+        select(EmailOutbox.id)
+        .where(*_due_filter(now))
+        .order_by(EmailOutbox.next_attempt_at.asc(), EmailOutbox.id.asc())
+        .limit(batch_size)
+    )
+    claimed = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.id.in_(candidates.scalar_subquery()), *_due_filter(now))
+        .update(
+            {
+                EmailOutbox.claim_token: token,
+                EmailOutbox.claimed_until: now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not claimed:
+        return []
+    return (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.claim_token == token, EmailOutbox.status == "pending")
+        .order_by(EmailOutbox.id.asc())
+        .all()
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1)))
+
 
-    payload["from"] = fallback_sender
+def _deliver_chunk(messages: list[EmailOutbox]) -> tuple[list[str | None] | None, EmailDeliveryError | None]:
     try:
-        res = _post(fallback_key, payload)
-        res.raise_for_status()
-        logger.info("Fallback Resend delivered for %s", to_email)
-        return True
-    except Exception:
-        logger.exception("Fallback Resend failed for %s", to_email)
-        return False
+        return deliver(messages), None
+    except EmailDeliveryError as exc:
+        return None, exc
+    except Exception as exc:  # never let one chunk take the dispatcher down
+        logger.exception("Email delivery crashed")
+        return None, EmailDeliveryError(str(exc), True)
+
+
+def dispatch_outbox(db: Session, batch_size: int = 500) -> int:
+    """
+    Deliver due outbox rows: chunks of RESEND_BATCH_MAX go out in parallel on the dispatch
+    pool; failures are retried with exponential backoff and given up after MAX_ATTEMPTS.
+    A chunk rejected outright (non-retryable 4xx) is retried one message at a time so a
+    single bad address doesn't sink its neighbours. Returns how many were sent.
+    """
+    now = datetime.now(UTC)
+    rows = claim_outbox(db, now, batch_size)
+    if not rows:
+        return 0
+
+    chunks = [rows[i : i + RESEND_BATCH_MAX] for i in range(0, len(rows), RESEND_BATCH_MAX)]
+    outcomes: dict[int, tuple[str | None, EmailDeliveryError | None]] = {}
+    retry_singly: list[EmailOutbox] = []
+    for chunk, (ids, error) in zip(chunks, _dispatch_pool.map(_deliver_chunk, chunks)):
+        if error is not None and not error.retryable and len(chunk) > 1:
+            retry_singly.extend(chunk)
+            continue
+        for index, message in enumerate(chunk):
+            outcomes[message.id] = (ids[index] if ids else None, error)
+    if retry_singly:
+        singles = _dispatch_pool.map(_deliver_chunk, [[message] for message in retry_singly])
+        for message, (ids, error) in zip(retry_singly, singles):
+            outcomes[message.id] = (ids[0] if ids else None, error)
+
+    sent = 0
+    finished_at = datetime.now(UTC)
+    for message in rows:
+        provider_id, error = outcomes[message.id]
+        message.attempts = (message.attempts or 0) + 1
+        message.claim_token = None
+        message.claimed_until = None
+        if error is None:
+            message.status = "sent"
+            message.sent_at = finished_at
+            message.provider_id = provider_id
+            sent += 1
+        elif not error.retryable or message.attempts >= MAX_ATTEMPTS:
+            message.status = "failed"
+            message.last_error = str(error)[:500]
+            logger.error("Giving up on email %s to %s: %s", message.id, message.to_email, error)
+        else:
+            message.last_error = str(error)[:500]
+            message.next_attempt_at = finished_at + _backoff(message.attempts)
+    db.commit()
+    return sent
+
+
+def next_outbox_attempt(db: Session, now: datetime) -> datetime | None:
+    return (
+        db.query(func.min(EmailOutbox.next_attempt_at))
+        .filter(
+            EmailOutbox.status == "pending",
+            or_(EmailOutbox.claimed_until.is_(None), EmailOutbox.claimed_until < now),
+        )
+        .scalar()
+    )
 
 
 def send_verification_email(to_email: str, token: str) -> bool:
@@ -206,15 +471,10 @@ def send_trial_grant_email(to_email: str, username: str | None, trial_days: int)
     return _send_email(to_email, f"ManifestBank™ Signature — {trial_days} days on us", html)
 
 
-def send_myline_message_email(
-    to_email: str,
-    sender_name: str,
-    thread_id: int,
-    preview: str,
-) -> bool:
+def _myline_message_html(sender_name: str, thread_id: int, preview: str) -> str:
     base = settings.FRONTEND_BASE_URL.rstrip("/")
     thread_url = f"{base}/myline/{thread_id}"
-    html = f"""
+    return f"""
     <div style="font-family: 'Helvetica Neue', Arial, sans-serif; color: #2b2320;">
       <h2 style="margin: 0 0 10px;">New My Line message</h2>
       <p style="margin: 0 0 12px;"><strong>{sender_name}</strong> sent you a new message.</p>
@@ -231,19 +491,23 @@ def send_myline_message_email(
       </p>
     </div>
     """
-    return _send_email(to_email, "ManifestBank™ — New My Line message", html)
 
 
-def send_post_comment_email(
+def send_myline_message_email(
     to_email: str,
-    commenter_name: str,
-    post_id: int,
-    comment_id: int,
+    sender_name: str,
+    thread_id: int,
     preview: str,
+    db: Session | None = None,
 ) -> bool:
+    html = _myline_message_html(sender_name, thread_id, preview)
+    return _send_email(to_email, MYLINE_SUBJECT, html, db=db)
+
+
+def _post_comment_html(commenter_name: str, post_id: int, comment_id: int, preview: str) -> str:
     base = settings.FRONTEND_BASE_URL.rstrip("/")
     post_url = f"{base}/ether?post_id={post_id}&comment_id={comment_id}"
-    html = f"""
+    return f"""
     <div style="font-family: 'Helvetica Neue', Arial, sans-serif; color: #2b2320;">
       <h2 style="margin: 0 0 10px;">New comment on your post</h2>
       <p style="margin: 0 0 12px;"><strong>{commenter_name}</strong> commented on your post.</p>
@@ -260,7 +524,18 @@ def send_post_comment_email(
       </p>
     </div>
     """
-    return _send_email(to_email, "ManifestBank™ — New comment", html)
+
+
+def send_post_comment_email(
+    to_email: str,
+    commenter_name: str,
+    post_id: int,
+    comment_id: int,
+    preview: str,
+    db: Session | None = None,
+) -> bool:
+    html = _post_comment_html(commenter_name, post_id, comment_id, preview)
+    return _send_email(to_email, COMMENT_SUBJECT, html, db=db)
 
 
 def send_ledger_post_email(
@@ -270,6 +545,7 @@ def send_ledger_post_email(
     amount: str,
     entry_type: str,
     link_path: str,
+    db: Session | None = None,
 ) -> bool:
     base = settings.FRONTEND_BASE_URL.rstrip("/")
     link = f"{base}{link_path}"
@@ -293,7 +569,7 @@ def send_ledger_post_email(
       </p>
     </div>
     """
-    return _send_email(to_email, "ManifestBank™ — Account update", html)
+    return _send_email(to_email, "ManifestBank™ — Account update", html, db=db)
 
 
 def send_signature_account_fix_email(
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, UTC
+import logging
+import uuid
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailDigestItem
+from app.services.email import (
+    COMMENT_SUBJECT,
+    MYLINE_SUBJECT,
+    _credentials_configured,
+    _myline_message_html,
+    _post_comment_html,
+    _send_email,
+)
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SUBJECT = "ManifestBank™ — New activity"
+# most recipients flushed per pass; the dispatcher loops until nothing is due
+FLUSH_BATCH = 200
+
+
+def _send_now(item: EmailDigestItem, db: Session | None) -> bool:
+    if item.kind == "comment":
+        html = _post_comment_html(item.actor_name, item.link_id, item.detail_id, item.preview)
+        return _send_email(item.to_email, COMMENT_SUBJECT, html, db=db)
+    html = _myline_message_html(item.actor_name, item.link_id, item.preview)
+    return _send_email(item.to_email, MYLINE_SUBJECT, html, db=db)
+
+
+def _insert_pending(session: Session, values: dict) -> bool:
+    """Insert a pending item unless one already holds (to_email, dedup_key); True if inserted."""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = (
+            insert(EmailDigestItem)
+            .values(**values)
+            .on_conflict_do_nothing(
+                index_elements=["to_email", "dedup_key"],
+                index_where=EmailDigestItem.status == "pending",
+            )
+        )
+        return session.execute(stmt).rowcount > 0
+    try:
+        with session.begin_nested():
+            session.add(EmailDigestItem(**values))
+    except IntegrityError:
+        return False
+    return True
+
+
+def queue_notification_email(
+    to_email: str,
+    kind: str,
+    dedup_key: str,
+    actor_name: str,
+    preview: str,
+    link_id: int,
+    detail_id: int | None = None,
+    db: Session | None = None,
+) -> bool:
+    """
+    Hold a chat/comment notification for the recipient's next digest.
+    A second event with the same dedup_key (thread:<id>, post:<id>) before the digest goes
+    out bumps the pending row instead of adding one; a unique index on pending rows keeps
+    that true for concurrent events. With EMAIL_DIGEST_WINDOW_SECONDS=0
+    the email is queued in the outbox straight away.
+    With db the row joins the caller's transaction (the caller commits).
+    """
+    item = EmailDigestItem(
+        to_email=to_email,
+        kind=kind,
+        dedup_key=dedup_key,
+        actor_name=actor_name,
+        preview=preview,
+        link_id=link_id,
+        detail_id=detail_id,
+    )
+    if settings.EMAIL_DIGEST_WINDOW_SECONDS <= 0:
+        return _send_now(item, db)
+    if not _credentials_configured():
+        logger.error("Resend credentials missing; verify RESEND_API_KEY and RESEND_FROM_EMAIL.")
+        return False
+
+    own = db is None
+    session = SessionLocal() if own else db
+    try:
+        now = datetime.now(UTC)
+
+        def bump() -> int:
+            return (
+                session.query(EmailDigestItem)
+                .filter(
+                    EmailDigestItem.to_email == to_email,
+                    EmailDigestItem.dedup_key == dedup_key,
+                    EmailDigestItem.status == "pending",
+                )
+                .update(
+                    {
+                        EmailDigestItem.count: EmailDigestItem.count + 1,
+                        EmailDigestItem.actor_name: actor_name,
+                        EmailDigestItem.preview: preview,
+                        EmailDigestItem.detail_id: detail_id,
+                        EmailDigestItem.last_at: now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+
+        if not bump():
+            values = {
+                "to_email": to_email,
+                "kind": kind,
+                "dedup_key": dedup_key,
+                "actor_name": actor_name,
+                "preview": preview,
+                "link_id": link_id,
+                "detail_id": detail_id,
+                "status": "pending",
+                "count": 1,
+                "first_at": now,
+                "last_at": now,
+            }
+            if not _insert_pending(session, values):
+                # a concurrent event for the same key inserted the pending row first
+                bump()
+        if own:
+            session.commit()
+    finally:
+        if own:
+            session.close()
+    return True
+
+
+def _digest_html(items: list[EmailDigestItem]) -> str:
+    base = settings.FRONTEND_BASE_URL.rstrip("/")
+    rows = []
+    for item in items:
+        if item.kind == "comment":
+            url = f"{base}/ether?post_id={item.link_id}&comment_id={item.detail_id}"
+            what = "new comment" if item.count == 1 else f"{item.count} new comments"
+            line = f"{what} on your post, latest from <strong>{item.actor_name}</strong>"
+        else:
+            url = f"{base}/myline/{item.link_id}"
+            what = "new message" if item.count == 1 else f"{item.count} new messages"
+            line = f"{what} in My Line, latest from <strong>{item.actor_name}</strong>"
+        rows.append(
+            f"""
+      <div style="margin: 0 0 14px;">
+        <p style="margin: 0 0 6px;">{line}</p>
+        <p style="margin: 0 0 6px; padding: 10px 12px; background: #f7f2ef; border-radius: 12px;">{item.preview}</p>
+        <a href="{url}" style="color:#b67967;font-weight:600;">Open</a>
+      </div>"""
+        )
+    return f"""
+    <div style="font-family: 'Helvetica Neue', Arial, sans-serif; color: #2b2320;">
+      <h2 style="margin: 0 0 10px;">New activity on ManifestBank™</h2>
+      {''.join(rows)}
+      <p style="font-size:12px;opacity:0.7;margin-top:18px;">
+        Sent {datetime.now(UTC).strftime('%b %d, %Y %I:%M %p UTC')}
+      </p>
+    </div>
+    """
+
+
+def flush_digests(db: Session, now: datetime | None = None) -> int:
+    """
+    Turn every recipient whose oldest pending item has waited a full window into one outbox
+    email. Items are claimed with a token so concurrent flushers never mail the same item
+    twice, and are deleted in the same transaction that adds the outbox rows.
+    Returns the number of recipients flushed.
+    """
+    now = now or datetime.now(UTC)
+    cutoff = now - timedelta(seconds=settings.EMAIL_DIGEST_WINDOW_SECONDS)
+    recipients = [
+        row.to_email
+        for row in db.query(EmailDigestItem.to_email)
+        .filter(EmailDigestItem.status == "pending")
+        .group_by(EmailDigestItem.to_email)
+        .having(func.min(EmailDigestItem.first_at) <= cutoff)
+        .limit(FLUSH_BATCH)
+    ]
+    flushed = 0
+    for to_email in recipients:
+        token = uuid.uuid4().hex
+        claimed = (
+            db.query(EmailDigestItem)
+            .filter(EmailDigestItem.to_email == to_email, EmailDigestItem.status == "pending")
+            .update(
+                {EmailDigestItem.status: "flushing", EmailDigestItem.flush_token: token},
+                synchronize_session=False,
+            )
+        )
+        if not claimed:
+            continue
+        items = (
+            db.query(EmailDigestItem)
+            .filter(EmailDigestItem.flush_token == token)
+            .order_by(EmailDigestItem.last_at.desc(), EmailDigestItem.id.desc())
+            .all()
+        )
+        if len(items) == 1 and items[0].count == 1:
+            _send_now(items[0], db)
+        else:
+            _send_email(to_email, DIGEST_SUBJECT, _digest_html(items), db=db)
+        flushed += 1
+        db.query(EmailDigestItem).filter(EmailDigestItem.flush_token == token).delete(synchronize_session=False)
+    db.commit()
+    return flushed
+
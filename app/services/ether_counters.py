@@ -0,0 +1,44 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.ether import EtherPost, EtherComment, EtherLike, EtherCommentLike
+
+
+def bump_counter(db: Session, column, row_id: int, delta: int) -> None:
+    """Atomically add delta to a denormalized counter column (e.g. EtherPost.like_count). Does not commit."""
+    model = column.class_
+    db.execute(update(model).where(model.id == row_id).values({column: column + delta}))
+
+
+def _counter_sources():
+    return (
+        (
+            EtherPost.like_count,
+            select(func.count(EtherLike.id)).where(EtherLike.post_id == EtherPost.id).scalar_subquery(),
+        ),
+        (
+            EtherPost.comment_count,
+            select(func.count(EtherComment.id)).where(EtherComment.post_id == EtherPost.id).scalar_subquery(),
+        ),
+        (
+            EtherComment.align_count,
+            select(func.count(EtherCommentLike.id))
+            .where(EtherCommentLike.comment_id == EtherComment.id)
+            .scalar_subquery(),
+        ),
+    )
+
+
+def repair_ether_counters(db: Session) -> int:
+    """Recompute like/comment/align counters from their source tables. Returns how many rows drifted."""
+    repaired = 0
+    for column, actual in _counter_sources():
+        result = db.execute(
+            update(column.class_)
+            .where(column != actual)
+            .values({column: actual})
+            .execution_options(synchronize_session=False)
+        )
+        repaired += result.rowcount or 0
+    db.commit()
+    return repaired
@@ -0,0 +1,255 @@
+from datetime import datetime
+
+from sqlalchemy import insert, select, exists, func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.core.pagination import cursor_pivot, keyset_window
+from app.models.ether import Profile, EtherPost, EtherSyncRequest, EtherSyncEdge, EtherTimelineEntry
+
+# Authors with more syncs than this are not fanned out on write; readers pull their posts instead.
+FANOUT_MAX_SYNCS = 500
+# How many of an author's recent posts are copied into an inbox when a sync is approved.
+INBOX_BACKFILL_POSTS = 50
+
+
+def _is_hub(sync_count: int | None) -> bool:
+    return (sync_count or 0) > FANOUT_MAX_SYNCS
+
+
+def sync_partner_ids(db: Session, profile_id: int) -> list[int]:
+    return [
+        row.partner_profile_id
+        for row in db.query(EtherSyncEdge.partner_profile_id).filter(EtherSyncEdge.profile_id == profile_id)
+    ]
+
+
+def is_synced(db: Session, profile_id: int, partner_profile_id: int) -> bool:
+    return (
+        db.query(EtherSyncEdge)
+        .filter(EtherSyncEdge.profile_id == profile_id, EtherSyncEdge.partner_profile_id == partner_profile_id)
+        .first()
+        is not None
+    )
+
+
+def _backfill_inbox(db: Session, author_profile_id: int, reader_ids: list[int] | None = None) -> None:
+    """
+    Copy the author's recent posts into each reader's inbox (default: all of the author's
+    partners), and record on each reader's edge where the copy stopped so timeline_posts
+    can read anything older from ether_posts.
+    """
+    if reader_ids is None:
+        reader_ids = sync_partner_ids(db, author_profile_id)
+    if not reader_ids:
+        return
+    by_recency = (
+        select(EtherPost.id, EtherPost.created_at)
+        .where(EtherPost.author_profile_id == author_profile_id)
+        .order_by(EtherPost.created_at.desc(), EtherPost.id.desc())
+    )
+    recent_post_ids = by_recency.with_only_columns(EtherPost.id).limit(INBOX_BACKFILL_POSTS)
+    # the newest post that doesn't fit; everything after its created_at is copied
+    first_left_out = db.execute(by_recency.offset(INBOX_BACKFILL_POSTS).limit(1)).first()
+    db.query(EtherSyncEdge).filter(
+        EtherSyncEdge.profile_id.in_(reader_ids),
+        EtherSyncEdge.partner_profile_id == author_profile_id,
+    ).update(
+        {EtherSyncEdge.inbox_complete_after: first_left_out.created_at if first_left_out else None},
+        synchronize_session=False,
+    )
+    already = aliased(EtherTimelineEntry)
+    # copied with INSERT ... SELECT so created_at matches the post row exactly
+    db.execute(
+        insert(EtherTimelineEntry).from_select(
+            ["profile_id", "post_id", "author_profile_id", "created_at"],
+            select(Profile.id, EtherPost.id, EtherPost.author_profile_id, EtherPost.created_at)
+            .select_from(EtherPost)
+            .join(Profile, Profile.id.in_(reader_ids))
+            .where(
+                EtherPost.id.in_(recent_post_ids),
+                ~exists().where(already.profile_id == Profile.id, already.post_id == EtherPost.id),
+            ),
+        )
+    )
+
+
+def add_sync_edge(db: Session, profile_a_id: int, profile_b_id: int) -> None:
+    """
+    Record an approved sync in both directions. Does not commit.
+    The edges go in under a savepoint, so a pair that a concurrent approval (or
+    rebuild_sync_graph) already recorded is a no-op rather than a primary-key error.
+    """
+    if profile_a_id == profile_b_id:
+        return
+    try:
+        with db.begin_nested():
+            db.add(EtherSyncEdge(profile_id=profile_a_id, partner_profile_id=profile_b_id))
+            db.add(EtherSyncEdge(profile_id=profile_b_id, partner_profile_id=profile_a_id))
+    except IntegrityError:
+        return
+    db.query(Profile).filter(Profile.id.in_([profile_a_id, profile_b_id])).update(
+        {Profile.sync_count: Profile.sync_count + 1}, synchronize_session=False
+    )
+    db.flush()
+
+    counts = dict(
+        db.query(Profile.id, Profile.sync_count).filter(Profile.id.in_([profile_a_id, profile_b_id])).all()
+    )
+    for author_id, reader_id in ((profile_a_id, profile_b_id), (profile_b_id, profile_a_id)):
+        if not _is_hub(counts.get(author_id)):
+            _backfill_inbox(db, author_id, [reader_id])
+
+
+def remove_sync_edge(db: Session, profile_a_id: int, profile_b_id: int) -> None:
+    """Drop an approved sync in both directions and clear the inboxes it fed. Does not commit."""
+    if not is_synced(db, profile_a_id, profile_b_id):
+        return
+    db.query(EtherSyncEdge).filter(
+        or_(
+            and_(EtherSyncEdge.profile_id == profile_a_id, EtherSyncEdge.partner_profile_id == profile_b_id),
+            and_(EtherSyncEdge.profile_id == profile_b_id, EtherSyncEdge.partner_profile_id == profile_a_id),
+        )
+    ).delete(synchronize_session=False)
+    db.query(EtherTimelineEntry).filter(
+        or_(
+            and_(EtherTimelineEntry.profile_id == profile_a_id, EtherTimelineEntry.author_profile_id == profile_b_id),
+            and_(EtherTimelineEntry.profile_id == profile_b_id, EtherTimelineEntry.author_profile_id == profile_a_id),
+        )
+    ).delete(synchronize_session=False)
+    db.query(Profile).filter(Profile.id.in_([profile_a_id, profile_b_id])).update(
+        {Profile.sync_count: Profile.sync_count - 1}, synchronize_session=False
+    )
+    db.flush()
+
+    # an author that just dropped back under the hub threshold gets fanned out again
+    for profile_id, sync_count in db.query(Profile.id, Profile.sync_count).filter(
+        Profile.id.in_([profile_a_id, profile_b_id])
+    ):
+        if sync_count == FANOUT_MAX_SYNCS:
+            _backfill_inbox(db, profile_id)
+
+
+def fan_out_post(db: Session, post: EtherPost) -> None:
+    """Push a new post into its author's partners' inboxes, unless the author is a hub. Does not commit."""
+    author = db.query(Profile.sync_count).filter(Profile.id == post.author_profile_id).first()
+    if author is None or _is_hub(author.sync_count):
+        return
+    db.execute(
+        insert(EtherTimelineEntry).from_select(
+            ["profile_id", "post_id", "author_profile_id", "created_at"],
+            select(
+                EtherSyncEdge.partner_profile_id,
+                EtherPost.id,
+                EtherPost.author_profile_id,
+                EtherPost.created_at,
+            )
+            .join(EtherPost, EtherPost.author_profile_id == EtherSyncEdge.profile_id)
+            .where(EtherPost.id == post.id),
+        )
+    )
+
+
+def remove_post_from_timelines(db: Session, post_id: int) -> None:
+    db.query(EtherTimelineEntry).filter(EtherTimelineEntry.post_id == post_id).delete(synchronize_session=False)
+
+
+def timeline_posts(
+    db: Session,
+    profile_id: int,
+    limit: int = 50,
+    before: tuple[datetime, int] | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> list[EtherPost]:
+    """
+    Posts by the profile's sync partners: one range scan of the profile's inbox, plus a
+    pull of recent posts from any hub partners (which are never fanned out).
+    The inbox only goes back to its horizon (the latest inbox_complete_after on the
+    profile's edges); a page that reaches past it reads the older posts from ether_posts.
+    Newest first, or with an `after` cursor the posts nearest above it, oldest first.
+    Raises ValueError for a cursor post that isn't by one of the profile's partners.
+    """
+    cursor = after or before
+    newer = after is not None
+    partner_ids = select(EtherSyncEdge.partner_profile_id).where(EtherSyncEdge.profile_id == profile_id)
+
+    horizon = (
+        db.query(func.max(EtherSyncEdge.inbox_complete_after)).filter(EtherSyncEdge.profile_id == profile_id).scalar()
+    )
+    posts_query = (
+        db.query(EtherPost)
+        .join(EtherTimelineEntry, EtherTimelineEntry.post_id == EtherPost.id)
+        .filter(EtherTimelineEntry.profile_id == profile_id)
+    )
+    if horizon is not None:
+        posts_query = posts_query.filter(EtherTimelineEntry.created_at > horizon)
+    hub_ids = (
+        select(EtherSyncEdge.partner_profile_id)
+        .join(Profile, Profile.id == EtherSyncEdge.partner_profile_id)
+        .where(EtherSyncEdge.profile_id == profile_id, Profile.sync_count > FANOUT_MAX_SYNCS)
+    )
+    hub_query = db.query(EtherPost).filter(EtherPost.author_profile_id.in_(hub_ids))
+    if cursor is not None:
+        partner_posts = db.query(EtherPost).filter(EtherPost.author_profile_id.in_(partner_ids))
+        pivot = cursor_pivot(partner_posts, EtherPost, cursor)
+        posts_query = keyset_window(
+            posts_query, EtherTimelineEntry.created_at, EtherTimelineEntry.post_id, pivot, cursor[1], newer
+        )
+        hub_query = keyset_window(hub_query, EtherPost.created_at, EtherPost.id, pivot, cursor[1], newer)
+    else:
+        posts_query = posts_query.order_by(EtherTimelineEntry.created_at.desc(), EtherTimelineEntry.post_id.desc())
+        hub_query = hub_query.order_by(EtherPost.created_at.desc(), EtherPost.id.desc())
+
+    posts = posts_query.limit(limit).all()
+    hub_posts = hub_query.limit(limit).all()
+    older_posts = []
+    # past the horizon every partner's posts are read from ether_posts, as for hubs; newest-first
+    # pages only get there once the (all newer) inbox rows run out
+    if horizon is not None and (newer or len(posts) < limit):
+        older_query = db.query(EtherPost).filter(
+            EtherPost.author_profile_id.in_(partner_ids), EtherPost.created_at <= horizon
+        )
+        if cursor is not None:
+            older_query = keyset_window(older_query, EtherPost.created_at, EtherPost.id, pivot, cursor[1], newer)
+        else:
+            older_query = older_query.order_by(EtherPost.created_at.desc(), EtherPost.id.desc())
+        older_posts = older_query.limit(limit).all()
+    if hub_posts or older_posts:
+        merged = {post.id: post for post in posts + hub_posts + older_posts}
+        posts = sorted(merged.values(), key=lambda p: (p.created_at, p.id), reverse=not newer)[:limit]
+    return posts
+
+
+def rebuild_sync_graph(db: Session) -> int:
+    """Rebuild edges, sync counts and inboxes from approved sync requests. Returns the edge count."""
+    db.query(EtherTimelineEntry).delete(synchronize_session=False)
+    db.query(EtherSyncEdge).delete(synchronize_session=False)
+    pairs: set[tuple[int, int]] = set()
+    for req in db.query(EtherSyncRequest.requester_profile_id, EtherSyncRequest.target_profile_id).filter(
+        EtherSyncRequest.status == "approved"
+    ):
+        if req.requester_profile_id == req.target_profile_id:
+            continue
+        pairs.add((req.requester_profile_id, req.target_profile_id))
+        pairs.add((req.target_profile_id, req.requester_profile_id))
+    if pairs:
+        db.execute(
+            insert(EtherSyncEdge),
+            [{"profile_id": a, "partner_profile_id": b} for a, b in pairs],
+        )
+
+    degree: dict[int, int] = {}
+    for profile_id, _ in pairs:
+        degree[profile_id] = degree.get(profile_id, 0) + 1
+    db.query(Profile).update({Profile.sync_count: 0}, synchronize_session=False)
+    for profile_id, count in degree.items():
+        db.query(Profile).filter(Profile.id == profile_id).update(
+            {Profile.sync_count: count}, synchronize_session=False
+        )
+    db.flush()
+
+    for author_id, count in degree.items():
+        if not _is_hub(count):
+            _backfill_inbox(db, author_id)
+    db.commit()
+    return len(pairs)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import io
+import uuid
+
+import numpy as np
+from PIL import Image, ImageOps, features
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.media import UploadedImage
+from app.services.r2 import upload_bytes
+
+# longest edge of each derivative, largest first so each one is resized from the previous
+VARIANT_EDGES: tuple[tuple[str, int], ...] = (("full", 1600), ("medium", 720), ("thumb", 160))
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+# the skin-ratio heuristic only ever looks at a preview this size
+MODERATION_EDGE = 256
+# CLIP's processor resizes the shortest edge to 224, so its input keeps at least that much
+CLIP_SHORT_EDGE = 224
+ALLOWED_FORMATS = frozenset({"JPEG", "PNG", "WEBP", "GIF"})
+
+_upload_pool = ThreadPoolExecutor(max_workers=settings.R2_MAX_POOL_CONNECTIONS, thread_name_prefix="r2")
+
+
+class ImageRejected(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Derivative:
+    name: str
+    content: bytes
+    content_type: str
+    ext: str
+    size: tuple[int, int]
+
+
+class ImageAsset:
+    """
+    An upload decoded exactly once: validated (format, dimensions, decompression-bomb guard),
+    turned upright, stripped of metadata and capped at the largest derivative's edge.
+    Moderation and derivative generation both work from this one decode.
+    """
+
+    def __init__(self, payload: bytes, image: Image.Image, source_format: str, source_size: tuple[int, int]):
+        self.payload = payload
+        self.image = image
+        self.format = source_format
+        self.size = source_size
+        self._preview: Image.Image | None = None
+        self._preview_array: np.ndarray | None = None
+        self._clip_input: Image.Image | None = None
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "ImageAsset":
+        try:
+            source = Image.open(io.BytesIO(payload))
+        except Exception:
+            raise ImageRejected("Invalid or unsupported image.")
+        with source:
+            # Image.open only parses the header, so these checks run before any pixel is decoded
+            if source.format not in ALLOWED_FORMATS:
+                raise ImageRejected("Invalid or unsupported image.")
+            width, height = source.size
+            if width < 1 or height < 1:
+                raise ImageRejected("Invalid or unsupported image.")
+            if width * height > settings.IMAGE_MAX_PIXELS:
+                raise ImageRejected("Image dimensions are too large.")
+            source_format = source.format
+            # EXIF orientations 5-8 are rotated a quarter turn
+            upright_size = (height, width) if source.getexif().get(0x0112) in (5, 6, 7, 8) else (width, height)
+            try:
+                # JPEGs decode straight at a reduced scale when the full derivative is smaller
+                source.draft("RGB", (VARIANT_EDGES[0][1], VARIANT_EDGES[0][1]))
+                image = ImageOps.exif_transpose(source)
+                image.load()
+            except Exception:
+                raise ImageRejected("Invalid or unsupported image.")
+
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image.info = {}
+        image.thumbnail((VARIANT_EDGES[0][1], VARIANT_EDGES[0][1]), Image.Resampling.LANCZOS)
+        return cls(payload, image, source_format, upright_size)
+
+    def preview(self) -> Image.Image:
+        """RGB copy no larger than MODERATION_EDGE, shared by every moderation check."""
+        if self._preview is None:
+            preview = self.image.convert("RGB") if self.image.mode != "RGB" else self.image.copy()
+            preview.thumbnail((MODERATION_EDGE, MODERATION_EDGE))
+            self._preview = preview
+        return self._preview
+
+    def preview_array(self) -> np.ndarray:
+        if self._preview_array is None:
+            self._preview_array = np.asarray(self.preview()).astype(np.float32)
+        return self._preview_array
+
+    def clip_input(self) -> Image.Image:
+        """RGB copy downscaled to a CLIP_SHORT_EDGE shortest edge, so CLIP never upscales the preview."""
+        if self._clip_input is None:
+            image = self.image.convert("RGB") if self.image.mode != "RGB" else self.image.copy()
+            width, height = image.size
+            shortest = min(width, height)
+            if shortest > CLIP_SHORT_EDGE:
+                scale = CLIP_SHORT_EDGE / shortest
+                size = (max(CLIP_SHORT_EDGE, round(width * scale)), max(CLIP_SHORT_EDGE, round(height * scale)))
+                image = image.resize(size, Image.Resampling.LANCZOS)
+            self._clip_input = image
+        return self._clip_input
+
+
+def _output_format() -> tuple[str, str, str]:
+    if features.check("webp"):
+        return "WEBP", "image/webp", "webp"
+    return "JPEG", "image/jpeg", "jpg"
+
+
+def render_derivatives(asset: ImageAsset) -> list[Derivative]:
+    """Encode full/medium/thumb derivatives of the asset with no EXIF, ICC or other metadata."""
+    fmt, content_type, ext = _output_format()
+    image = asset.image.copy() if fmt == "WEBP" or asset.image.mode == "RGB" else asset.image.convert("RGB")
+    derivatives = []
+    for name, edge in VARIANT_EDGES:
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        if fmt == "WEBP":
+            image.save(buffer, format=fmt, quality=WEBP_QUALITY)
+        else:
+            image.save(buffer, format=fmt, quality=JPEG_QUALITY, optimize=True, progressive=True)
+        derivatives.append(Derivative(name, buffer.getvalue(), content_type, ext, image.size))
+    return derivatives
+
+
+def store_image(
+    db: Session,
+    asset: ImageAsset,
+    prefix: str,
+    owner_user_id: int | None = None,
+) -> UploadedImage:
+    """
+    Upload the derivatives to R2 in parallel and record their URLs. Does not commit.
+    The client's original bytes (with their EXIF/GPS/ICC data) are never uploaded: the
+    canonical url is the metadata-free full derivative.
+    """
+    derivatives = render_derivatives(asset)
+    stem = f"{prefix}/{uuid.uuid4().hex}"
+    urls = list(
+        _upload_pool.map(
+            lambda d: upload_bytes(io.BytesIO(d.content), f"{stem}_{d.name}.{d.ext}", d.content_type),
+            derivatives,
+        )
+    )
+    variant_urls = {d.name: url for d, url in zip(derivatives, urls)}
+    # dimensions of the image actually served at url, not of the client's original
+    width, height = derivatives[0].size
+    image = UploadedImage(
+        url=variant_urls["full"],
+        owner_user_id=owner_user_id,
+        thumb_url=variant_urls["thumb"],
+        medium_url=variant_urls["medium"],
+        full_url=variant_urls["full"],
+        width=width,
+        height=height,
+    )
+    db.add(image)
+    return image
+
+
+def image_urls(image: UploadedImage) -> dict[str, str]:
+    return {
+        "url": image.url,
+        "thumb_url": image.thumb_url,
+        "medium_url": image.medium_url,
+        "full_url": image.full_url,
+    }
+
+
+def variants_for(db: Session, url: str | None) -> UploadedImage | None:
+    if not url:
+        return None
+    return db.query(UploadedImage).filter(UploadedImage.url == url).first()
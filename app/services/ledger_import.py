@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+
+from app.schemas.ledger import LedgerEntryCreate
+
+IMPORT_FORMATS = ("csv", "ndjson")
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+READ_CHUNK_BYTES = 64 * 1024
+# NDJSON lines longer than this are rejected without being held in memory
+MAX_LINE_CHARS = 64 * 1024
+# raw rows kept in the error file are cut to this length
+RAW_ROW_MAX_CHARS = 2000
+
+
+class ImportFormatError(ValueError):
+    """The upload as a whole can't be read (bad encoding, unterminated CSV quote, no header)."""
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks, pulled only as the reader needs them."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def format_for(content_type: str | None, filename: str | None = None) -> str | None:
+    """csv | ndjson from a Content-Type header, falling back to the file extension."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in _CONTENT_TYPES:
+        return _CONTENT_TYPES[media_type]
+    ext = (filename or "").rsplit(".", 1)[-1].lower()
+    if ext == "csv":
+        return "csv"
+    if ext in ("ndjson", "jsonl"):
+        return "ndjson"
+    return None
+
+
+def open_text(chunks: Iterable[bytes]) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedReader(_ChunkStream(chunks)), encoding="utf-8-sig", newline="")
+
+
+def _clip(raw: str) -> str:
+    raw = raw.rstrip("\r\n")
+    return raw if len(raw) <= RAW_ROW_MAX_CHARS else raw[:RAW_ROW_MAX_CHARS] + "…"
+
+
+def _validate(row: object) -> LedgerEntryCreate | str:
+    if not isinstance(row, dict):
+        return "Expected an object with ledger entry fields"
+    try:
+        return LedgerEntryCreate.model_validate(row)
+    except ValidationError as exc:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+        )
+
+
+def _csv_rows(text: io.TextIOWrapper) -> Iterator[tuple[int, str, LedgerEntryCreate | str]]:
+    reader = csv.reader(text)
+    try:
+        header = [name.strip() for name in next(reader)]
+    except StopIteration:
+        raise ImportFormatError("The CSV upload is empty")
+    if "account_id" not in header:
+        raise ImportFormatError("The CSV header must name the LedgerEntryCreate fields (account_id, ...)")
+    for fields in reader:
+        if not any(field.strip() for field in fields):
+            continue
+        raw = io.StringIO()
+        csv.writer(raw).writerow(fields)
+        line = reader.line_num
+        if len(fields) > len(header):
+            yield line, _clip(raw.getvalue()), f"Expected {len(header)} fields, got {len(fields)}"
+            continue
+        # blank cells fall back to the schema defaults
+        row: dict[str, object] = {
+            name: value.strip() for name, value in zip(header, fields) if name and value.strip()
+        }
+        if "meta" in row:
+            try:
+                row["meta"] = json.loads(row["meta"])
+            except ValueError:
+                yield line, _clip(raw.getvalue()), "meta: Invalid JSON"
+                continue
+        yield line, _clip(raw.getvalue()), _validate(row)
+
+
+def _ndjson_rows(text: io.TextIOWrapper) -> Iterator[tuple[int, str, LedgerEntryCreate | str]]:
+    line = 0
+    while True:
+        raw = text.readline(MAX_LINE_CHARS)
+        if not raw:
+            return
+        line += 1
+        if len(raw) == MAX_LINE_CHARS and not raw.endswith(("\n", "\r")):
+            # drain the rest of the oversized line without keeping it
+            while True:
+                rest = text.readline(MAX_LINE_CHARS)
+                if not rest or rest.endswith(("\n", "\r")):
+                    break
+            yield line, _clip(raw), f"Line exceeds {MAX_LINE_CHARS} characters"
+            continue
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as exc:
+            yield line, _clip(raw), f"Invalid JSON: {exc.msg}"
+            continue
+        yield line, _clip(raw), _validate(row)
+
+
+def iter_import_rows(chunks: Iterable[bytes], fmt: str) -> Iterator[tuple[int, str, LedgerEntryCreate | str]]:
+    """
+    Parse an upload incrementally, one (line number, raw row, entry or error message) per
+    data row. Only the current row is held in memory; blank rows are skipped.
+    Raises ImportFormatError when the rest of the upload can't be read.
+    """
+    text = open_text(chunks)
+    rows = _csv_rows(text) if fmt == "csv" else _ndjson_rows(text)
+    try:
+        yield from rows
+    except UnicodeDecodeError:
+        raise ImportFormatError("The upload is not valid UTF-8")
+    except csv.Error as exc:
+        raise ImportFormatError(f"Malformed CSV: {exc}")
@@ -2,16 +2,15 @@
 
 from __future__ import annotations
 
-import io
 import os
 import re
 from functools import lru_cache
 from typing import Iterable, Tuple
 
 from PIL import Image
-import numpy as np
 
 from app.core.config import settings
+from app.services.images import ImageAsset
 
 
 UNSAFE_LABELS: Tuple[str, ...] = (
@@ -205,15 +204,12 @@ def _score_image(image: Image.Image, labels: Iterable[str]) -> list[float]:
     return probs.tolist()
 
 
-def _moderate_image_lite(payload: bytes, skin_threshold: float = LITE_SKIN_THRESHOLD) -> tuple[bool, str | None]:
-    if len(payload) > LITE_MAX_IMAGE_SIZE:
+def _moderate_image_lite(
+    asset: ImageAsset, skin_threshold: float = LITE_SKIN_THRESHOLD
+) -> tuple[bool, str | None]:
+    if len(asset.payload) > LITE_MAX_IMAGE_SIZE:
         return False, "Image rejected: file is too large."
-    try:
-        image = Image.open(io.BytesIO(payload)).convert("RGB")
-    except Exception:
-        return False, "Invalid or unsupported image."
-    image.thumbnail((256, 256))
-    arr = np.asarray(image).astype(np.float32)
+    arr = asset.preview_array()
     r = arr[:, :, 0]
     g = arr[:, :, 1]
     b = arr[:, :, 2]
@@ -236,14 +232,9 @@ def _moderate_image_lite(payload: bytes, skin_threshold: float = LITE_SKIN_THRES
     return True, None
 
 
-def _moderate_image_full(payload: bytes) -> tuple[bool, str | None]:
-    try:
-        image = Image.open(io.BytesIO(payload)).convert("RGB")
-    except Exception:
-        return False, "Invalid or unsupported image."
-
+def _moderate_image_full(asset: ImageAsset) -> tuple[bool, str | None]:
     labels = (SAFE_LABEL,) + UNSAFE_LABELS
-    probs = _score_image(image, labels)
+    probs = _score_image(asset.clip_input(), labels)
     safe_prob = probs[0]
     unsafe_probs = probs[1:]
     worst_prob = max(unsafe_probs)
@@ -255,20 +246,20 @@ def _moderate_image_full(payload: bytes) -> tuple[bool, str | None]:
     return True, None
 
 
-def moderate_image_bytes(payload: bytes) -> tuple[bool, str | None]:
+def moderate_image_asset(asset: ImageAsset) -> tuple[bool, str | None]:
     if MODERATION_MODE == "off":
         return True, None
     if MODERATION_MODE == "lite":
-        return _moderate_image_lite(payload)
-    return _moderate_image_full(payload)
+        return _moderate_image_lite(asset)
+    return _moderate_image_full(asset)
 
 
-def moderate_avatar_image_bytes(payload: bytes) -> tuple[bool, str | None]:
+def moderate_avatar_image_asset(asset: ImageAsset) -> tuple[bool, str | None]:
     if MODERATION_MODE == "off":
         return True, None
     if MODERATION_MODE == "lite":
-        return _moderate_image_lite(payload, skin_threshold=AVATAR_SKIN_THRESHOLD)
-    return _moderate_image_full(payload)
+        return _moderate_image_lite(asset, skin_threshold=AVATAR_SKIN_THRESHOLD)
+    return _moderate_image_full(asset)
 
 
 def _normalize_text(text: str) -> str:
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.ether import Profile
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class ProfileCard:
+    """What hydration needs to render an author/actor: no ORM state, safe to share across sessions."""
+
+    id: int
+    user_id: int
+    display_name: str
+    avatar_url: str | None
+    avatar_thumb_url: str | None
+    username: str | None
+    email: str | None
+
+    @property
+    def small_avatar_url(self) -> str | None:
+        return self.avatar_thumb_url or self.avatar_url
+
+
+# user_id -> Profile column values, so get_or_create_profile can skip its lookup
+_profiles_by_user = TTLCache(settings.PROFILE_CACHE_SIZE, settings.PROFILE_CACHE_TTL_SECONDS)
+# profile_id -> ProfileCard
+_cards = TTLCache(settings.PROFILE_CACHE_SIZE, settings.PROFILE_CACHE_TTL_SECONDS)
+
+_PROFILE_COLUMNS = [column.key for column in Profile.__table__.columns]
+
+
+def remember_profile(profile: Profile) -> None:
+    _profiles_by_user.set(profile.user_id, {key: getattr(profile, key) for key in _PROFILE_COLUMNS})
+
+
+def cached_profile_for_user(db: Session, user_id: int) -> Profile | None:
+    """
+    The user's Profile attached to this session, from the cache when possible (no SELECT)
+    or the database otherwise. Returns None when the user has no profile yet.
+    """
+    values = _profiles_by_user.get(user_id)
+    if values is not None:
+        profile = Profile(**values)
+        make_transient_to_detached(profile)
+        return db.merge(profile, load=False)
+    profile = db.query(Profile).filter(Profile.user_id == user_id).first()
+    if profile:
+        remember_profile(profile)
+    return profile
+
+
+def profile_cards(db: Session, profile_ids) -> dict[int, ProfileCard]:
+    """ProfileCards for the given ids, loading only the ones not already cached."""
+    cards: dict[int, ProfileCard] = {}
+    missing = []
+    for profile_id in set(profile_ids):
+        card = _cards.get(profile_id)
+        if card is None:
+            missing.append(profile_id)
+        else:
+            cards[profile_id] = card
+    if missing:
+        rows = (
+            db.query(Profile, User.username, User.email)
+            .outerjoin(User, User.id == Profile.user_id)
+            .filter(Profile.id.in_(missing))
+            .all()
+        )
+        for profile, username, email in rows:
+            card = ProfileCard(
+                id=profile.id,
+                user_id=profile.user_id,
+                display_name=profile.display_name,
+                avatar_url=profile.avatar_url,
+                avatar_thumb_url=profile.avatar_thumb_url,
+                username=username,
+                email=email,
+            )
+            _cards.set(profile.id, card)
+            cards[profile.id] = card
+    return cards
+
+
+def invalidate_profile(profile_id: int | None = None, user_id: int | None = None) -> None:
+    """Drop cached copies after a profile (or its user's username/email) changes."""
+    if profile_id is not None:
+        _cards.pop(profile_id)
+    if user_id is not None:
+        _profiles_by_user.pop(user_id)
+
+
+def clear_profile_cache() -> None:
+    _profiles_by_user.clear()
+    _cards.clear()
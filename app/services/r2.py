@@ -1,5 +1,6 @@
 import uuid
 import os
+import threading
 from typing import IO
 
 import boto3
@@ -7,6 +8,15 @@ from botocore.config import Config
 
 from app.core.config import settings
 
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class UploadTooLarge(ValueError):
+    pass
+
 
 def _require_setting(value: str | None, name: str) -> str:
     if not value:
@@ -15,19 +25,44 @@ def _require_setting(value: str | None, name: str) -> str:
 
 
 def get_r2_client():
-    account_id = _require_setting(settings.R2_ACCOUNT_ID, "R2_ACCOUNT_ID")
-    access_key = _require_setting(settings.R2_ACCESS_KEY_ID, "R2_ACCESS_KEY_ID")
-    secret_key = _require_setting(settings.R2_SECRET_ACCESS_KEY, "R2_SECRET_ACCESS_KEY")
-
-    endpoint_url = f"https://{account_id}.r2.cloudflarestorage.com"
-    return boto3.client(
-        "s3",
-        endpoint_url=endpoint_url,
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name="auto",
-        config=Config(signature_version="s3v4"),
-    )
+    """One boto3 client (and connection pool) per process; boto3 clients are thread-safe."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                account_id = _require_setting(settings.R2_ACCOUNT_ID, "R2_ACCOUNT_ID")
+                access_key = _require_setting(settings.R2_ACCESS_KEY_ID, "R2_ACCESS_KEY_ID")
+                secret_key = _require_setting(settings.R2_SECRET_ACCESS_KEY, "R2_SECRET_ACCESS_KEY")
+
+                endpoint_url = f"https://{account_id}.r2.cloudflarestorage.com"
+                _client = boto3.client(
+                    "s3",
+                    endpoint_url=endpoint_url,
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    region_name="auto",
+                    config=Config(
+                        signature_version="s3v4",
+                        max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": 3, "mode": "standard"},
+                    ),
+                )
+    return _client
+
+
+def read_capped(fileobj: IO[bytes], max_bytes: int) -> bytes:
+    """Read an upload in chunks, stopping with UploadTooLarge as soon as it passes max_bytes."""
+    chunks = []
+    total = 0
+    while True:
+        chunk = fileobj.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
 
 
 def upload_bytes(fileobj: IO[bytes], key: str, content_type: str) -> str:
@@ -35,11 +70,13 @@ def upload_bytes(fileobj: IO[bytes], key: str, content_type: str) -> str:
     public_base = _require_setting(settings.R2_PUBLIC_BASE_URL, "R2_PUBLIC_BASE_URL").rstrip("/")
     client = get_r2_client()
 
-    client.upload_fileobj(
-        fileobj,
-        bucket,
-        key,
-        ExtraArgs={"ContentType": content_type},
+    # images are capped well under the multipart threshold, so a single PUT avoids
+    # upload_fileobj's per-call transfer manager and its thread pool
+    client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=fileobj,
+        ContentType=content_type,
     )
     return f"{public_base}/{key}"
 
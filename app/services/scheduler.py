@@ -1,14 +1,75 @@
 import asyncio
+import logging
+from datetime import datetime, UTC
 
 from app.db.session import SessionLocal
-from app.crud.crud_scheduled_entry import post_due_entries
+from app.crud.crud_scheduled_entry import post_due_entries, next_scheduled_for
+from app.services.email import dispatch_outbox, next_outbox_attempt
+from app.services.email_digest import flush_digests
+
+logger = logging.getLogger(__name__)
+
+MIN_SLEEP_SECONDS = 1.0
+MAX_SLEEP_SECONDS = 60.0
+# new outbox rows don't wake the dispatcher, so it polls at least this often
+EMAIL_MAX_SLEEP_SECONDS = 5.0
+
+
+def run_due_entries() -> float:
+    """Post whatever is due and return how many seconds to wait before the next run."""
+    db = SessionLocal()
+    try:
+        post_due_entries(db)
+        now = datetime.now(UTC)
+        next_at = next_scheduled_for(db, now)
+    finally:
+        db.close()
+
+    if next_at is None:
+        return MAX_SLEEP_SECONDS
+    if next_at.tzinfo is None:
+        next_at = next_at.replace(tzinfo=UTC)
+    wait = (next_at - now).total_seconds()
+    return min(MAX_SLEEP_SECONDS, max(MIN_SLEEP_SECONDS, wait))
 
 
 async def schedule_loop():
+    # DB work runs in a worker thread so request handling on the event loop isn't blocked
+    while True:
+        try:
+            delay = await asyncio.to_thread(run_due_entries)
+        except Exception:
+            logger.exception("Scheduled entry posting failed")
+            delay = MAX_SLEEP_SECONDS
+        await asyncio.sleep(delay)
+
+
+def run_email_dispatch() -> float:
+    """Flush due digests, deliver due outbox emails and return how many seconds to wait before the next run."""
+    db = SessionLocal()
+    try:
+        while flush_digests(db):
+            pass
+        while dispatch_outbox(db):
+            pass
+        now = datetime.now(UTC)
+        next_at = next_outbox_attempt(db, now)
+    finally:
+        db.close()
+
+    if next_at is None:
+        return EMAIL_MAX_SLEEP_SECONDS
+    if next_at.tzinfo is None:
+        next_at = next_at.replace(tzinfo=UTC)
+    wait = (next_at - now).total_seconds()
+    return min(EMAIL_MAX_SLEEP_SECONDS, max(MIN_SLEEP_SECONDS, wait))
+
+
+async def email_dispatch_loop():
     while True:
-        db = SessionLocal()
         try:
-            post_due_entries(db)
-        finally:
-            db.close()
-        await asyncio.sleep(60)
+            delay = await asyncio.to_thread(run_email_dispatch)
+        except Exception:
+            logger.exception("Email dispatch failed")
+            delay = EMAIL_MAX_SLEEP_SECONDS
+        await asyncio.sleep(delay)
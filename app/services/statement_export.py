@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+import io
+import json
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+# media type and file extension per export format
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "ofx": ("application/x-ofx", "ofx"),
+}
+# rows rendered per chunk handed to the response; keeps writes large without buffering the month
+FLUSH_ROWS = 200
+CSV_COLUMNS = [
+    "id",
+    "date",
+    "posted_at",
+    "account_id",
+    "account",
+    "description",
+    "category",
+    "amount",
+    "currency",
+    "running_balance",
+]
+_CENTS = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class StatementLine:
+    id: int
+    account_id: int
+    account_name: str
+    posted_at: datetime
+    description: str
+    category: str
+    amount: Decimal  # signed: credits positive, debits negative
+    currency: str
+    balance: Decimal  # account balance after this entry
+
+
+def statement_lines(rows: Iterable, names: dict[int, str], openings: dict[int, Decimal]) -> Iterator[StatementLine]:
+    """
+    Running balances over entry rows ordered by (account_id, created_at, id), each account
+    starting from its opening balance. Holds one row at a time.
+    """
+    balances = dict(openings)
+    for row in rows:
+        amount = Decimal(row.amount) if row.direction == "credit" else -Decimal(row.amount)
+        balance = balances.get(row.account_id, Decimal("0")) + amount
+        balances[row.account_id] = balance
+        name = names[row.account_id]
+        yield StatementLine(
+            id=row.id,
+            account_id=row.account_id,
+            account_name=name,
+            posted_at=row.created_at,
+            description=row.memo or row.reference or f"{name} activity",
+            category=row.entry_type or "manual",
+            amount=amount,
+            currency=row.currency,
+            balance=balance,
+        )
+
+
+def _money(value: Decimal) -> str:
+    return str(Decimal(value).quantize(_CENTS))
+
+
+def _batched(parts: Iterable[str]) -> Iterator[str]:
+    batch: list[str] = []
+    for part in parts:
+        batch.append(part)
+        if len(batch) >= FLUSH_ROWS:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def _line_dict(line: StatementLine) -> dict[str, object]:
+    return {
+        "id": line.id,
+        "date": line.posted_at.date().isoformat(),
+        "posted_at": line.posted_at.isoformat(),
+        "account_id": line.account_id,
+        "account": line.account_name,
+        "description": line.description,
+        "category": line.category,
+        "amount": _money(line.amount),
+        "currency": line.currency,
+        "running_balance": _money(line.balance),
+    }
+
+
+def csv_export(lines: Iterable[StatementLine]) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS)
+
+    def rows() -> Iterator[str]:
+        writer.writeheader()
+        for line in lines:
+            writer.writerow(_line_dict(line))
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        yield out.getvalue()
+
+    return _batched(rows())
+
+
+def ndjson_export(lines: Iterable[StatementLine]) -> Iterator[str]:
+    return _batched(json.dumps(_line_dict(line)) + "\n" for line in lines)
+
+
+def _ofx_time(value: datetime) -> str:
+    return value.strftime("%Y%m%d%H%M%S")
+
+
+def _ofx_statement_open(account_id: int, currency: str, start: datetime, end: datetime) -> str:
+    return (
+        "<STMTTRNRS><TRNUID>0</TRNUID>"
+        "<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>"
+        f"<STMTRS><CURDEF>{escape(currency)}</CURDEF>"
+        f"<BANKACCTFROM><BANKID>MANIFESTBANK</BANKID><ACCTID>{account_id}</ACCTID>"
+        "<ACCTTYPE>CHECKING</ACCTTYPE></BANKACCTFROM>\n"
+        f"<BANKTRANLIST><DTSTART>{_ofx_time(start)}</DTSTART><DTEND>{_ofx_time(end)}</DTEND>\n"
+    )
+
+
+def _ofx_statement_close(balance: Decimal, end: datetime) -> str:
+    return (
+        "</BANKTRANLIST>"
+        f"<LEDGERBAL><BALAMT>{_money(balance)}</BALAMT><DTASOF>{_ofx_time(end)}</DTASOF></LEDGERBAL>"
+        "</STMTRS></STMTTRNRS>\n"
+    )
+
+
+def _ofx_transaction(line: StatementLine) -> str:
+    return (
+        "<STMTTRN>"
+        f"<TRNTYPE>{'CREDIT' if line.amount >= 0 else 'DEBIT'}</TRNTYPE>"
+        f"<DTPOSTED>{_ofx_time(line.posted_at)}</DTPOSTED>"
+        f"<TRNAMT>{_money(line.amount)}</TRNAMT>"
+        f"<FITID>{line.id}</FITID>"
+        # OFX caps NAME at 32 characters; the full text goes in MEMO
+        f"<NAME>{escape(line.description[:32])}</NAME>"
+        f"<MEMO>{escape(line.description)}</MEMO>"
+        "</STMTTRN>\n"
+    )
+
+
+def ofx_export(
+    lines: Iterable[StatementLine],
+    account_ids: list[int],
+    openings: dict[int, Decimal],
+    currency: str,
+    start: datetime,
+    end: datetime,
+    now: datetime,
+) -> Iterator[str]:
+    """OFX 2.2 with one statement per account (in account_id order, matching the lines)."""
+
+    def parts() -> Iterator[str]:
+        yield (
+            '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+            '<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>\n'
+            "<OFX><SIGNONMSGSRSV1><SONRS>"
+            "<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>"
+            f"<DTSERVER>{_ofx_time(now)}</DTSERVER><LANGUAGE>ENG</LANGUAGE>"
+            "</SONRS></SIGNONMSGSRSV1>\n<BANKMSGSRSV1>\n"
+        )
+        pending = iter(sorted(account_ids))
+        current: int | None = None
+        balance = Decimal("0")
+        for line in lines:
+            while current != line.account_id:
+                if current is not None:
+                    yield _ofx_statement_close(balance, end)
+                # accounts without entries this month still get a (balance-only) statement
+                current = next(pending)
+                balance = openings.get(current, Decimal("0"))
+                yield _ofx_statement_open(current, currency, start, end)
+            balance = line.balance
+            yield _ofx_transaction(line)
+        if current is not None:
+            yield _ofx_statement_close(balance, end)
+        for account_id in pending:
+            yield _ofx_statement_open(account_id, currency, start, end)
+            yield _ofx_statement_close(openings.get(account_id, Decimal("0")), end)
+        yield "</BANKMSGSRSV1></OFX>\n"
+
+    return _batched(parts())
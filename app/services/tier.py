@@ -3,12 +3,13 @@ from __future__ import annotations
 from datetime import datetime, timedelta, UTC
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, select, and_
 
 from app.models.ledger import LedgerEntry
 from app.models.scheduled_entry import ScheduledEntry
 from app.models.affirmation import AffirmationEntry
 from app.models.account import Account
+from app.schemas.ledger import meta_kind
 
 
 TIER_NAME = "ManifestBank™ Signature"
@@ -33,62 +34,113 @@ def _since_7d() -> datetime:
     return datetime.now(UTC) - timedelta(days=7)
 
 
-def count_deposits_7d(db: Session, user_id: int) -> int:
+def ledger_quota_key(entry_type: str | None, meta: dict | None) -> str | None:
+    """Which usage counter a new ledger entry draws from, if any."""
+    if meta_kind(meta) == "check":
+        return "checks"
+    entry_type = (entry_type or "").lower()
+    if entry_type == "deposit":
+        return "deposits"
+    if entry_type == "withdrawal":
+        return "expenses"
+    return None
+
+
+FREE_LIMITS = {
+    "deposits": FREE_DEPOSIT_LIMIT_7D,
+    "expenses": FREE_EXPENSE_LIMIT_7D,
+    "checks": FREE_CHECK_LIMIT_7D,
+    "scheduled": FREE_SCHEDULE_LIMIT_7D,
+    "affirmations": FREE_AFFIRMATION_LIMIT,
+    "accounts": FREE_ACCOUNT_LIMIT,
+}
+
+
+def get_usage(db: Session, user_id: int) -> dict[str, int]:
+    """
+    Every free-tier usage counter for a user in a single round trip.
+    Ledger and scheduled counts cover the last 7 days; affirmations and accounts are lifetime totals.
+    """
     since = _since_7d()
-    # counts deposits (excluding checks)
-    kind = func.coalesce(LedgerEntry.meta["kind"].as_string(), "")
-    return (
-        db.query(func.count(LedgerEntry.id))
+    kind = func.coalesce(LedgerEntry.kind, "")
+
+    def tally(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    scheduled = (
+        select(func.count(ScheduledEntry.id))
+        .where(
+            ScheduledEntry.created_by_user_id == user_id,
+            ScheduledEntry.created_at >= since,
+        )
+        .scalar_subquery()
+    )
+    affirmations = (
+        select(func.count(AffirmationEntry.id))
+        .where(
+            AffirmationEntry.user_id == user_id,
+            AffirmationEntry.title != SAVED_AFFIRMATION_TITLE,
+        )
+        .scalar_subquery()
+    )
+    accounts = select(func.count(Account.id)).where(Account.owner_user_id == user_id).scalar_subquery()
+
+    row = (
+        db.query(
+            tally(and_(LedgerEntry.entry_type == "deposit", kind != "check")).label("deposits"),
+            tally(and_(LedgerEntry.entry_type == "withdrawal", kind != "check")).label("expenses"),
+            tally(kind == "check").label("checks"),
+            scheduled.label("scheduled"),
+            affirmations.label("affirmations"),
+            accounts.label("accounts"),
+        )
+        .select_from(LedgerEntry)
         .filter(
             LedgerEntry.created_by_user_id == user_id,
-            LedgerEntry.entry_type == "deposit",
             LedgerEntry.created_at >= since,
-            kind != "check",
         )
-        .scalar()
-        or 0
+        .one()
     )
+    return {key: int(value or 0) for key, value in row._mapping.items()}
 
 
-def count_expenses_7d(db: Session, user_id: int) -> int:
-    since = _since_7d()
-    # counts withdrawals (excluding checks)
-    kind = func.coalesce(LedgerEntry.meta["kind"].as_string(), "")
+def _count_ledger_7d(db: Session, user_id: int, *conditions) -> int:
     return (
         db.query(func.count(LedgerEntry.id))
         .filter(
             LedgerEntry.created_by_user_id == user_id,
-            LedgerEntry.entry_type == "withdrawal",
-            LedgerEntry.created_at >= since,
-            kind != "check",
+            LedgerEntry.created_at >= _since_7d(),
+            *conditions,
         )
         .scalar()
         or 0
     )
 
 
-def count_checks_7d(db: Session, user_id: int) -> int:
-    since = _since_7d()
-    kind = func.coalesce(LedgerEntry.meta["kind"].as_string(), "")
-    return (
-        db.query(func.count(LedgerEntry.id))
-        .filter(
-            LedgerEntry.created_by_user_id == user_id,
-            LedgerEntry.created_at >= since,
-            kind == "check",
-        )
-        .scalar()
-        or 0
+def count_deposits_7d(db: Session, user_id: int) -> int:
+    # counts deposits (excluding checks)
+    return _count_ledger_7d(
+        db, user_id, LedgerEntry.entry_type == "deposit", func.coalesce(LedgerEntry.kind, "") != "check"
     )
 
 
+def count_expenses_7d(db: Session, user_id: int) -> int:
+    # counts withdrawals (excluding checks)
+    return _count_ledger_7d(
+        db, user_id, LedgerEntry.entry_type == "withdrawal", func.coalesce(LedgerEntry.kind, "") != "check"
+    )
+
+
+def count_checks_7d(db: Session, user_id: int) -> int:
+    return _count_ledger_7d(db, user_id, LedgerEntry.kind == "check")
+
+
 def count_scheduled_7d(db: Session, user_id: int) -> int:
-    since = _since_7d()
     return (
         db.query(func.count(ScheduledEntry.id))
         .filter(
             ScheduledEntry.created_by_user_id == user_id,
-            ScheduledEntry.created_at >= since,
+            ScheduledEntry.created_at >= _since_7d(),
         )
         .scalar()
         or 0
@@ -108,9 +160,16 @@ def count_affirmations(db: Session, user_id: int) -> int:
 
 
 def count_accounts(db: Session, user_id: int) -> int:
-    return (
-        db.query(func.count(Account.id))
-        .filter(Account.owner_user_id == user_id)
-        .scalar()
-        or 0
-    )
+    return db.query(func.count(Account.id)).filter(Account.owner_user_id == user_id).scalar() or 0
+
+
+# one targeted query per counter, for callers that only check a single limit;
+# get_usage is for callers that need the whole dict
+USAGE_COUNTERS = {
+    "deposits": count_deposits_7d,
+    "expenses": count_expenses_7d,
+    "checks": count_checks_7d,
+    "scheduled": count_scheduled_7d,
+    "affirmations": count_affirmations,
+    "accounts": count_accounts,
+}
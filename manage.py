@@ -36,5 +36,82 @@ def send_welcome_messages():
     finally:
         db.close()
 
+@cli.command()
+@click.option("--dry-run", is_flag=True, help="Report drift without rewriting snapshots.")
+def reconcile_balances(dry_run):
+    """Rebuild account balance snapshots from the ledger and report drift."""
+    from app.db.session import SessionLocal
+    from app.crud.crud_ledger import reconcile_account_balances
+
+    db = SessionLocal()
+    try:
+        drift = reconcile_account_balances(db, repair=not dry_run)
+        for row in drift:
+            click.echo(
+                f"account {row['account_id']} {row['currency']}: "
+                f"recorded {row['recorded']} expected {row['expected']}"
+            )
+        verb = "Found" if dry_run else "Repaired"
+        click.echo(f"{verb} {len(drift)} drifted balance snapshots")
+    finally:
+        db.close()
+
+@cli.command()
+def rebuild_rollups():
+    """Rebuild monthly statement rollups from the ledger."""
+    from app.db.session import SessionLocal
+    from app.crud.crud_ledger import rebuild_monthly_rollups
+
+    db = SessionLocal()
+    try:
+        count = rebuild_monthly_rollups(db)
+        click.echo(f"Rebuilt {count} monthly rollups")
+    finally:
+        db.close()
+
+@cli.command()
+def rebuild_ether_graph():
+    """Rebuild Ether sync edges and timeline inboxes from approved sync requests."""
+    from app.db.session import SessionLocal
+    from app.services.ether_graph import rebuild_sync_graph
+
+    db = SessionLocal()
+    try:
+        count = rebuild_sync_graph(db)
+        click.echo(f"Rebuilt {count} sync edges")
+    finally:
+        db.close()
+
+@cli.command()
+def repair_ether_counters():
+    """Recompute Ether like, comment and align counters from their source tables."""
+    from app.db.session import SessionLocal
+    from app.services.ether_counters import repair_ether_counters as repair
+
+    db = SessionLocal()
+    try:
+        count = repair(db)
+        click.echo(f"Repaired {count} drifted counters")
+    finally:
+        db.close()
+
+@cli.command()
+def dispatch_emails():
+    """Deliver every due email in the outbox now."""
+    from app.db.session import SessionLocal
+    from app.services.email import dispatch_outbox
+
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            sent = dispatch_outbox(db)
+            if not sent:
+                break
+            total += sent
+        click.echo(f"Sent {total} emails")
+    finally:
+        db.close()
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,45 @@
+"""add account balance snapshots
+
+Revision ID: a1b2c3d4e5f6
+Revises: 0f3d8c7a2b11, 5b7c8d9e0f11
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a1b2c3d4e5f6"
+down_revision = ("0f3d8c7a2b11", "5b7c8d9e0f11")
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "account_balances",
+        sa.Column("account_id", sa.Integer(), sa.ForeignKey("accounts.id"), primary_key=True),
+        sa.Column("currency", sa.String(), primary_key=True),
+        sa.Column("credits", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("debits", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("last_entry_id", sa.Integer(), sa.ForeignKey("ledger_entries.id"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO account_balances (account_id, currency, credits, debits, last_entry_id)
+        SELECT
+            account_id,
+            currency,
+            COALESCE(SUM(CASE WHEN direction = 'credit' THEN amount ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN direction = 'debit' THEN amount ELSE 0 END), 0),
+            MAX(id)
+        FROM ledger_entries
+        WHERE status = 'posted'
+        GROUP BY account_id, currency
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("account_balances")
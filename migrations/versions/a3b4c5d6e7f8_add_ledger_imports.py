@@ -0,0 +1,54 @@
+"""add ledger imports
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a3b4c5d6e7f8"
+down_revision = "f2a3b4c5d6e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ledger_imports",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("format", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("rows_processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duplicate_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("detail", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_ledger_imports_id", "ledger_imports", ["id"])
+    op.create_index("ix_ledger_imports_user_id", "ledger_imports", ["user_id"])
+
+    op.create_table(
+        "ledger_import_errors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("import_id", sa.Integer(), sa.ForeignKey("ledger_imports.id"), nullable=False),
+        sa.Column("row_number", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(), nullable=False),
+        sa.Column("raw", sa.String(), nullable=True),
+    )
+    op.create_index("ix_ledger_import_errors_id", "ledger_import_errors", ["id"])
+    op.create_index("ix_ledger_import_errors_import_id", "ledger_import_errors", ["import_id"])
+
+
+def downgrade():
+    op.drop_index("ix_ledger_import_errors_import_id", table_name="ledger_import_errors")
+    op.drop_index("ix_ledger_import_errors_id", table_name="ledger_import_errors")
+    op.drop_table("ledger_import_errors")
+    op.drop_index("ix_ledger_imports_user_id", table_name="ledger_imports")
+    op.drop_index("ix_ledger_imports_id", table_name="ledger_imports")
+    op.drop_table("ledger_imports")
@@ -0,0 +1,44 @@
+"""add denormalized ether like/comment/align counters
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a7b8c9d0e1f2"
+down_revision = "f6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("ether_posts", sa.Column("like_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("ether_posts", sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("ether_comments", sa.Column("align_count", sa.Integer(), nullable=False, server_default="0"))
+
+    op.execute(
+        """
+        UPDATE ether_posts SET
+            like_count = (SELECT COUNT(*) FROM ether_likes WHERE ether_likes.post_id = ether_posts.id),
+            comment_count = (SELECT COUNT(*) FROM ether_comments WHERE ether_comments.post_id = ether_posts.id)
+        """
+    )
+    op.execute(
+        """
+        UPDATE ether_comments SET
+            align_count = (
+                SELECT COUNT(*) FROM ether_comment_likes
+                WHERE ether_comment_likes.comment_id = ether_comments.id
+            )
+        """
+    )
+
+
+def downgrade():
+    op.drop_column("ether_comments", "align_count")
+    op.drop_column("ether_posts", "comment_count")
+    op.drop_column("ether_posts", "like_count")
@@ -0,0 +1,55 @@
+"""add account monthly rollups
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b2c3d4e5f6a7"
+down_revision = "a1b2c3d4e5f6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "account_monthly_rollups",
+        sa.Column("account_id", sa.Integer(), sa.ForeignKey("accounts.id"), primary_key=True),
+        sa.Column("currency", sa.String(), primary_key=True),
+        sa.Column("month", sa.String(length=7), primary_key=True),
+        sa.Column("credits", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("debits", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("transfers_in", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("transfers_out", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        month_expr = "to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM')"
+    else:
+        month_expr = "strftime('%Y-%m', created_at)"
+    op.execute(
+        f"""
+        INSERT INTO account_monthly_rollups
+            (account_id, currency, month, credits, debits, transfers_in, transfers_out)
+        SELECT
+            account_id,
+            currency,
+            {month_expr},
+            COALESCE(SUM(CASE WHEN direction = 'credit' THEN amount ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN direction = 'debit' THEN amount ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN direction = 'credit' AND entry_type = 'transfer' THEN amount ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN direction = 'debit' AND entry_type = 'transfer' THEN amount ELSE 0 END), 0)
+        FROM ledger_entries
+        WHERE status = 'posted'
+        GROUP BY account_id, currency, {month_expr}
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("account_monthly_rollups")
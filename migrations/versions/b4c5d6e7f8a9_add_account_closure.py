@@ -0,0 +1,43 @@
+"""add account closure table
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b4c5d6e7f8a9"
+down_revision = "a3b4c5d6e7f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "account_closure",
+        sa.Column("ancestor_id", sa.Integer(), sa.ForeignKey("accounts.id"), primary_key=True),
+        sa.Column("descendant_id", sa.Integer(), sa.ForeignKey("accounts.id"), primary_key=True),
+        sa.Column("depth", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_account_closure_descendant_id", "account_closure", ["descendant_id"])
+
+    op.execute(
+        """
+        INSERT INTO account_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM accounts
+            UNION ALL
+            SELECT tree.ancestor_id, child.id, tree.depth + 1
+            FROM tree JOIN accounts AS child ON child.parent_account_id = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
+    )
+
+
+def downgrade():
+    op.drop_index("ix_account_closure_descendant_id", table_name="account_closure")
+    op.drop_table("account_closure")
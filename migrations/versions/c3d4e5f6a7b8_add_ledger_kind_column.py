@@ -0,0 +1,62 @@
+"""add ledger entry kind column
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-17
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c3d4e5f6a7b8"
+down_revision = "b2c3d4e5f6a7"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _kind(meta):
+    if isinstance(meta, str):
+        try:
+            meta = json.loads(meta)
+        except ValueError:
+            return None
+    if not isinstance(meta, dict):
+        return None
+    kind = str(meta.get("kind") or "").strip().lower()
+    return kind or None
+
+
+def upgrade():
+    op.add_column("ledger_entries", sa.Column("kind", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, meta FROM ledger_entries WHERE id > :last_id AND meta IS NOT NULL ORDER BY id LIMIT :limit"
+    )
+    update_kind = sa.text("UPDATE ledger_entries SET kind = :kind WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = bind.execute(select_batch, {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        updates = [{"id": row.id, "kind": _kind(row.meta)} for row in rows]
+        updates = [row for row in updates if row["kind"]]
+        if updates:
+            bind.execute(update_kind, updates)
+        last_id = rows[-1].id
+
+    op.create_index(
+        "ix_ledger_user_kind_created_at",
+        "ledger_entries",
+        ["created_by_user_id", "kind", "created_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ledger_user_kind_created_at", table_name="ledger_entries")
+    op.drop_column("ledger_entries", "kind")
@@ -0,0 +1,43 @@
+"""add inbox horizon to sync edges
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c5d6e7f8a9b0"
+down_revision = "b4c5d6e7f8a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("ether_sync_edges", sa.Column("inbox_complete_after", sa.DateTime(timezone=True), nullable=True))
+    # inboxes backfilled so far stopped at INBOX_BACKFILL_POSTS; where a partner has posts missing
+    # from the inbox, the horizon is the newest such post. Hubs (more than 500 syncs,
+    # FANOUT_MAX_SYNCS) are never fanned out and are read from ether_posts anyway.
+    op.execute(
+        """
+        UPDATE ether_sync_edges
+        SET inbox_complete_after = (
+            SELECT MAX(p.created_at) FROM ether_posts AS p
+            WHERE p.author_profile_id = ether_sync_edges.partner_profile_id
+              AND NOT EXISTS (
+                SELECT 1 FROM ether_timeline_entries AS t
+                WHERE t.profile_id = ether_sync_edges.profile_id AND t.post_id = p.id
+              )
+        )
+        WHERE EXISTS (
+            SELECT 1 FROM profiles AS pr
+            WHERE pr.id = ether_sync_edges.partner_profile_id AND pr.sync_count <= 500
+        )
+        """
+    )
+
+
+def downgrade():
+    op.drop_column("ether_sync_edges", "inbox_complete_after")
@@ -0,0 +1,46 @@
+"""add email digest items
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c9d0e1f2a3b4"
+down_revision = "b8c9d0e1f2a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "email_digest_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("to_email", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("dedup_key", sa.String(), nullable=False),
+        sa.Column("actor_name", sa.String(), nullable=True),
+        sa.Column("preview", sa.Text(), nullable=True),
+        sa.Column("link_id", sa.Integer(), nullable=True),
+        sa.Column("detail_id", sa.Integer(), nullable=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("first_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("flush_token", sa.String(), nullable=True),
+    )
+    op.create_index("ix_email_digest_items_id", "email_digest_items", ["id"])
+    op.create_index(
+        "ix_email_digest_items_recipient_key", "email_digest_items", ["to_email", "dedup_key", "status"]
+    )
+    op.create_index("ix_email_digest_items_status_first_at", "email_digest_items", ["status", "first_at"])
+
+
+def downgrade():
+    op.drop_index("ix_email_digest_items_status_first_at", table_name="email_digest_items")
+    op.drop_index("ix_email_digest_items_recipient_key", table_name="email_digest_items")
+    op.drop_index("ix_email_digest_items_id", table_name="email_digest_items")
+    op.drop_table("email_digest_items")
@@ -0,0 +1,31 @@
+"""add scheduled entry claim lease
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d4e5f6a7b8c9"
+down_revision = "c3d4e5f6a7b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("scheduled_entries", sa.Column("claim_token", sa.String(), nullable=True))
+    op.add_column("scheduled_entries", sa.Column("claimed_until", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_scheduled_entries_status_scheduled_for",
+        "scheduled_entries",
+        ["status", "scheduled_for"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_scheduled_entries_status_scheduled_for", table_name="scheduled_entries")
+    op.drop_column("scheduled_entries", "claimed_until")
+    op.drop_column("scheduled_entries", "claim_token")
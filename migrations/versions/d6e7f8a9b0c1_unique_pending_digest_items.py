@@ -0,0 +1,62 @@
+"""unique pending email digest item per recipient and key
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d6e7f8a9b0c1"
+down_revision = "c5d6e7f8a9b0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # fold pending duplicates left by concurrent inserts into the newest row so the unique
+    # index can be built
+    op.execute(
+        """
+        UPDATE email_digest_items
+        SET count = (
+            SELECT SUM(dup.count) FROM email_digest_items AS dup
+            WHERE dup.to_email = email_digest_items.to_email
+              AND dup.dedup_key = email_digest_items.dedup_key
+              AND dup.status = 'pending'
+        )
+        WHERE status = 'pending'
+          AND id = (
+            SELECT MAX(dup.id) FROM email_digest_items AS dup
+            WHERE dup.to_email = email_digest_items.to_email
+              AND dup.dedup_key = email_digest_items.dedup_key
+              AND dup.status = 'pending'
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM email_digest_items
+        WHERE status = 'pending'
+          AND id < (
+            SELECT MAX(dup.id) FROM email_digest_items AS dup
+            WHERE dup.to_email = email_digest_items.to_email
+              AND dup.dedup_key = email_digest_items.dedup_key
+              AND dup.status = 'pending'
+          )
+        """
+    )
+    op.create_index(
+        "uq_email_digest_items_pending_key",
+        "email_digest_items",
+        ["to_email", "dedup_key"],
+        unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_email_digest_items_pending_key", table_name="email_digest_items")
@@ -0,0 +1,47 @@
+"""add image derivatives
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e1f2a3b4c5d6"
+down_revision = "d0e1f2a3b4c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "uploaded_images",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("owner_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("thumb_url", sa.String(), nullable=False),
+        sa.Column("medium_url", sa.String(), nullable=False),
+        sa.Column("full_url", sa.String(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_uploaded_images_id", "uploaded_images", ["id"])
+    op.create_index("ix_uploaded_images_url", "uploaded_images", ["url"], unique=True)
+    op.create_index("ix_uploaded_images_owner_user_id", "uploaded_images", ["owner_user_id"])
+
+    op.add_column("profiles", sa.Column("avatar_thumb_url", sa.String(), nullable=True))
+    op.add_column("ether_posts", sa.Column("image_medium_url", sa.String(), nullable=True))
+    op.add_column("ether_posts", sa.Column("image_full_url", sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ether_posts", "image_full_url")
+    op.drop_column("ether_posts", "image_medium_url")
+    op.drop_column("profiles", "avatar_thumb_url")
+    op.drop_index("ix_uploaded_images_owner_user_id", table_name="uploaded_images")
+    op.drop_index("ix_uploaded_images_url", table_name="uploaded_images")
+    op.drop_index("ix_uploaded_images_id", table_name="uploaded_images")
+    op.drop_table("uploaded_images")
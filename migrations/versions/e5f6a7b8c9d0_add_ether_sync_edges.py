@@ -0,0 +1,93 @@
+"""add ether sync edges and timeline inbox
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e5f6a7b8c9d0"
+down_revision = "d4e5f6a7b8c9"
+branch_labels = None
+depends_on = None
+
+# keep in step with app.services.ether_graph
+FANOUT_MAX_SYNCS = 500
+INBOX_BACKFILL_POSTS = 50
+
+
+def upgrade():
+    op.add_column(
+        "profiles",
+        sa.Column("sync_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "ether_sync_edges",
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), primary_key=True),
+        sa.Column("partner_profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_ether_sync_edges_partner_profile_id", "ether_sync_edges", ["partner_profile_id"])
+    op.create_table(
+        "ether_timeline_entries",
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), primary_key=True),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("ether_posts.id"), primary_key=True),
+        sa.Column("author_profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_ether_timeline_entries_post_id", "ether_timeline_entries", ["post_id"])
+    op.create_index(
+        "ix_ether_timeline_profile_created_at",
+        "ether_timeline_entries",
+        ["profile_id", "created_at", "post_id"],
+    )
+    op.create_index(
+        "ix_ether_timeline_profile_author",
+        "ether_timeline_entries",
+        ["profile_id", "author_profile_id"],
+    )
+
+    op.execute(
+        """
+        INSERT INTO ether_sync_edges (profile_id, partner_profile_id)
+        SELECT requester_profile_id, target_profile_id FROM ether_sync_requests
+        WHERE status = 'approved' AND requester_profile_id <> target_profile_id
+        UNION
+        SELECT target_profile_id, requester_profile_id FROM ether_sync_requests
+        WHERE status = 'approved' AND requester_profile_id <> target_profile_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE profiles SET sync_count = (
+            SELECT COUNT(*) FROM ether_sync_edges WHERE ether_sync_edges.profile_id = profiles.id
+        )
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO ether_timeline_entries (profile_id, post_id, author_profile_id, created_at)
+        SELECT e.partner_profile_id, p.id, p.author_profile_id, p.created_at
+        FROM (
+            SELECT id, author_profile_id, created_at,
+                   ROW_NUMBER() OVER (PARTITION BY author_profile_id ORDER BY created_at DESC, id DESC) AS rn
+            FROM ether_posts
+        ) p
+        JOIN ether_sync_edges e ON e.profile_id = p.author_profile_id
+        JOIN profiles a ON a.id = p.author_profile_id
+        WHERE p.rn <= {INBOX_BACKFILL_POSTS} AND a.sync_count <= {FANOUT_MAX_SYNCS}
+        """
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ether_timeline_profile_author", table_name="ether_timeline_entries")
+    op.drop_index("ix_ether_timeline_profile_created_at", table_name="ether_timeline_entries")
+    op.drop_index("ix_ether_timeline_entries_post_id", table_name="ether_timeline_entries")
+    op.drop_table("ether_timeline_entries")
+    op.drop_index("ix_ether_sync_edges_partner_profile_id", table_name="ether_sync_edges")
+    op.drop_table("ether_sync_edges")
+    op.drop_column("profiles", "sync_count")
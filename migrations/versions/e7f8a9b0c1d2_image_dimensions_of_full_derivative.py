@@ -0,0 +1,32 @@
+"""record the full derivative's dimensions on uploaded images
+
+Revision ID: e7f8a9b0c1d2
+Revises: d6e7f8a9b0c1
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+revision = "e7f8a9b0c1d2"
+down_revision = "d6e7f8a9b0c1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # width/height held the source's dimensions; the stored full derivative is capped at a
+    # 1600px longest edge (images.VARIANT_EDGES) with the aspect ratio kept
+    op.execute(
+        """
+        UPDATE uploaded_images
+        SET width = CASE WHEN width >= height THEN 1600 ELSE ROUND(width * 1600.0 / height) END,
+            height = CASE WHEN width >= height THEN ROUND(height * 1600.0 / width) ELSE 1600 END
+        WHERE width > 1600 OR height > 1600
+        """
+    )
+
+
+def downgrade():
+    # the source dimensions aren't recoverable; the derivative's are kept
+    pass
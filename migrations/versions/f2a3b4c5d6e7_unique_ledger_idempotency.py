@@ -0,0 +1,46 @@
+"""unique ledger idempotency keys
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "f2a3b4c5d6e7"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # earlier retries could double-post; keep the key on the newest copy (the one the old
+    # lookup returned) so the unique index can be built
+    op.execute(
+        """
+        UPDATE ledger_entries
+        SET idempotency_key = NULL
+        WHERE idempotency_key IS NOT NULL
+          AND id < (
+            SELECT MAX(newer.id) FROM ledger_entries AS newer
+            WHERE newer.account_id = ledger_entries.account_id
+              AND newer.idempotency_key = ledger_entries.idempotency_key
+          )
+        """
+    )
+    op.execute("DROP INDEX IF EXISTS ix_ledger_account_idempotency")
+    op.create_index(
+        "uq_ledger_account_idempotency",
+        "ledger_entries",
+        ["account_id", "idempotency_key"],
+        unique=True,
+        postgresql_where=sa.text("idempotency_key IS NOT NULL"),
+        sqlite_where=sa.text("idempotency_key IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_ledger_account_idempotency", table_name="ledger_entries")
+    op.create_index("ix_ledger_account_idempotency", "ledger_entries", ["account_id", "idempotency_key"])
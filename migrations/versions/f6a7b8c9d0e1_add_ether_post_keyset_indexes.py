@@ -0,0 +1,28 @@
+"""add ether post keyset indexes
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+revision = "f6a7b8c9d0e1"
+down_revision = "e5f6a7b8c9d0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_ether_posts_created_at_id", "ether_posts", ["created_at", "id"])
+    op.create_index(
+        "ix_ether_posts_author_created_at_id",
+        "ether_posts",
+        ["author_profile_id", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ether_posts_author_created_at_id", table_name="ether_posts")
+    op.drop_index("ix_ether_posts_created_at_id", table_name="ether_posts")
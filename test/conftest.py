@@ -9,6 +9,10 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import app as fastapi_app
 from app.db.session import get_db, Base
+from app.models.ether import Profile
+from app.models.user import User
+from app.services.profile_cache import clear_profile_cache
+from app.core.user_cache import clear_user_cache
 
 # Ensure models are imported so Base.metadata is populated
 # Adjust imports if your models live somewhere else.
@@ -38,6 +42,25 @@ def db():
     finally:
         session.close()
         Base.metadata.drop_all(bind=engine)
+        # in-process caches outlive the per-test database
+        clear_profile_cache()
+        clear_user_cache()
+
+
+@pytest.fixture
+def make_profile(db):
+    """Factory for an ether Profile (and its User) named name; flushed, not committed."""
+
+    def make(name):
+        user = User(email=f"{name}@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        profile = Profile(user_id=user.id, display_name=name)
+        db.add(profile)
+        db.flush()
+        return profile
+
+    return make
 
 
 @pytest_asyncio.fixture
@@ -0,0 +1,127 @@
+import json
+import warnings
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.core.security import get_current_user, get_verified_user
+from app.crud.crud_account import (
+    create_account,
+    delete_account,
+    is_in_subtree,
+    list_subtree_accounts,
+    move_account,
+    rebuild_account_closure,
+)
+from app.crud.crud_ledger import create_ledger_entries, get_account_balance, month_key
+from app.main import app as fastapi_app
+from app.models.account import Account, AccountClosure
+from app.models.user import User
+from app.schemas.account import AccountCreate
+from app.schemas.ledger import LedgerEntryCreate
+
+
+@pytest.fixture
+def tree(db):
+    """trust -> sub_trust -> leaf, plus a separate personal account."""
+    user = User(email="trust@test.com", hashed_password="x", is_premium=True)
+    db.add(user)
+    db.commit()
+    trust = create_account(db, user.id, AccountCreate(name="trust", account_type="trust"))
+    sub_trust = create_account(
+        db, user.id, AccountCreate(name="sub", account_type="trust", parent_account_id=trust.id)
+    )
+    leaf = create_account(db, user.id, AccountCreate(name="leaf", parent_account_id=sub_trust.id))
+    personal = create_account(db, user.id, AccountCreate(name="personal"))
+    create_ledger_entries(
+        db,
+        user.id,
+        [
+            LedgerEntryCreate(account_id=trust.id, direction="credit", amount=Decimal("100")),
+            LedgerEntryCreate(account_id=sub_trust.id, direction="credit", amount=Decimal("20")),
+            LedgerEntryCreate(account_id=leaf.id, direction="credit", amount=Decimal("3")),
+            LedgerEntryCreate(account_id=personal.id, direction="credit", amount=Decimal("7")),
+        ],
+    )
+    return user, trust, sub_trust, leaf, personal
+
+
+def _closure(db) -> set[tuple[int, int, int]]:
+    return {(row.ancestor_id, row.descendant_id, row.depth) for row in db.query(AccountClosure)}
+
+
+def test_trust_balance_covers_nested_subtree(db, tree):
+    _, trust, sub_trust, leaf, personal = tree
+    assert (trust.id, leaf.id, 2) in _closure(db)
+    assert get_account_balance(db, trust.id) == Decimal("123")
+    assert get_account_balance(db, sub_trust.id) == Decimal("23")
+    assert get_account_balance(db, leaf.id) == Decimal("3")
+    assert [a.name for a in list_subtree_accounts(db, trust.id)] == ["trust", "sub", "leaf"]
+
+
+def test_move_and_delete_keep_closure_in_sync(db, tree):
+    _, trust, sub_trust, leaf, personal = tree
+    before = _closure(db)
+
+    move_account(db, sub_trust, None)
+    assert get_account_balance(db, trust.id) == Decimal("100")
+    assert get_account_balance(db, sub_trust.id) == Decimal("23")
+    assert not is_in_subtree(db, trust.id, leaf.id)
+
+    with warnings.catch_warnings():
+        # the ancestor x subtree insert is an explicit cross join, not an accidental cartesian product
+        warnings.simplefilter("error")
+        move_account(db, sub_trust, trust.id)
+    assert _closure(db) == before
+    # the incremental maintenance matches a rebuild from parent_account_id
+    rebuild_account_closure(db)
+    assert _closure(db) == before
+
+    delete_account(db, sub_trust)
+    assert {a.id for a in db.query(Account)} == {trust.id, personal.id}
+    assert _closure(db) == {(trust.id, trust.id, 0), (personal.id, personal.id, 0)}
+    assert get_account_balance(db, trust.id) == Decimal("100")
+
+
+async def test_reparent_route_and_subtree_ledger(client, db, tree):
+    user, trust, sub_trust, leaf, personal = tree
+    fastapi_app.dependency_overrides[get_verified_user] = lambda: user
+    fastapi_app.dependency_overrides[get_current_user] = lambda: user
+
+    resp = await client.patch(f"/accounts/{trust.id}", json={"parent_account_id": leaf.id})
+    assert resp.status_code == 400
+    resp = await client.patch(f"/accounts/{trust.id}", json={"parent_account_id": sub_trust.id})
+    assert resp.json()["detail"] == "An account can't be moved under itself"
+
+    resp = await client.patch(f"/accounts/{leaf.id}", json={"parent_account_id": trust.id})
+    assert resp.status_code == 200 and resp.json()["name"] == "leaf"
+    assert (trust.id, leaf.id, 1) in _closure(db)
+    assert not is_in_subtree(db, sub_trust.id, leaf.id)
+
+    commits = []
+
+    def on_commit(session):
+        commits.append(session)
+
+    event.listen(db, "after_commit", on_commit)
+    try:
+        resp = await client.patch(f"/accounts/{leaf.id}", json={"parent_account_id": sub_trust.id, "name": "leaf 2"})
+    finally:
+        event.remove(db, "after_commit", on_commit)
+    assert resp.json()["name"] == "leaf 2" and is_in_subtree(db, sub_trust.id, leaf.id)
+    # the move and the rename land in one transaction
+    assert len(commits) == 1
+
+    resp = await client.patch(f"/accounts/{leaf.id}", json={"name": " "})
+    assert resp.status_code == 400
+
+    entries = (await client.get(f"/accounts/{trust.id}/ledger?include_subtree=true")).json()
+    assert sorted(e["account_id"] for e in entries) == sorted([trust.id, sub_trust.id, leaf.id])
+    entries = (await client.get(f"/accounts/{trust.id}/ledger")).json()
+    assert [e["account_id"] for e in entries] == [trust.id]
+
+    month = month_key(datetime.now(timezone.utc))
+    resp = await client.get(f"/statements/export?month={month}&format=ndjson&account_id={trust.id}")
+    assert {line["account"] for line in map(json.loads, resp.text.splitlines())} == {"trust", "sub", "leaf 2"}
@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.security import get_verified_user
+from app.main import app as fastapi_app
+from app.services import avatar_proxy
+
+AVATAR_URL = "https://cdn.test/avatars/1/a.png"
+
+
+@pytest.fixture
+def r2(client, monkeypatch):
+    fastapi_app.dependency_overrides[get_verified_user] = lambda: None
+    monkeypatch.setattr(settings, "R2_PUBLIC_BASE_URL", "https://cdn.test")
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        return httpx.Response(
+            200,
+            content=b"png-bytes",
+            headers={"Content-Type": "image/png", "ETag": '"abc"', "Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT"},
+        )
+
+    monkeypatch.setattr(avatar_proxy, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    avatar_proxy.clear_avatar_cache()
+    yield calls
+    avatar_proxy.clear_avatar_cache()
+
+
+async def test_avatar_is_fetched_once_and_cached(client, r2):
+    first = await client.get("/ether/avatar/source", params={"url": AVATAR_URL})
+    second = await client.get("/ether/avatar/source", params={"url": AVATAR_URL})
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == b"png-bytes"
+    assert second.headers["content-type"] == "image/png"
+    assert second.headers["etag"] == '"abc"'
+    assert "max-age" in second.headers["cache-control"]
+    assert r2 == [AVATAR_URL]
+
+
+async def test_matching_etag_gets_304(client, r2):
+    resp = await client.get(
+        "/ether/avatar/source", params={"url": AVATAR_URL}, headers={"If-None-Match": '"abc"'}
+    )
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == '"abc"'
+
+
+async def test_foreign_hosts_are_rejected(client, r2):
+    resp = await client.get("/ether/avatar/source", params={"url": "https://evil.test/a.png"})
+    assert resp.status_code == 400
+    assert r2 == []
+
+
+async def test_oversized_avatars_are_refused(client, r2, monkeypatch):
+    monkeypatch.setattr(settings, "AVATAR_CACHE_MAX_ITEM_BYTES", 4)
+    resp = await client.get("/ether/avatar/source", params={"url": AVATAR_URL})
+    assert resp.status_code == 400
+
+
+async def test_concurrent_misses_share_one_fetch(monkeypatch):
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(request):
+        calls.append(str(request.url))
+        await release.wait()
+        return httpx.Response(200, content=b"png-bytes", headers={"Content-Type": "image/png"})
+
+    monkeypatch.setattr(avatar_proxy, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    avatar_proxy.clear_avatar_cache()
+    fetches = [asyncio.ensure_future(avatar_proxy.fetch_avatar(AVATAR_URL)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    release.set()
+    avatars = await asyncio.gather(*fetches)
+
+    assert calls == [AVATAR_URL]
+    assert all(avatar is avatars[0] for avatar in avatars)
+    assert avatar_proxy._inflight == {}
+    avatar_proxy.clear_avatar_cache()
+
+
+@pytest.mark.parametrize(
+    ("since", "status"),
+    [
+        ("Sat, 17 Oct 2026 00:00:00 GMT", 304),
+        ("Sun, 18 Oct 2026 09:30:00 GMT", 304),
+        ("Fri, 16 Oct 2026 23:59:59 GMT", 200),
+        ("not a date", 200),
+    ],
+)
+async def test_if_modified_since_compares_dates(client, r2, since, status):
+    resp = await client.get("/ether/avatar/source", params={"url": AVATAR_URL}, headers={"If-Modified-Since": since})
+    assert resp.status_code == status
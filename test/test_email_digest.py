@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from app.core.config import settings
+from app.models.email_outbox import EmailOutbox, EmailDigestItem
+from app.services.email import COMMENT_SUBJECT
+from app.services.email_digest import DIGEST_SUBJECT, _insert_pending, flush_digests, queue_notification_email
+
+
+@pytest.fixture
+def resend(monkeypatch):
+    monkeypatch.setattr(settings, "RESEND_API_KEY", "primary")
+    monkeypatch.setattr(settings, "RESEND_FROM_EMAIL", "from@test.com")
+    monkeypatch.setattr(settings, "EMAIL_DIGEST_WINDOW_SECONDS", 300)
+
+
+def test_events_coalesce_per_dedup_key(db, resend):
+    for i in range(3):
+        queue_notification_email("a@test.com", "myline", "thread:1", "Sam", f"msg {i}", 1, db=db)
+    queue_notification_email("a@test.com", "comment", "post:9", "Lee", "nice", 9, 40, db=db)
+    db.commit()
+
+    items = {item.dedup_key: item for item in db.query(EmailDigestItem).all()}
+    assert set(items) == {"thread:1", "post:9"}
+    assert items["thread:1"].count == 3
+    assert items["thread:1"].preview == "msg 2"
+
+    # nothing is due until the recipient's oldest item has waited a full window
+    assert flush_digests(db) == 0
+    assert flush_digests(db, datetime.now(UTC) + timedelta(seconds=301)) == 1
+
+    outbox = db.query(EmailOutbox).one()
+    assert outbox.to_email == "a@test.com"
+    assert outbox.subject == DIGEST_SUBJECT
+    assert "3 new messages" in outbox.html and "nice" in outbox.html
+    assert db.query(EmailDigestItem).count() == 0
+
+
+def test_single_event_uses_the_original_template(db, resend):
+    queue_notification_email("b@test.com", "comment", "post:2", "Lee", "hello", 2, 7, db=db)
+    db.commit()
+
+    assert flush_digests(db, datetime.now(UTC) + timedelta(seconds=301)) == 1
+    outbox = db.query(EmailOutbox).one()
+    assert outbox.subject == COMMENT_SUBJECT
+    assert "comment_id=7" in outbox.html
+
+
+def test_zero_window_sends_immediately(db, resend, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_DIGEST_WINDOW_SECONDS", 0)
+    queue_notification_email("c@test.com", "myline", "thread:3", "Sam", "hey", 3, db=db)
+    db.commit()
+
+    assert db.query(EmailDigestItem).count() == 0
+    assert db.query(EmailOutbox).count() == 1
+
+
+def test_concurrent_insert_of_a_pending_key_is_folded_in(db, resend):
+    now = datetime.now(UTC)
+    values = {
+        "to_email": "d@test.com",
+        "kind": "myline",
+        "dedup_key": "thread:4",
+        "preview": "first",
+        "link_id": 4,
+        "status": "pending",
+        "count": 1,
+        "first_at": now,
+        "last_at": now,
+    }
+    assert _insert_pending(db, values) is True
+    # the loser of an insert race hits the partial unique index and inserts nothing
+    assert _insert_pending(db, dict(values, preview="second")) is False
+    queue_notification_email("d@test.com", "myline", "thread:4", "Sam", "third", 4, db=db)
+    db.commit()
+
+    item = db.query(EmailDigestItem).one()
+    assert (item.count, item.preview) == (2, "third")
+    # an item being flushed doesn't block a new pending row for the same key
+    item.status = "flushing"
+    db.commit()
+    assert _insert_pending(db, values) is True
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from app.core.config import settings
+from app.models.email_outbox import EmailOutbox, EmailSendCounter
+from app.services import email
+from app.services.email import EmailDeliveryError, _send_email, dispatch_outbox
+
+
+@pytest.fixture
+def resend(monkeypatch):
+    monkeypatch.setattr(settings, "RESEND_API_KEY", "primary")
+    monkeypatch.setattr(settings, "RESEND_FROM_EMAIL", "from@test.com")
+    monkeypatch.setattr(settings, "RESEND_FALLBACK_API_KEY", None)
+    monkeypatch.setattr(settings, "RESEND_FALLBACK_FROM_EMAIL", None)
+    monkeypatch.setattr(settings, "RESEND_PRIMARY_DAILY_LIMIT", None)
+    calls = []
+
+    def fake_post(api_key, sender, messages):
+        calls.append([m.to_email for m in messages])
+        failure = getattr(fake_post, "failure", None)
+        if failure:
+            raise failure
+        return [f"id-{m.id}" for m in messages]
+
+    monkeypatch.setattr(email, "_post_resend", fake_post)
+    return fake_post, calls
+
+
+def test_outbox_rows_are_batched(db, resend):
+    _, calls = resend
+    for i in range(3):
+        assert _send_email(f"user{i}@test.com", "hi", "<p>hi</p>", db=db)
+    db.commit()
+
+    assert dispatch_outbox(db) == 3
+    assert calls == [["user0@test.com", "user1@test.com", "user2@test.com"]]
+    rows = db.query(EmailOutbox).all()
+    assert {row.status for row in rows} == {"sent"}
+    assert all(row.provider_id == f"id-{row.id}" for row in rows)
+    assert dispatch_outbox(db) == 0
+
+
+def test_retryable_failures_back_off(db, resend):
+    fake_post, _ = resend
+    fake_post.failure = EmailDeliveryError("Resend returned 429", True)
+    _send_email("slow@test.com", "hi", "<p>hi</p>", db=db)
+    db.commit()
+
+    assert dispatch_outbox(db) == 0
+    row = db.query(EmailOutbox).one()
+    assert row.status == "pending"
+    assert row.attempts == 1
+    next_attempt = row.next_attempt_at.replace(tzinfo=UTC) if row.next_attempt_at.tzinfo is None else row.next_attempt_at
+    assert next_attempt > datetime.now(UTC) + timedelta(seconds=20)
+    # not due yet, so nothing is claimed
+    assert dispatch_outbox(db) == 0
+    assert db.query(EmailOutbox).one().attempts == 1
+
+
+def test_rejected_batch_is_retried_one_by_one(db, resend, monkeypatch):
+    _, calls = resend
+    bad = EmailDeliveryError("Resend returned 422", False)
+
+    def picky(api_key, sender, messages):
+        calls.append([m.to_email for m in messages])
+        if any(m.to_email.startswith("bad") for m in messages):
+            raise bad
+        return [None for _ in messages]
+
+    monkeypatch.setattr(email, "_post_resend", picky)
+    _send_email("good@test.com", "hi", "<p>hi</p>", db=db)
+    _send_email("bad@test.com", "hi", "<p>hi</p>", db=db)
+    db.commit()
+
+    assert dispatch_outbox(db) == 1
+    statuses = {row.to_email: row.status for row in db.query(EmailOutbox)}
+    assert statuses == {"good@test.com": "sent", "bad@test.com": "failed"}
+
+
+@pytest.fixture
+def primary_cap(db, resend, monkeypatch):
+    from test.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(email, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(email, "_primary_refused", None)
+    monkeypatch.setattr(settings, "RESEND_FALLBACK_API_KEY", "fallback")
+    monkeypatch.setattr(settings, "RESEND_FALLBACK_FROM_EMAIL", "fallback@test.com")
+    monkeypatch.setattr(settings, "RESEND_PRIMARY_DAILY_LIMIT", 5)
+    monkeypatch.setattr(settings, "RESEND_PRIMARY_DAILY_BUFFER", 1)
+
+
+def test_daily_cap_is_shared_through_the_counter_table(db, resend, primary_cap, monkeypatch):
+    accounts = []
+
+    def post(api_key, sender, messages):
+        accounts.append(api_key)
+        return [None] * len(messages)
+
+    monkeypatch.setattr(email, "_post_resend", post)
+    rows = [EmailOutbox(to_email=f"u{i}@test.com", subject="s", html="h") for i in range(3)]
+    assert email.deliver(rows) == [None] * 3
+    assert email.deliver(rows[:1]) == [None]
+    # a restarted or second worker sees the same count
+    db.query(EmailSendCounter).update({EmailSendCounter.count: 4}, synchronize_session=False)
+    db.commit()
+    monkeypatch.setattr(email, "_primary_refused", None)
+    email.deliver(rows[:1])
+    email.deliver(rows[:1])
+    assert accounts == ["primary", "primary", "fallback", "fallback"]
+    assert db.query(EmailSendCounter).one().count == 4
+
+
+def test_failed_primary_batch_releases_its_reservation(db, resend, primary_cap, monkeypatch):
+    def post(api_key, sender, messages):
+        if api_key == "primary":
+            raise EmailDeliveryError("Resend returned 503", True)
+        return ["fb"] * len(messages)
+
+    monkeypatch.setattr(email, "_post_resend", post)
+    rows = [EmailOutbox(to_email="u@test.com", subject="s", html="h")]
+    assert email.deliver(rows) == ["fb"]
+    db.expire_all()
+    assert db.query(EmailSendCounter).one().count == 0
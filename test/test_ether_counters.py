@@ -0,0 +1,37 @@
+from app.models.ether import EtherPost, EtherComment, EtherLike, EtherCommentLike
+from app.services.ether_counters import bump_counter, repair_ether_counters
+
+
+def test_bump_counter_is_relative(db, make_profile):
+    author = make_profile("counter")
+    post = EtherPost(author_profile_id=author.id, content="hi")
+    db.add(post)
+    db.commit()
+
+    bump_counter(db, EtherPost.like_count, post.id, 1)
+    bump_counter(db, EtherPost.like_count, post.id, 1)
+    bump_counter(db, EtherPost.like_count, post.id, -1)
+    db.commit()
+    db.refresh(post)
+    assert post.like_count == 1
+    assert post.comment_count == 0
+
+
+def test_repair_ether_counters(db, make_profile):
+    author = make_profile("repair")
+    fan = make_profile("repairfan")
+    post = EtherPost(author_profile_id=author.id, content="hi", like_count=7)
+    db.add(post)
+    db.flush()
+    comment = EtherComment(post_id=post.id, author_profile_id=fan.id, content="yes")
+    db.add(comment)
+    db.flush()
+    db.add(EtherLike(post_id=post.id, profile_id=fan.id))
+    db.add(EtherCommentLike(comment_id=comment.id, profile_id=author.id))
+    db.commit()
+
+    assert repair_ether_counters(db) == 3
+    db.refresh(post)
+    db.refresh(comment)
+    assert (post.like_count, post.comment_count, comment.align_count) == (1, 1, 1)
+    assert repair_ether_counters(db) == 0
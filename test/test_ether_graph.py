@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.ether import EtherPost, EtherSyncEdge, EtherSyncRequest, EtherTimelineEntry
+from app.services import ether_graph
+from app.services.ether_graph import (
+    add_sync_edge,
+    fan_out_post,
+    rebuild_sync_graph,
+    remove_sync_edge,
+    sync_partner_ids,
+    timeline_posts,
+)
+
+
+def _post(db, author, content):
+    post = EtherPost(author_profile_id=author.id, content=content)
+    db.add(post)
+    db.flush()
+    fan_out_post(db, post)
+    return post
+
+
+def test_sync_edges_drive_timeline(db, make_profile):
+    alice = make_profile("alice")
+    bob = make_profile("bob")
+    carol = make_profile("carol")
+
+    early = _post(db, bob, "before sync")
+    add_sync_edge(db, alice.id, bob.id)
+    add_sync_edge(db, alice.id, bob.id)
+    db.commit()
+    db.refresh(alice)
+    assert alice.sync_count == 1
+    assert sync_partner_ids(db, bob.id) == [alice.id]
+
+    later = _post(db, bob, "after sync")
+    _post(db, carol, "not synced")
+    db.commit()
+    assert [p.id for p in timeline_posts(db, alice.id)] == [later.id, early.id]
+
+    remove_sync_edge(db, bob.id, alice.id)
+    db.commit()
+    db.refresh(alice)
+    assert alice.sync_count == 0
+    assert timeline_posts(db, alice.id) == []
+    assert db.query(EtherTimelineEntry).count() == 0
+
+
+def test_add_sync_edge_tolerates_a_concurrent_insert(db, make_profile):
+    alice = make_profile("alice")
+    bob = make_profile("bob")
+    # a racing approval or rebuild already wrote the pair
+    db.add_all(
+        [
+            EtherSyncEdge(profile_id=alice.id, partner_profile_id=bob.id),
+            EtherSyncEdge(profile_id=bob.id, partner_profile_id=alice.id),
+        ]
+    )
+    db.commit()
+    add_sync_edge(db, alice.id, bob.id)
+    db.commit()
+    db.refresh(alice)
+    assert alice.sync_count == 0
+    assert db.query(EtherSyncEdge).count() == 2
+
+
+def test_hub_posts_are_pulled_on_read(db, monkeypatch, make_profile):
+    monkeypatch.setattr(ether_graph, "FANOUT_MAX_SYNCS", 1)
+    hub = make_profile("hub")
+    fan_a = make_profile("fana")
+    fan_b = make_profile("fanb")
+    add_sync_edge(db, fan_a.id, hub.id)
+    add_sync_edge(db, fan_b.id, hub.id)
+    db.commit()
+
+    post = _post(db, hub, "big news")
+    db.commit()
+    assert db.query(EtherTimelineEntry).filter(EtherTimelineEntry.post_id == post.id).count() == 0
+    assert [p.id for p in timeline_posts(db, fan_a.id)] == [post.id]
+    assert [p.id for p in timeline_posts(db, fan_b.id)] == [post.id]
+
+
+def test_rebuild_sync_graph(db, make_profile):
+    alice = make_profile("ra")
+    bob = make_profile("rb")
+    db.add(EtherSyncRequest(requester_profile_id=alice.id, target_profile_id=bob.id, status="approved"))
+    post = EtherPost(author_profile_id=bob.id, content="hello")
+    db.add(post)
+    db.commit()
+
+    assert rebuild_sync_graph(db) == 2
+    db.refresh(bob)
+    assert bob.sync_count == 1
+    assert [p.id for p in timeline_posts(db, alice.id)] == [post.id]
+
+
+def test_timeline_before_and_after_cursors(db, make_profile):
+    reader = make_profile("reader")
+    author = make_profile("author")
+    add_sync_edge(db, reader.id, author.id)
+    posts = [_post(db, author, f"post {i}") for i in range(5)]
+    db.commit()
+
+    newest_first = [p.id for p in reversed(posts)]
+    page = timeline_posts(db, reader.id, limit=2)
+    assert [p.id for p in page] == newest_first[:2]
+
+    older = timeline_posts(db, reader.id, limit=2, before=(page[-1].created_at, page[-1].id))
+    assert [p.id for p in older] == newest_first[2:4]
+
+    newer = timeline_posts(db, reader.id, limit=2, after=(posts[1].created_at, posts[1].id))
+    assert [p.id for p in newer] == [posts[2].id, posts[3].id]
+
+    # a cursor has to point at a post from the reader's own timeline
+    stranger = make_profile("stranger")
+    elsewhere = _post(db, stranger, "not synced")
+    db.commit()
+    with pytest.raises(ValueError):
+        timeline_posts(db, reader.id, limit=2, before=(elsewhere.created_at, elsewhere.id))
+
+
+
+def test_paging_past_the_inbox_backfill_horizon(db, make_profile):
+    reader = make_profile("pager")
+    prolific = make_profile("prolific")
+    other = make_profile("other")
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(70):
+        # 60 posts by one partner (more than INBOX_BACKFILL_POSTS), interleaved with 10 by another
+        author = other if i % 7 == 0 else prolific
+        post = EtherPost(author_profile_id=author.id, content=f"p{i}", created_at=start + timedelta(minutes=i))
+        db.add(post)
+        posts.append(post)
+    db.flush()
+    add_sync_edge(db, reader.id, prolific.id)
+    add_sync_edge(db, reader.id, other.id)
+    db.commit()
+    assert db.query(EtherTimelineEntry).filter(EtherTimelineEntry.profile_id == reader.id).count() == 60
+
+    seen = []
+    page = timeline_posts(db, reader.id, limit=7)
+    while page:
+        seen.extend(p.id for p in page)
+        page = timeline_posts(db, reader.id, limit=7, before=(page[-1].created_at, page[-1].id))
+    assert seen == [p.id for p in reversed(posts)]
+
+    oldest = posts[0]
+    newer = timeline_posts(db, reader.id, limit=3, after=(oldest.created_at, oldest.id))
+    assert [p.id for p in newer] == [p.id for p in posts[1:4]]
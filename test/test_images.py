@@ -0,0 +1,107 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.models.ether import Profile, EtherPost
+from app.models.media import UploadedImage
+from app.models.user import User
+from app.routes.ether import build_post_reads
+from app.services import images
+from app.core.config import settings
+from app.services.images import ImageAsset, ImageRejected, render_derivatives, store_image, variants_for
+from app.services.moderation import _moderate_image_lite
+
+
+def _jpeg(width, height):
+    exif = Image.Exif()
+    exif[0x010F] = "TestCam"  # Make
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (40, 90, 160)).save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def test_derivatives_are_resized_and_stripped():
+    asset = ImageAsset.from_bytes(_jpeg(3200, 1600))
+    assert asset.size == (3200, 1600)
+    derivatives = render_derivatives(asset)
+    by_name = {d.name: d for d in derivatives}
+    expected = {"full": (1600, 800), "medium": (720, 360), "thumb": (160, 80)}
+    for name, dims in expected.items():
+        with Image.open(io.BytesIO(by_name[name].content)) as variant:
+            assert variant.size == dims
+            assert not variant.getexif()
+            assert "icc_profile" not in variant.info
+
+
+def test_undecodable_payload_is_rejected():
+    with pytest.raises(ImageRejected):
+        ImageAsset.from_bytes(b"not an image")
+
+
+def test_oversized_dimensions_are_rejected_before_decoding(monkeypatch):
+    payload = _jpeg(200, 200)
+    monkeypatch.setattr(settings, "IMAGE_MAX_PIXELS", 100 * 100)
+    monkeypatch.setattr(Image.Image, "load", lambda self: pytest.fail("decoded a rejected image"))
+    with pytest.raises(ImageRejected, match="too large"):
+        ImageAsset.from_bytes(payload)
+
+
+def test_moderation_reuses_the_shared_preview():
+    asset = ImageAsset.from_bytes(_jpeg(1200, 600))
+    assert asset.preview().size == (256, 128)
+    assert _moderate_image_lite(asset) == (True, None)
+    assert asset.preview_array() is asset.preview_array()
+
+
+def test_clip_input_keeps_clips_shortest_edge():
+    # the 256 preview of a 2:1 image is only 128 tall; CLIP gets a 224-short-edge copy instead
+    wide = ImageAsset.from_bytes(_jpeg(1200, 600))
+    assert wide.clip_input().size == (448, 224)
+    assert wide.clip_input() is wide.clip_input()
+    small = ImageAsset.from_bytes(_jpeg(300, 100))
+    assert small.clip_input().size == (300, 100)
+
+
+def test_feed_serves_the_medium_variant(db, monkeypatch):
+    uploaded = {}
+
+    def fake_upload(fileobj, key, content_type):
+        url = f"https://cdn.test/{key}"
+        uploaded[url] = fileobj.read()
+        return url
+
+    monkeypatch.setattr(images, "upload_bytes", fake_upload)
+    user = User(email="img@test.com", username="imgs", hashed_password="x")
+    db.add(user)
+    db.flush()
+    profile = Profile(user_id=user.id, display_name="imgs")
+    db.add(profile)
+    db.flush()
+
+    image = store_image(db, ImageAsset.from_bytes(_jpeg(2000, 1000)), f"posts/{profile.id}", user.id)
+    db.commit()
+    # the original (with its EXIF) is never uploaded; the canonical url is the stripped full variant
+    assert len(uploaded) == 3
+    assert image.url == image.full_url
+    with Image.open(io.BytesIO(uploaded[image.url])) as stored:
+        assert (image.width, image.height) == stored.size == (1600, 800)
+    assert image.thumb_url == image.url.replace("_full.", "_thumb.")
+    with Image.open(io.BytesIO(uploaded[image.url])) as stored:
+        assert not stored.getexif()
+        assert "exif" not in stored.info
+    assert db.query(UploadedImage).count() == 1
+
+    variants = variants_for(db, image.url)
+    post = EtherPost(
+        author_profile_id=profile.id,
+        content="hi",
+        image_url=image.url,
+        image_medium_url=variants.medium_url,
+        image_full_url=variants.full_url,
+    )
+    db.add(post)
+    db.commit()
+    [read] = build_post_reads(db, [post], profile.id)
+    assert read.image_url == image.medium_url
+    assert read.image_full_url == image.full_url
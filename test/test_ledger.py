@@ -0,0 +1,141 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.models.user import User
+from app.models.account import Account
+from app.models.ledger import AccountBalance, AccountMonthlyRollup, LedgerEntry
+from app.schemas.ledger import LedgerEntryCreate
+from app.crud.crud_ledger import (
+    create_ledger_entry,
+    create_transfer,
+    get_account_balance,
+    list_ledger_entries,
+    month_key,
+    rebuild_monthly_rollups,
+    reconcile_account_balances,
+)
+from app.routes.statements import rollup_totals
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+def _make_account(db, name="acct", account_type="personal"):
+    user = User(email=f"{name}@test.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(owner_user_id=user.id, name=name, account_type=account_type)
+    db.add(account)
+    db.commit()
+    return user, account
+
+
+def test_balance_snapshot_tracks_entries_and_transfers(db):
+    user, checking = _make_account(db, name="checking")
+    savings = Account(owner_user_id=user.id, name="savings")
+    db.add(savings)
+    db.commit()
+
+    create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=checking.id, direction="credit", amount=Decimal("100")))
+    create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=checking.id, direction="debit", amount=Decimal("30")))
+    create_ledger_entry(
+        db, user.id, LedgerEntryCreate(account_id=checking.id, direction="credit", amount=Decimal("5"), status="pending")
+    )
+    create_transfer(db, user.id, checking.id, savings.id, Decimal("20"))
+
+    assert get_account_balance(db, checking.id) == Decimal("50")
+    assert get_account_balance(db, savings.id) == Decimal("20")
+    assert reconcile_account_balances(db, repair=False) == []
+
+
+def test_reconcile_repairs_drift(db):
+    user, account = _make_account(db)
+    create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=account.id, direction="credit", amount=Decimal("10")))
+
+    snap = db.query(AccountBalance).filter(AccountBalance.account_id == account.id).one()
+    snap.credits = Decimal("99")
+    db.commit()
+
+    drift = reconcile_account_balances(db)
+    assert [(row["account_id"], row["expected"], row["recorded"]) for row in drift] == [
+        (account.id, Decimal("10"), Decimal("99"))
+    ]
+    assert get_account_balance(db, account.id) == Decimal("10")
+    assert reconcile_account_balances(db) == []
+
+
+def test_monthly_rollup_matches_ledger(db):
+    user, checking = _make_account(db, name="checking")
+    savings = Account(owner_user_id=user.id, name="savings")
+    db.add(savings)
+    db.commit()
+
+    create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=checking.id, direction="credit", amount=Decimal("100")))
+    create_transfer(db, user.id, checking.id, savings.id, Decimal("40"))
+
+    month = month_key(datetime.now(timezone.utc))
+    totals = rollup_totals(db, [checking.id], month)
+    assert totals == {
+        "opening": Decimal("0"),
+        "credits": Decimal("100"),
+        "debits": Decimal("40"),
+        "transfers_in": Decimal("0"),
+        "transfers_out": Decimal("40"),
+    }
+
+    db.query(AccountMonthlyRollup).delete()
+    db.commit()
+    assert rebuild_monthly_rollups(db) == 2
+    assert rollup_totals(db, [checking.id], month) == totals
+    assert rollup_totals(db, [checking.id, savings.id], "9999-12")["opening"] == Decimal("100")
+
+
+def test_cursor_pages_cover_ledger_once(db):
+    user, account = _make_account(db)
+    for amount in range(1, 6):
+        create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=account.id, direction="credit", amount=Decimal(amount)))
+
+    seen = []
+    cursor = None
+    while True:
+        page = list_ledger_entries(db, account.id, limit=2, cursor=cursor)
+        if not page:
+            break
+        seen.extend(entry.id for entry in page)
+        cursor = decode_cursor(encode_cursor(page[-1].created_at, page[-1].id))
+
+    assert seen == [entry.id for entry in list_ledger_entries(db, account.id, limit=10)]
+    assert len(seen) == 5
+
+
+def test_cursor_must_come_from_the_listing(db):
+    user, account = _make_account(db)
+    other_user, other = _make_account(db, name="other")
+    mine = [
+        create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=account.id, direction="credit", amount=Decimal(n)))
+        for n in (1, 2)
+    ]
+    theirs = create_ledger_entry(
+        db, other_user.id, LedgerEntryCreate(account_id=other.id, direction="credit", amount=Decimal("3"))
+    )
+
+    with pytest.raises(ValueError):
+        list_ledger_entries(db, account.id, cursor=(theirs.created_at, theirs.id))
+    # a cursor row that has since been deleted still pages from the client's timestamp
+    assert list_ledger_entries(db, account.id, cursor=(mine[1].created_at, 10_000)) == [mine[1], mine[0]]
+
+
+def test_idempotency_key_posts_once(db):
+    user, account = _make_account(db)
+    payload = LedgerEntryCreate(
+        account_id=account.id, direction="credit", amount=Decimal("25"), idempotency_key="retry-1"
+    )
+    first = create_ledger_entry(db, user.id, payload)
+    second = create_ledger_entry(db, user.id, payload)
+    # entries without a key never collide
+    create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=account.id, direction="credit", amount=Decimal("1")))
+    create_ledger_entry(db, user.id, LedgerEntryCreate(account_id=account.id, direction="credit", amount=Decimal("1")))
+
+    assert second.id == first.id
+    assert db.query(LedgerEntry).filter(LedgerEntry.account_id == account.id).count() == 3
+    assert get_account_balance(db, account.id) == Decimal("27")
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+import pytest
+
+from app.core.security import get_verified_user
+from app.crud.crud_ledger import get_account_balance
+from app.main import app as fastapi_app
+from app.models.account import Account
+from app.models.ledger import LedgerEntry
+from app.models.user import User
+
+
+@pytest.fixture
+def owner(db, client):
+    user = User(email="batch@test.com", hashed_password="x", email_verified=False)
+    other = User(email="other@test.com", hashed_password="x")
+    db.add_all([user, other])
+    db.flush()
+    mine = Account(owner_user_id=user.id, name="mine")
+    theirs = Account(owner_user_id=other.id, name="theirs")
+    db.add_all([mine, theirs])
+    db.commit()
+    fastapi_app.dependency_overrides[get_verified_user] = lambda: user
+    return user, mine, theirs
+
+
+async def test_batch_reports_per_item_results(client, db, owner):
+    user, mine, theirs = owner
+    entries = [
+        {"account_id": mine.id, "direction": "credit", "amount": "10", "idempotency_key": "a"},
+        {"account_id": mine.id, "direction": "credit", "amount": "10", "idempotency_key": "a"},
+        {"account_id": mine.id, "direction": "debit", "amount": "3"},
+        {"account_id": theirs.id, "direction": "credit", "amount": "1"},
+        {"account_id": 999, "direction": "credit", "amount": "1"},
+    ]
+    resp = await client.post("/ledger/entries:batch", json={"entries": entries})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["status"] for r in body["results"]] == ["created", "duplicate", "created", "error", "error"]
+    assert [r["status_code"] for r in body["results"][3:]] == [403, 404]
+    assert body["results"][1]["entry"]["id"] == body["results"][0]["entry"]["id"]
+    assert (body["created"], body["duplicates"], body["errors"]) == (2, 1, 2)
+    assert get_account_balance(db, mine.id) == Decimal("7")
+
+    # replaying the batch posts nothing new
+    again = (await client.post("/ledger/entries:batch", json={"entries": entries[:2]})).json()
+    assert [r["status"] for r in again["results"]] == ["duplicate", "duplicate"]
+    assert db.query(LedgerEntry).count() == 2
+
+
+async def test_batch_applies_free_tier_quota_in_aggregate(client, db, owner):
+    user, mine, _ = owner
+    deposit = {"account_id": mine.id, "direction": "credit", "amount": "5", "entry_type": "deposit"}
+    resp = await client.post("/ledger/entries:batch", json={"entries": [deposit] * 3})
+    statuses = [(r["status"], r["status_code"]) for r in resp.json()["results"]]
+    assert statuses == [("created", None), ("created", None), ("error", 402)]
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import get_current_user, get_verified_user
+from app.crud.crud_ledger import get_account_balance
+from app.main import app as fastapi_app
+from app.models.account import Account
+from app.models.ledger import LedgerEntry, LedgerImport
+from app.models.user import User
+from app.services.ledger_import import iter_import_rows
+
+
+@pytest.fixture
+def owner(db, client, monkeypatch):
+    user = User(email="import@test.com", hashed_password="x")
+    other = User(email="other-import@test.com", hashed_password="x")
+    db.add_all([user, other])
+    db.flush()
+    mine = Account(owner_user_id=user.id, name="mine")
+    theirs = Account(owner_user_id=other.id, name="theirs")
+    db.add_all([mine, theirs])
+    db.commit()
+    fastapi_app.dependency_overrides[get_verified_user] = lambda: user
+    fastapi_app.dependency_overrides[get_current_user] = lambda: user
+    monkeypatch.setattr(settings, "LEDGER_IMPORT_CHUNK_ROWS", 2)
+    return user, mine, theirs
+
+
+async def test_csv_import_posts_rows_and_reports_errors(client, db, owner):
+    _, mine, theirs = owner
+    body = (
+        "account_id,direction,amount,memo,idempotency_key\n"
+        f"{mine.id},credit,100,opening,k1\n"
+        f'{mine.id},debit,25,"rent\nsplit over lines",\n'
+        f"{mine.id},credit,100,opening again,k1\n"
+        f"{mine.id},credit,-5,negative,\n"
+        f"{theirs.id},credit,1,not mine,\n"
+        "\n"
+        f"{mine.id},credit,10,,\n"
+    )
+    resp = await client.post("/ledger/import", content=body.encode(), headers={"Content-Type": "text/csv"})
+    assert resp.status_code == 200
+    job = resp.json()
+    assert job["status"] == "completed"
+    assert (job["rows_processed"], job["created_count"], job["duplicate_count"], job["error_count"]) == (6, 3, 1, 2)
+    assert get_account_balance(db, mine.id) == Decimal("85")
+    memo = db.query(LedgerEntry.memo).filter(LedgerEntry.direction == "debit").scalar()
+    assert memo == "rent\nsplit over lines"
+
+    progress = (await client.get(f"/ledger/imports/{job['id']}")).json()
+    assert progress["created_count"] == 3
+
+    errors = await client.get(f"/ledger/imports/{job['id']}/errors")
+    assert errors.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(errors.text)))
+    assert rows[0] == ["row", "error", "raw"]
+    # line numbers count the memo's embedded newline
+    assert [row[0] for row in rows[1:]] == ["6", "7"]
+    assert "greater than 0" in rows[1][1]
+    assert rows[2][1] == "Not allowed"
+
+
+async def test_ndjson_import_skips_bad_lines(client, db, owner):
+    _, mine, _ = owner
+    lines = [
+        json.dumps({"account_id": mine.id, "direction": "credit", "amount": "5", "meta": {"kind": "gift"}}),
+        "{not json",
+        json.dumps(["a", "list"]),
+        json.dumps({"account_id": mine.id, "direction": "sideways", "amount": "1"}),
+        json.dumps({"account_id": mine.id, "direction": "credit", "amount": "7"}),
+    ]
+    resp = await client.post(
+        "/ledger/import?format=ndjson", content="\n".join(lines).encode(), headers={"Content-Type": "text/plain"}
+    )
+    job = resp.json()
+    assert (job["rows_processed"], job["created_count"], job["error_count"]) == (5, 2, 3)
+    assert get_account_balance(db, mine.id) == Decimal("12")
+    assert db.query(LedgerEntry.kind).filter(LedgerEntry.amount == 5).scalar() == "gift"
+
+
+async def test_multipart_upload_and_format_errors(client, db, owner):
+    _, mine, _ = owner
+    upload = f"account_id,direction,amount\n{mine.id},credit,3\n".encode()
+    resp = await client.post("/ledger/import", files={"file": ("history.csv", upload, "application/octet-stream")})
+    assert resp.json()["created_count"] == 1
+
+    resp = await client.post("/ledger/import", content=b"x", headers={"Content-Type": "application/pdf"})
+    assert resp.status_code == 415
+
+    # rows that arrived before the bad bytes are kept; the import is marked failed
+    async def body():
+        yield f"account_id,direction,amount\n{mine.id},credit,4\n".encode()
+        yield b"\xff\xfe,credit,1\n"
+
+    resp = await client.post("/ledger/import", content=body(), headers={"Content-Type": "text/csv"})
+    job = resp.json()
+    assert job["status"] == "failed" and "UTF-8" in job["detail"]
+    assert job["created_count"] == 1
+    assert db.get(LedgerImport, job["id"]).finished_at is not None
+
+
+def test_rows_are_parsed_as_chunks_arrive():
+    pulled = []
+
+    def chunks():
+        for part in (b"account_id,direction,amount\n1,cre", b"dit,2\n", b"1,debit,1\n"):
+            pulled.append(part)
+            yield part
+
+    rows = iter_import_rows(chunks(), "csv")
+    line, _, entry = next(rows)
+    assert (line, entry.amount) == (2, Decimal("2"))
+    assert len(pulled) < 3
+    assert [line for line, _, _ in rows] == [3]
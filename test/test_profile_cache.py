@@ -0,0 +1,51 @@
+from app.core.cache import TTLCache
+from app.models.user import User
+from app.models.ether import Profile
+from app.services.profile_cache import (
+    cached_profile_for_user,
+    invalidate_profile,
+    profile_cards,
+    remember_profile,
+)
+
+
+def test_ttl_cache_evicts_lru_and_expired(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_cached_profile_skips_lookup_until_invalidated(db):
+    user = User(email="cache@test.com", username="cachey", hashed_password="x")
+    db.add(user)
+    db.flush()
+    profile = Profile(user_id=user.id, display_name="before")
+    db.add(profile)
+    db.commit()
+    remember_profile(profile)
+    user_id, profile_id = user.id, profile.id
+
+    # change the row behind the cache's back: the cached copy is still served
+    db.query(Profile).filter(Profile.id == profile_id).update({Profile.display_name: "after"})
+    db.commit()
+    db.expunge_all()
+    cached = cached_profile_for_user(db, user_id)
+    assert cached.id == profile_id
+    assert cached.display_name == "before"
+
+    cards = profile_cards(db, [profile_id])
+    assert cards[profile_id].username == "cachey"
+
+    invalidate_profile(profile_id, user_id)
+    db.expunge_all()
+    assert cached_profile_for_user(db, user_id).display_name == "after"
+    assert profile_cards(db, [profile_id])[profile_id].display_name == "after"
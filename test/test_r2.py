@@ -0,0 +1,24 @@
+import io
+
+import pytest
+
+from app.services.r2 import UPLOAD_CHUNK_BYTES, UploadTooLarge, read_capped
+
+
+def test_read_capped_returns_uploads_within_the_limit():
+    payload = b"x" * (UPLOAD_CHUNK_BYTES * 2 + 7)
+    assert read_capped(io.BytesIO(payload), len(payload)) == payload
+
+
+def test_read_capped_stops_once_the_limit_is_passed():
+    class Counting(io.BytesIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    upload = Counting(b"x" * (UPLOAD_CHUNK_BYTES * 10))
+    with pytest.raises(UploadTooLarge):
+        read_capped(upload, UPLOAD_CHUNK_BYTES + 1)
+    assert upload.reads == 2
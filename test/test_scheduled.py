@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, UTC
+from decimal import Decimal
+
+from app.models.user import User
+from app.models.account import Account
+from app.models.ledger import LedgerEntry
+from app.models.scheduled_entry import ScheduledEntry
+from app.crud.crud_ledger import get_account_balance, reconcile_account_balances
+from app.crud.crud_scheduled_entry import (
+    CLAIM_LEASE_SECONDS,
+    claim_due_entries,
+    next_scheduled_for,
+    post_due_entries,
+)
+
+
+def test_post_due_entries_in_batches(db):
+    user = User(email="sched@test.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(owner_user_id=user.id, name="main")
+    db.add(account)
+    db.flush()
+    now = datetime.now(UTC)
+    for amount in (10, 20, 30):
+        db.add(
+            ScheduledEntry(
+                account_id=account.id,
+                created_by_user_id=user.id,
+                direction="credit",
+                amount=Decimal(amount),
+                scheduled_for=now - timedelta(minutes=amount),
+            )
+        )
+    db.add(
+        ScheduledEntry(
+            account_id=account.id,
+            created_by_user_id=user.id,
+            direction="credit",
+            amount=Decimal("99"),
+            scheduled_for=now + timedelta(days=1),
+        )
+    )
+    db.commit()
+
+    assert post_due_entries(db, batch_size=2) == 3
+    assert post_due_entries(db) == 0
+
+    posted = db.query(ScheduledEntry).filter(ScheduledEntry.status == "posted").all()
+    assert len(posted) == 3
+    ledger_ids = {row.id for row in db.query(LedgerEntry.id)}
+    assert {entry.posted_entry_id for entry in posted} == ledger_ids
+    assert get_account_balance(db, account.id) == Decimal("60")
+    assert reconcile_account_balances(db, repair=False) == []
+
+
+def test_claimed_entries_are_skipped_by_other_workers(db):
+    user = User(email="claim@test.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(owner_user_id=user.id, name="main")
+    db.add(account)
+    db.flush()
+    now = datetime.now(UTC)
+    for _ in range(3):
+        db.add(
+            ScheduledEntry(
+                account_id=account.id,
+                created_by_user_id=user.id,
+                direction="credit",
+                amount=Decimal("5"),
+                scheduled_for=now - timedelta(minutes=1),
+            )
+        )
+    db.commit()
+
+    first = claim_due_entries(db, now, batch_size=2)
+    second = claim_due_entries(db, now, batch_size=2)
+    assert len(first) == 2
+    assert len(second) == 1
+    assert not {entry.id for entry in first} & {entry.id for entry in second}
+    assert claim_due_entries(db, now) == []
+    assert next_scheduled_for(db, now) is None
+
+    # an expired lease (crashed worker) makes the rows claimable again
+    later = now + timedelta(seconds=CLAIM_LEASE_SECONDS + 1)
+    assert len(claim_due_entries(db, later)) == 3
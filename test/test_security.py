@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import (
+    _PasswordHashPool,
+    fit_password_hash_pool,
+    get_password_hash,
+    password_hash_stats,
+    verify_password,
+)
+from app.db.session import get_db
+from app.main import app as fastapi_app
+from app.models.user import User
+from test.conftest import TestingSessionLocal
+
+
+def test_hash_and_verify_run_on_pool():
+    before = password_hash_stats()["count"]
+    hashed = get_password_hash("correct horse")
+    assert verify_password("correct horse", hashed)
+    assert not verify_password("wrong", hashed)
+    assert not verify_password("correct horse", "not-a-hash")
+    assert password_hash_stats()["count"] >= before + 3
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = _PasswordHashPool(workers=1, max_queue=0)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=pool.run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            pool.run(lambda: "never")
+        assert exc.value.status_code == 429
+    finally:
+        release.set()
+        worker.join(5)
+    assert pool.run(lambda: "ok") == "ok"
+    assert pool.stats()["rejected"] == 1
+
+
+async def test_login_burst_gets_429_once_the_pool_is_saturated(client, db, monkeypatch):
+    db.add(User(email="burst@test.com", hashed_password="x", is_active=True))
+    db.commit()
+
+    def own_session():
+        # requests run concurrently on the threadpool, so each gets its own session
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    fastapi_app.dependency_overrides[get_db] = own_session
+    release = threading.Event()
+
+    def slow_verify(normalized, hashed_password):
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(security, "_hash_pool", _PasswordHashPool(workers=1, max_queue=1))
+    monkeypatch.setattr(security, "_verify", slow_verify)
+
+    login = {"email": "burst@test.com", "password": "guess"}
+    requests = [asyncio.ensure_future(client.post("/auth/login", json=login)) for _ in range(5)]
+    try:
+        for _ in range(500):
+            if sum(request.done() for request in requests) >= 3:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        release.set()
+    responses = await asyncio.gather(*requests)
+
+    # two logins hold the pool (one hashing, one queued); the rest are turned away at once
+    assert sorted(resp.status_code for resp in responses) == [401, 401, 429, 429, 429]
+    assert all(resp.headers["retry-after"] == "1" for resp in responses if resp.status_code == 429)
+
+
+async def test_in_flight_bound_fits_the_request_threadpool(monkeypatch):
+    import anyio.to_thread
+
+    monkeypatch.setattr(security, "_hash_pool", _PasswordHashPool(workers=8, max_queue=64))
+    threads = anyio.to_thread.current_default_thread_limiter().total_tokens
+    assert fit_password_hash_pool() == threads // security.HASH_THREADPOOL_SHARE
+    assert security._hash_pool.max_in_flight < threads
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.core.security import get_current_user
+from app.crud.crud_ledger import create_ledger_entries, month_key
+from app.main import app as fastapi_app
+from app.models.account import Account
+from app.models.ledger import AccountMonthlyRollup
+from app.models.user import User
+from app.schemas.ledger import LedgerEntryCreate
+
+
+@pytest.fixture
+def premium(db, client):
+    user = User(email="export@test.com", hashed_password="x", is_premium=True)
+    db.add(user)
+    db.flush()
+    checking = Account(owner_user_id=user.id, name="checking")
+    savings = Account(owner_user_id=user.id, name="savings")
+    db.add_all([checking, savings])
+    db.commit()
+    fastapi_app.dependency_overrides[get_current_user] = lambda: user
+    return user, checking, savings
+
+
+def _this_month() -> str:
+    return month_key(datetime.now(timezone.utc))
+
+
+def _previous_month() -> str:
+    now = datetime.now(timezone.utc)
+    return f"{now.year - 1}-12" if now.month == 1 else f"{now.year}-{now.month - 1:02d}"
+
+
+async def test_csv_export_streams_every_entry_with_running_balances(client, db, premium):
+    user, checking, savings = premium
+    db.add(
+        AccountMonthlyRollup(
+            account_id=checking.id,
+            currency="USD",
+            month=_previous_month(),
+            credits=Decimal("50"),
+            debits=Decimal("0"),
+            transfers_in=Decimal("0"),
+            transfers_out=Decimal("0"),
+        )
+    )
+    db.commit()
+    payloads = [LedgerEntryCreate(account_id=checking.id, direction="credit", amount=Decimal("1")) for _ in range(250)]
+    payloads.append(LedgerEntryCreate(account_id=checking.id, direction="debit", amount=Decimal("20"), memo="rent"))
+    payloads.append(LedgerEntryCreate(account_id=checking.id, direction="credit", amount=Decimal("9"), status="pending"))
+    payloads.append(LedgerEntryCreate(account_id=savings.id, direction="credit", amount=Decimal("5")))
+    create_ledger_entries(db, user.id, payloads)
+
+    resp = await client.get(f"/statements/export?month={_this_month()}&format=csv")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "attachment" in resp.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    # no 200-row cap, pending entries left out
+    assert len(rows) == 252
+    checking_rows = [r for r in rows if r["account_id"] == str(checking.id)]
+    assert checking_rows[0]["running_balance"] == "51.00"
+    assert checking_rows[-1]["description"] == "rent"
+    assert (checking_rows[-1]["amount"], checking_rows[-1]["running_balance"]) == ("-20.00", "280.00")
+    assert [(r["account"], r["running_balance"]) for r in rows if r["account_id"] == str(savings.id)] == [
+        ("savings", "5.00")
+    ]
+
+
+async def test_ndjson_and_ofx_exports(client, db, premium):
+    user, checking, savings = premium
+    create_ledger_entries(
+        db,
+        user.id,
+        [
+            LedgerEntryCreate(account_id=checking.id, direction="credit", amount=Decimal("10"), memo="pay & bonus"),
+            LedgerEntryCreate(account_id=checking.id, direction="debit", amount=Decimal("4")),
+        ],
+    )
+
+    resp = await client.get(f"/statements/export?month={_this_month()}&format=ndjson&account_id={checking.id}")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["running_balance"] for line in lines] == ["10.00", "6.00"]
+
+    resp = await client.get(f"/statements/export?month={_this_month()}&format=ofx")
+    assert resp.headers["content-type"].startswith("application/x-ofx")
+    ofx = resp.text
+    assert ofx.count("<STMTRS>") == 2
+    assert "<NAME>pay &amp; bonus</NAME>" in ofx
+    assert "<TRNAMT>-4.00</TRNAMT>" in ofx
+    assert f"<ACCTID>{checking.id}</ACCTID>" in ofx and "<BALAMT>6.00</BALAMT>" in ofx
+    # savings has no entries but still gets its statement
+    assert f"<ACCTID>{savings.id}</ACCTID>" in ofx and "<BALAMT>0.00</BALAMT>" in ofx
+
+
+async def test_export_requires_premium_and_valid_month(client, db, premium):
+    user, _, _ = premium
+    assert (await client.get("/statements/export?month=2026-13")).status_code == 400
+    user.is_premium = False
+    assert (await client.get(f"/statements/export?month={_this_month()}")).status_code == 402
@@ -0,0 +1,54 @@
+from datetime import date
+from decimal import Decimal
+
+from app.models.user import User
+from app.models.account import Account
+from app.models.ledger import LedgerEntry
+from app.models.affirmation import AffirmationEntry
+from app.schemas.ledger import LedgerEntryCreate
+from app.crud.crud_ledger import create_ledger_entry
+from app.services.tier import get_usage, ledger_quota_key, SAVED_AFFIRMATION_TITLE, USAGE_COUNTERS
+
+
+def test_get_usage_counts_every_quota_in_one_call(db):
+    user = User(email="quota@test.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(owner_user_id=user.id, name="main")
+    db.add(account)
+    db.commit()
+
+    def post(entry_type, direction, meta=None):
+        create_ledger_entry(
+            db,
+            user.id,
+            LedgerEntryCreate(account_id=account.id, direction=direction, amount=Decimal("1"), entry_type=entry_type, meta=meta),
+        )
+
+    post("deposit", "credit")
+    post("deposit", "credit", {"kind": "check"})
+    post("withdrawal", "debit")
+    post("manual", "credit")
+    assert db.query(LedgerEntry.kind).filter(LedgerEntry.kind.isnot(None)).all() == [("check",)]
+    db.add(AffirmationEntry(user_id=user.id, title="today", entry_date=date.today(), content="x"))
+    db.add(AffirmationEntry(user_id=user.id, title=SAVED_AFFIRMATION_TITLE, entry_date=date.today(), content="x"))
+    db.commit()
+
+    usage = get_usage(db, user.id)
+    assert usage == {
+        "deposits": 1,
+        "expenses": 1,
+        "checks": 1,
+        "scheduled": 0,
+        "affirmations": 1,
+        "accounts": 1,
+    }
+    # the single-counter queries agree with the combined one
+    assert {key: count(db, user.id) for key, count in USAGE_COUNTERS.items()} == usage
+
+
+def test_ledger_quota_key():
+    assert ledger_quota_key("deposit", {"kind": "Check"}) == "checks"
+    assert ledger_quota_key("Deposit", None) == "deposits"
+    assert ledger_quota_key("withdrawal", {}) == "expenses"
+    assert ledger_quota_key("manual", None) is None
@@ -0,0 +1,50 @@
+from sqlalchemy import event
+
+from app.core.security import create_access_token, get_current_user
+from app.models.user import User
+from test.conftest import TestingSessionLocal, engine
+
+
+def _count_queries():
+    counter = {"n": 0}
+
+    def _on_execute(*args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    return counter, lambda: event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+def test_current_user_served_from_cache_until_updated(db):
+    user = User(email="authcache@test.com", hashed_password="x", email_verified=False)
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id)})
+
+    assert get_current_user(token=token, db=TestingSessionLocal()).email_verified is False
+
+    counter, stop = _count_queries()
+    try:
+        session = TestingSessionLocal()
+        cached = get_current_user(token=token, db=session)
+        assert cached.email == "authcache@test.com"
+        assert counter["n"] == 0
+    finally:
+        stop()
+
+    # a write through any session (e.g. verify_email) invalidates the cached copy
+    user.email_verified = True
+    db.commit()
+    assert get_current_user(token=token, db=TestingSessionLocal()).email_verified is True
+
+
+def test_invalidation_versions_stay_bounded(monkeypatch):
+    from app.core import user_cache
+
+    monkeypatch.setattr(user_cache._versions, "maxsize", 2)
+    for user_id in range(1, 6):
+        user_cache.invalidate_user(user_id)
+    assert len(user_cache._versions) == 2
+    # the newest invalidations are the ones kept
+    assert user_cache._version(5) > user_cache._version(4) > 0
+    assert user_cache._version(1) == 0